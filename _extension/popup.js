@@ -82,17 +82,8 @@ authBtn.addEventListener("click", async () => {
     });
 
     if (resp.ok) {
-      showStatus("Authenticated! Sending 'done' to chat...", "success");
-      // Auto-submit "done" in the ADK web UI via content script
-      try {
-        const [tab] = await chrome.tabs.query({ active: true, currentWindow: true });
-        if (tab?.id) {
-          await chrome.tabs.sendMessage(tab.id, { action: "submit-done" });
-          showStatus("Authenticated! 'done' sent to chat automatically.", "success");
-        }
-      } catch {
-        showStatus("Authenticated! Go back to chat and say 'done'.", "success");
-      }
+      // The agent is blocked in wait_for_auth and resumes on its own
+      showStatus("Authenticated! The agent picks it up automatically — check the chat.", "success");
     } else {
       const body = await resp.text();
       showStatus(`Server error: ${resp.status}. ${body}`, "error");
@@ -1,24 +1,469 @@
-"""Shared in-memory auth store used by both server.py and agent tools.
+"""Auth token store shared by server.py and the agent tools.
 
-This module acts as a singleton — both the server endpoints and the agent
-tools import it, and since they run in the same process they share the
-same dict instances. This avoids the deadlock that occurs when agent tools
-make HTTP requests back to their own server.
+The server endpoints and the agent tools both read and write it directly,
+which avoids the deadlock that occurs when agent tools make HTTP requests
+back to their own server. Two kinds of entry live here:
+
+- pending cookies: the Chrome extension posts cookies for a token and
+  check_auth_token / auth_guard consume them exactly once;
+- the latest token registered by start_auth, for extension auto-fill.
+
+Both expire after TOKEN_TTL seconds, enforced by the store itself on every
+read. Expired entries are also dropped by one background task (sweep_forever,
+started from the server's lifespan) that walks an expiry-ordered index, so
+request handling never scans the store. At most MAX_PENDING tokens can wait
+for pickup at once; put_cookies refuses new ones beyond that.
+
+wait_for_cookies blocks until a token's cookies land: a delivery in the same
+process wakes waiters at once, and the shared backends also re-check every
+POLL_INTERVAL seconds for deliveries that reached another worker. Store
+calls block (SQLite locks, Redis round trips), so async code runs them with
+asyncio.to_thread. The backend comes from NLM_AUTH_STORE:
+
+- memory:// (default) — module-level dicts; one server process only;
+- sqlite:///auth.db (relative) or sqlite:////var/lib/nlm/auth.db — a
+  WAL-mode database file shared by the uvicorn workers on one host;
+- redis://[:password@]host:port[/db] — any server speaking the Redis
+  protocol, shared across hosts and replicas.
 """
 
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+AUTH_STORE_URL = os.environ.get("NLM_AUTH_STORE", "memory://")
+TOKEN_TTL = int(os.environ.get("NLM_AUTH_TOKEN_TTL", "600"))  # seconds
+MAX_PENDING = int(os.environ.get("NLM_AUTH_MAX_PENDING", "1000"))  # tokens awaiting pickup
+SWEEP_INTERVAL = 60  # seconds between expiry sweeps
+POLL_INTERVAL = 0.5  # seconds between shared-store checks while waiting
+
+
+class AuthStore:
+    """Storage interface for pending extension cookies and the latest token."""
+
+    ttl: int = TOKEN_TTL
+    max_pending: int = MAX_PENDING
+    poll_interval: float | None = POLL_INTERVAL  # None: every delivery is seen in-process
+
+    def __init__(self):
+        # token → events of the coroutines waiting for it, with their loops
+        self._waiters: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._waiters_lock = threading.Lock()
+
+    def put_cookies(self, token: str, cookies: dict) -> bool:
+        """Store cookies delivered for token, replacing any earlier delivery.
+
+        False (nothing stored) if MAX_PENDING other tokens are already waiting.
+        """
+        raise NotImplementedError
+
+    def peek(self, token: str) -> dict | None:
+        """The cookies waiting for token, without consuming them."""
+        raise NotImplementedError
+
+    def consume(self, token: str) -> dict | None:
+        """Atomically remove and return the cookies for token.
+
+        Of several concurrent callers (the agent tools, /auth/consume, other
+        workers) exactly one gets the cookies; the rest get None.
+        """
+        raise NotImplementedError
+
+    def set_latest_token(self, token: str):
+        raise NotImplementedError
+
+    def latest_token(self) -> str | None:
+        raise NotImplementedError
+
+    def cleanup(self) -> int:
+        """Drop expired entries; returns how many. Work is proportional to that count."""
+        return 0
+
+    async def wait_for_cookies(self, token: str, timeout: float, consume: bool = False) -> dict | None:
+        """The cookies for token as soon as they are delivered, or None after timeout seconds.
+
+        With consume=True they are taken atomically, as consume() does.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        event = asyncio.Event()
+        with self._waiters_lock:
+            self._waiters.setdefault(token, []).append((loop, event))
+        try:
+            while True:
+                cookies = await asyncio.to_thread(self.consume if consume else self.peek, token)
+                remaining = deadline - loop.time()
+                if cookies or remaining <= 0:
+                    return cookies
+                event.clear()
+                try:
+                    await asyncio.wait_for(event.wait(), min(remaining, self.poll_interval or remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._waiters_lock:
+                waiters = self._waiters.get(token, [])
+                if (loop, event) in waiters:
+                    waiters.remove((loop, event))
+                if not waiters:
+                    self._waiters.pop(token, None)
+
+    def _notify(self, token: str):
+        """Wake this process's waiters for token (from any thread)."""
+        with self._waiters_lock:
+            waiters = list(self._waiters.get(token, []))
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+class MemoryStore(AuthStore):
+    """Process-local dicts. Only correct with a single server process."""
+
+    poll_interval = None
+
+    def __init__(self, ttl: int = TOKEN_TTL, max_pending: int = MAX_PENDING):
+        super().__init__()
+        self.ttl = ttl
+        self.max_pending = max_pending
+        # token → {"cookies": dict, "expires_at": float}; one TTL for all, so
+        # insertion order (kept on replace via move_to_end) is expiry order
+        self._pending: OrderedDict[str, dict] = OrderedDict()
+        self._latest: tuple[str | None, float] = (None, 0.0)
+        self._lock = threading.Lock()
+
+    def put_cookies(self, token: str, cookies: dict) -> bool:
+        with self._lock:
+            self._expire()
+            if token not in self._pending and len(self._pending) >= self.max_pending:
+                return False
+            self._pending[token] = {"cookies": cookies, "expires_at": time.time() + self.ttl}
+            self._pending.move_to_end(token)
+        self._notify(token)
+        return True
+
+    def peek(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._pending.get(token)
+            if entry and entry["expires_at"] < time.time():
+                del self._pending[token]
+                return None
+        return entry["cookies"] if entry else None
+
+    def consume(self, token: str) -> dict | None:
+        with self._lock:
+            entry = self._pending.pop(token, None)
+        if not entry or entry["expires_at"] < time.time():
+            return None
+        return entry["cookies"]
+
+    def set_latest_token(self, token: str):
+        with self._lock:
+            self._latest = (token, time.time() + self.ttl)
+
+    def latest_token(self) -> str | None:
+        with self._lock:
+            token, expires_at = self._latest
+            if token and expires_at < time.time():
+                self._latest = (None, 0.0)
+                return None
+        return token
+
+    def cleanup(self) -> int:
+        with self._lock:
+            return self._expire()
+
+    def _expire(self) -> int:
+        """Pop expired entries off the front of the expiry order (lock held)."""
+        now, count = time.time(), 0
+        while self._pending and next(iter(self._pending.values()))["expires_at"] < now:
+            self._pending.popitem(last=False)
+            count += 1
+        return count
+
+
+class SQLiteStore(AuthStore):
+    """A WAL-mode SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str, ttl: int = TOKEN_TTL, max_pending: int = MAX_PENDING):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def put_cookies(self, token: str, cookies: dict) -> bool:
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Count only live tokens, so the cap doesn't wait on the sweeper
+                waiting = db.execute(
+                    "SELECT COUNT(*) FROM pending_auth WHERE expires_at >= ? AND token != ?", (now, token)
+                ).fetchone()[0]
+                stored = waiting < self.max_pending
+                if stored:
+                    db.execute(
+                        "INSERT OR REPLACE INTO pending_auth VALUES (?, ?, ?)",
+                        (token, json.dumps(cookies), now + self.ttl),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if stored:
+            self._notify(token)
+        return stored
+
+    def peek(self, token: str) -> dict | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT cookies FROM pending_auth WHERE token = ? AND expires_at >= ?",
+                (token, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def consume(self, token: str) -> dict | None:
+        # BEGIN IMMEDIATE takes the write lock before the read, so two workers
+        # can't both see the row
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute(
+                    "SELECT cookies, expires_at FROM pending_auth WHERE token = ?", (token,)
+                ).fetchone()
+                db.execute("DELETE FROM pending_auth WHERE token = ?", (token,))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        if not row or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set_latest_token(self, token: str):
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO latest_token VALUES (1, ?, ?)", (token, time.time() + self.ttl)
+            )
+
+    def latest_token(self) -> str | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT token FROM latest_token WHERE id = 1 AND expires_at >= ?", (time.time(),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def cleanup(self) -> int:
+        with self._lock:
+            cursor = self._db().execute("DELETE FROM pending_auth WHERE expires_at < ?", (time.time(),))
+        return cursor.rowcount
+
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened and migrated on first use (lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Autocommit; consume() manages its own transaction
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pending_auth"
+                " (token TEXT PRIMARY KEY, cookies TEXT, expires_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS pending_auth_expiry ON pending_auth (expires_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS latest_token"
+                " (id INTEGER PRIMARY KEY CHECK (id = 1), token TEXT, expires_at REAL)"
+            )
+            self._conn = conn
+        return self._conn
+
+
+class RedisError(Exception):
+    """An error reply from the Redis server."""
+
+
+class RedisStore(AuthStore):
+    """Any Redis-protocol server. Keys carry their own TTL; consume is GETDEL.
+
+    A sorted set of pending tokens scored by expiry backs the MAX_PENDING cap
+    across processes; the server expires the cookie keys themselves.
+    """
+
+    PREFIX = "nlm:auth:"
+    # Not sent again after a dropped connection: the first may have run, and
+    # a second GETDEL would find the cookies gone
+    NOT_RETRIED = {"GETDEL"}
+    # The cap check and the write in one step, so concurrent deliveries from
+    # several workers can't all pass the check before any of them writes.
+    # KEYS: expiry index, cookie key; ARGV: now, token, max pending, ttl, cookies
+    PUT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if not redis.call('ZSCORE', KEYS[1], ARGV[2])
+    and redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(ARGV[4]), ARGV[2])
+redis.call('SET', KEYS[2], ARGV[5], 'EX', ARGV[4])
+return 1
+"""
+
+    def __init__(self, url: str, ttl: int = TOKEN_TTL, max_pending: int = MAX_PENDING, timeout: float = 5.0):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def put_cookies(self, token: str, cookies: dict) -> bool:
+        stored = self._call(
+            "EVAL", self.PUT_SCRIPT, 2,
+            self.PREFIX + "expiry", self.PREFIX + "pending:" + token,
+            time.time(), token, self.max_pending, self.ttl, json.dumps(cookies),
+        )
+        if not stored:
+            return False
+        self._notify(token)
+        return True
+
+    def peek(self, token: str) -> dict | None:
+        value = self._call("GET", self.PREFIX + "pending:" + token)
+        return json.loads(value) if value is not None else None
+
+    def consume(self, token: str) -> dict | None:
+        value = self._call("GETDEL", self.PREFIX + "pending:" + token)
+        if value is None:
+            return None
+        self._call("ZREM", self.PREFIX + "expiry", token)
+        return json.loads(value)
+
+    def set_latest_token(self, token: str):
+        self._call("SET", self.PREFIX + "latest", token, "EX", self.ttl)
+
+    def latest_token(self) -> str | None:
+        value = self._call("GET", self.PREFIX + "latest")
+        return value.decode() if value is not None else None
+
+    def cleanup(self) -> int:
+        return self._call("ZREMRANGEBYSCORE", self.PREFIX + "expiry", "-inf", time.time())
+
+    def _call(self, *args):
+        """Send one command and return its reply, reconnecting once on a dropped connection.
+
+        NOT_RETRIED commands are sent once, on a connection a PING has just
+        shown to be alive; if that one send fails, the caller gets the error.
+        """
+        with self._lock:
+            if args[0] not in self.NOT_RETRIED:
+                return self._retrying(*args)
+            self._retrying("PING")
+            try:
+                return self._command(*args)
+            except (OSError, EOFError):
+                self._close()
+                raise
+
+    def _retrying(self, *args):
+        """_command, reconnecting and sending again once if the connection drops (lock held)."""
+        for attempt in (1, 2):
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._command(*args)
+            except (OSError, EOFError) as e:
+                self._close()
+                if attempt == 2:
+                    raise
+                logger.info("auth store: redis connection lost, reconnecting: %s", e)
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._command("AUTH", self.password)
+        if self.db:
+            self._command("SELECT", self.db)
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _command(self, *args):
+        parts = [str(a).encode() if not isinstance(a, bytes) else a for a in args]
+        payload = b"*%d\r\n" % len(parts) + b"".join(b"$%d\r\n%s\r\n" % (len(p), p) for p in parts)
+        self._sock.sendall(payload)
+        return self._reply()
+
+    def _reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise EOFError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            if len(data) != length + 2:
+                raise EOFError("connection closed by server")
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._reply() for _ in range(count)]
+        raise RedisError(f"unexpected reply: {line!r}")
+
+
+def open_store(url: str = AUTH_STORE_URL, ttl: int = TOKEN_TTL) -> AuthStore:
+    """The backend for a NLM_AUTH_STORE URL."""
+    scheme, _, rest = url.partition("://")
+    if scheme == "memory":
+        return MemoryStore(ttl)
+    if scheme == "sqlite":
+        return SQLiteStore(os.path.expanduser(rest.removeprefix("/")) or "auth.db", ttl)
+    if scheme == "redis":
+        return RedisStore(url, ttl)
+    raise ValueError(f"Unknown NLM_AUTH_STORE backend: {url}")
 
-# Pending auth tokens → cookies delivered by the Chrome extension
-# Key: token string, Value: {"cookies": dict, "received_at": float}
-pending_auth: dict[str, dict] = {}
 
-# Latest token registered by start_auth for extension auto-fill
-latest_token: dict = {"token": None, "created_at": 0.0}
+store = open_store()
 
 
-def cleanup_expired(max_age: int = 600):
-    """Remove tokens older than max_age seconds."""
-    cutoff = time.time() - max_age
-    expired = [k for k, v in pending_auth.items() if v["received_at"] < cutoff]
-    for k in expired:
-        pending_auth.pop(k, None)
+async def sweep_forever(interval: float = SWEEP_INTERVAL):
+    """Drop expired tokens every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = await asyncio.to_thread(store.cleanup)
+        except Exception as e:
+            logger.warning("auth store: sweep failed: %s", e)
+            continue
+        if expired:
+            logger.debug("auth store: swept %d expired tokens", expired)
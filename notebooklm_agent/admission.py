@@ -0,0 +1,210 @@
+"""Admission control for nlm commands: per-profile limits and fair queues.
+
+Every backend execution asks its profile's Scheduler for a slot first. A
+profile runs at most CONCURRENCY commands at once and starts at most RATE per
+second (a token bucket BURST deep), so one session's batch or studio fan-out
+can't saturate the upstream account and get everyone on it throttled.
+
+Commands that have to wait queue in two lanes: interactive reads (lists, gets,
+status checks, queries) are always admitted ahead of bulk work (adds, imports,
+generation, downloads). Within a lane the ADK sessions take turns, one command
+each, so a 20-URL batch doesn't hold up another user's commands. Queue depth
+and wait time are exported on /metrics.
+
+Schedulers are shared by the server's event loop, the job loop and sync tools
+in worker threads, so waiters are woken thread-safely whichever one they're on.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+
+from opentelemetry import trace
+
+from . import metrics
+from .commands import READ_ONLY, command_key
+from .progress import session_var
+
+ADMISSION_ENABLED = os.environ.get("NLM_ADMISSION", "1") != "0"
+CONCURRENCY = int(os.environ.get("NLM_PROFILE_CONCURRENCY", "4"))
+RATE = float(os.environ.get("NLM_PROFILE_RATE", "2"))  # commands started per second; 0 = unlimited
+BURST = int(os.environ.get("NLM_PROFILE_BURST", "10"))
+
+# Commands a user is waiting on in the chat → the priority lane
+INTERACTIVE = READ_ONLY | {("notebook", "query")}
+LANES = ("interactive", "bulk")  # in admission order
+
+
+def lane(args: list[str]) -> str:
+    return "interactive" if command_key(args) in INTERACTIVE else "bulk"
+
+
+class TokenBucket:
+    """rate tokens per second, up to burst; not thread-safe (the Scheduler locks)."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token; the seconds to wait before using it (0 when one was on hand)."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        return max(0.0, -self.tokens / self.rate)
+
+
+class _Waiter:
+    __slots__ = ("wake",)
+
+    def __init__(self, wake):
+        self.wake = wake
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class Scheduler:
+    """One profile's concurrency cap, rate limit and fair lanes."""
+
+    def __init__(self, profile: str, concurrency: int = CONCURRENCY, rate: float = RATE, burst: int = BURST):
+        self.profile = profile
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate, max(1, burst)) if rate > 0 else None
+        self.running = 0
+        # lane → session → its waiting commands; sessions rotate to the back when served
+        self._lanes: dict[str, OrderedDict[str, deque]] = {name: OrderedDict() for name in LANES}
+        self._lock = threading.Lock()
+
+    def depth(self, lane_name: str) -> int:
+        with self._lock:
+            return self._depth(lane_name)
+
+    def _depth(self, lane_name: str) -> int:
+        return sum(len(q) for q in self._lanes[lane_name].values())
+
+    def _gauge(self, lane_name: str):
+        metrics.admission_queue.set(self._depth(lane_name), profile=self.profile, lane=lane_name)
+
+    def _enter(self, lane_name: str, session: str, waiter: _Waiter) -> bool:
+        """Take a free slot (True) or queue the waiter until release() hands one over."""
+        with self._lock:
+            if self.running < self.concurrency:
+                self.running += 1
+                return True
+            self._lanes[lane_name].setdefault(session, deque()).append(waiter)
+            self._gauge(lane_name)
+            return False
+
+    def _withdraw(self, lane_name: str, session: str, waiter: _Waiter) -> bool:
+        """Drop a waiter that gave up; False if it was already handed a slot."""
+        with self._lock:
+            queue = self._lanes[lane_name].get(session)
+            if queue is None or waiter not in queue:
+                return False
+            queue.remove(waiter)
+            if not queue:
+                del self._lanes[lane_name][session]
+            self._gauge(lane_name)
+            return True
+
+    def _pace(self) -> float:
+        if self.bucket is None:
+            return 0.0
+        with self._lock:
+            return self.bucket.reserve()
+
+    def release(self):
+        """Free a slot, handing it straight to the next waiter if there is one."""
+        waiter = None
+        with self._lock:
+            for lane_name in LANES:
+                queues = self._lanes[lane_name]
+                if queues:
+                    session, queue = queues.popitem(last=False)
+                    waiter = queue.popleft()
+                    if queue:
+                        queues[session] = queue  # back of the line: sessions take turns
+                    self._gauge(lane_name)
+                    break
+            else:
+                self.running -= 1
+        if waiter is not None:
+            waiter.wake()
+
+    def _admitted(self, lane_name: str, started: float):
+        waited = time.monotonic() - started
+        metrics.admission_wait.observe(waited, profile=self.profile, lane=lane_name)
+        trace.get_current_span().set_attribute("nlm.queued_seconds", round(waited, 3))
+
+    @contextmanager
+    def slot(self, args: list[str], session: str = ""):
+        """Hold one of the profile's slots, paced by the rate limit (blocks the thread)."""
+        lane_name, started = lane(args), time.monotonic()
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        if not self._enter(lane_name, session, waiter):
+            event.wait()
+        try:
+            delay = self._pace()
+            if delay:
+                time.sleep(delay)
+            self._admitted(lane_name, started)
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self, args: list[str], session: str = ""):
+        """Async variant of slot."""
+        lane_name, started = lane(args), time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve, future))
+        if not self._enter(lane_name, session, waiter):
+            try:
+                await future
+            except asyncio.CancelledError:
+                if not self._withdraw(lane_name, session, waiter):
+                    self.release()  # the slot arrived as we were cancelled: pass it on
+                raise
+        try:
+            delay = self._pace()
+            if delay:
+                await asyncio.sleep(delay)
+            self._admitted(lane_name, started)
+            yield
+        finally:
+            self.release()
+
+
+_schedulers: dict[str, Scheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler(profile: str) -> Scheduler:
+    with _schedulers_lock:
+        if profile not in _schedulers:
+            _schedulers[profile] = Scheduler(profile)
+        return _schedulers[profile]
+
+
+def admit(args: list[str], profile: str):
+    """Context manager holding an admission slot for one execution."""
+    if not ADMISSION_ENABLED:
+        return nullcontext()
+    return scheduler(profile).slot(args, session_var.get() or "")
+
+
+def admit_async(args: list[str], profile: str):
+    """Async variant of admit."""
+    if not ADMISSION_ENABLED:
+        return nullcontext()
+    return scheduler(profile).slot_async(args, session_var.get() or "")
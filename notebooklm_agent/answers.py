@@ -0,0 +1,137 @@
+"""Persistent answer cache for notebook queries.
+
+A query answer only depends on the notebook's sources and the question, so
+answers are stored in SQLite keyed by (profile, notebook, fingerprint of the
+current source IDs, normalised question) and survive restarts. Adding,
+importing or deleting sources changes the fingerprint, and the mutating
+commands also drop the notebook's rows outright (see invalidate_after).
+
+Follow-ups that carry a conversation_id depend on the conversation so far
+and always go upstream; so do queries with use_cache=False. Stored answers
+carry no conversation_id: that conversation belongs to whoever asked first.
+
+The fingerprint costs a `source list` per cacheable query. It comes from the
+read cache (cache.py) while that is fresh, so a hit is free after the first
+listing; otherwise it is one upstream call, against a query's several seconds.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_ENABLED = os.environ.get("NLM_ANSWER_CACHE", "1") != "0"
+ANSWER_CACHE_PATH = os.path.expanduser(
+    os.environ.get("NLM_ANSWER_CACHE_PATH", "~/.cache/adk-notebooklm-agent/answers.db")
+)
+ANSWER_TTL = int(os.environ.get("NLM_ANSWER_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+MAX_ANSWERS = 5000
+
+
+def source_ids(payload) -> list[str] | None:
+    """Source IDs from a `source list` result, or None if it isn't one."""
+    if isinstance(payload, dict):
+        if "error" in payload:
+            return None
+        payload = payload.get("sources")
+    if not isinstance(payload, list):
+        return None
+    return sorted(r["id"] for r in payload if isinstance(r, dict) and r.get("id"))
+
+
+def fingerprint(ids: list[str]) -> str:
+    return hashlib.sha256("\n".join(ids).encode()).hexdigest()[:16]
+
+
+def normalize(question: str) -> str:
+    """Fold case, whitespace and trailing punctuation so rephrasings that only differ there match."""
+    return re.sub(r"\s+", " ", question).strip().rstrip("?.! ").lower()
+
+
+class AnswerCache:
+    """SQLite-backed answers by (profile, notebook, source fingerprint, question)."""
+
+    def __init__(self, path: str = ANSWER_CACHE_PATH, ttl: int = ANSWER_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def get(self, profile: str, notebook_id: str, ids: list[str], question: str) -> dict | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT result, created_at FROM answers"
+                " WHERE profile = ? AND notebook_id = ? AND fingerprint = ? AND question = ?",
+                (profile, notebook_id, fingerprint(ids), normalize(question)),
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        logger.debug("answer cache hit (%d hits, %d misses)", self.hits, self.misses)
+        return json.loads(row[0])
+
+    def put(self, profile: str, notebook_id: str, ids: list[str], question: str, result: dict):
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    profile,
+                    notebook_id,
+                    fingerprint(ids),
+                    normalize(question),
+                    json.dumps(result),
+                    " ".join(ids),
+                    time.time(),
+                ),
+            )
+            db.execute(
+                "DELETE FROM answers WHERE rowid IN (SELECT rowid FROM answers"
+                " ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (MAX_ANSWERS,),
+            )
+            db.commit()
+
+    def invalidate_after(self, args: list[str], profile: str):
+        """Drop the answers a mutating command may have outdated."""
+        group, verb = (list(args[:2]) + ["", ""])[:2]
+        target = args[2] if len(args) > 2 else ""
+        if (group, verb) in (("source", "add"), ("research", "import"), ("notebook", "delete")):
+            self._delete("profile = ? AND notebook_id = ?", (profile, target))
+        elif (group, verb) == ("source", "delete"):
+            self._delete("profile = ? AND instr(' ' || source_ids || ' ', ?) > 0", (profile, f" {target} "))
+        elif group == "login" and "--check" not in args:
+            self._delete("profile = ?", (profile,))  # possibly another account now
+
+    def _delete(self, where: str, params: tuple):
+        with self._lock:
+            db = self._db()
+            db.execute(f"DELETE FROM answers WHERE {where}", params)
+            db.commit()
+
+    def _db(self) -> sqlite3.Connection:
+        """The connection, opened and migrated on first use (lock held)."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                " profile TEXT, notebook_id TEXT, fingerprint TEXT, question TEXT,"
+                " result TEXT, source_ids TEXT, created_at REAL,"
+                " PRIMARY KEY (profile, notebook_id, fingerprint, question))"
+            )
+            self._conn = conn
+        return self._conn
+
+
+answer_cache: AnswerCache | None = AnswerCache() if ANSWER_CACHE_ENABLED else None
@@ -0,0 +1,170 @@
+"""Process-wide record of which nlm profiles were verified, and when.
+
+Auth lives in the nlm profile, not the chat session, so once any session has
+verified a profile (check_auth, extension or pasted cookies) every other
+session can use it until AUTH_MAX_AGE_SECONDS after that verification,
+without running `nlm login --check` again. A tool reporting auth_expired
+drops the profile for everyone (see agent.auth_error_handler).
+
+The clock starts when the cookies were issued: a fresh login restarts it, a
+later check of the same cookies doesn't. The server warms the record up at
+startup (warm_up, every configured profile at once) and recheck_forever
+checks each profile again once it is within RECHECK_MARGIN of expiry, so a
+lapsed login is noticed before a session runs into it. Sessions see the time
+left as state["auth_expires_in_minutes"] and, near expiry, an expiry notice
+in the instruction.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AUTH_MAX_AGE_SECONDS = 7 * 3600  # 7h (PingID ~8h)
+AUTH_PROFILES = [p.strip() for p in os.environ.get("NLM_PROFILES", "").split(",") if p.strip()]
+RECHECK_MARGIN = int(os.environ.get("NLM_AUTH_RECHECK_MARGIN", "1800"))  # seconds before expiry
+RECHECK_INTERVAL = 600  # seconds between scheduler passes
+WARN_MINUTES = 45  # expiry notice in the instruction below this
+
+
+class ProfileAuth:
+    """Verification times by profile, valid for max_age seconds."""
+
+    def __init__(self, max_age: int = AUTH_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._verified: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_valid(self, profile: str, at: float | None = None, renewed: bool = True):
+        """Record a verification; renewed=False (same cookies) keeps a still-current start."""
+        at = at or time.time()
+        with self._lock:
+            current = self._verified.get(profile)
+            if renewed or current is None or at - current > self.max_age:
+                self._verified[profile] = at
+
+    def valid_at(self, profile: str) -> float | None:
+        """When the profile was verified, or None if never or too long ago."""
+        with self._lock:
+            at = self._verified.get(profile)
+            if at is not None and time.time() - at > self.max_age:
+                del self._verified[profile]
+                return None
+        return at
+
+    def expires_in(self, profile: str) -> float | None:
+        """Seconds until the profile's verification lapses, or None if it isn't valid."""
+        at = self.valid_at(profile)
+        return None if at is None else at + self.max_age - time.time()
+
+    def invalidate(self, profile: str):
+        with self._lock:
+            self._verified.pop(profile, None)
+
+    def profiles(self) -> list[str]:
+        with self._lock:
+            return list(self._verified)
+
+    def adopt(self, state, profile: str) -> bool:
+        """Mark a session authenticated by profile's current verification; False if it has none."""
+        at = self.valid_at(profile)
+        if at is None:
+            return False
+        current = state.get("auth_valid") and state.get("profile", "default") == profile
+        if not (current and state.get("auth_valid_at", 0) >= at):  # only write what changed
+            state["profile"] = profile
+            state["auth_valid"] = True
+            state["auth_valid_at"] = at
+        minutes = self.minutes_left(profile)
+        if minutes is not None and state.get("auth_expires_in_minutes") != minutes:
+            state["auth_expires_in_minutes"] = minutes
+        return True
+
+    def minutes_left(self, profile: str) -> int | None:
+        left = self.expires_in(profile)
+        return None if left is None else max(0, int(left // 60))
+
+
+profile_auth = ProfileAuth()
+
+
+def expiry_notice(profile: str) -> str | None:
+    """Instruction text when the profile's auth is about to lapse, else None."""
+    minutes = profile_auth.minutes_left(profile)
+    if minutes is None or minutes >= WARN_MINUTES:
+        return None
+    return (
+        f"Authentication for profile '{profile}' expires in about {minutes} minutes. "
+        "Before starting a multi-step recipe or a long job, tell the user and offer to "
+        "re-authenticate first (`start_auth`), so it doesn't lapse halfway through."
+    )
+
+
+def configured_profiles() -> list[str]:
+    """NLM_PROFILES, else every profile nlm has stored, else just "default"."""
+    if AUTH_PROFILES:
+        return AUTH_PROFILES
+    try:
+        from notebooklm_tools.core.auth import AuthManager
+
+        return sorted(AuthManager.list_profiles()) or ["default"]
+    except Exception as e:
+        logger.debug("auth: could not list nlm profiles: %s", e)
+        return ["default"]
+
+
+def _issued_at(profile: str) -> float | None:
+    """When the profile's cookies were written by a login, if nlm's files say."""
+    try:
+        from notebooklm_tools.core.auth import AuthManager
+
+        return AuthManager(profile).cookies_file.stat().st_mtime
+    except Exception:
+        return None
+
+
+def record_check(profile: str):
+    """Record a successful `nlm login --check`: the window runs from the login, not the check."""
+    now = time.time()
+    issued = _issued_at(profile)
+    start = issued if issued and now - issued < profile_auth.max_age else now
+    profile_auth.mark_valid(profile, start, renewed=False)
+
+
+async def check_profile(profile: str) -> bool:
+    """Run `nlm login --check` for profile and record the outcome."""
+    from .helpers import run_nlm_async
+
+    result = await run_nlm_async(["login", "--check"], profile=profile, json_output=False)
+    if "error" in result:
+        profile_auth.invalidate(profile)
+        logger.info("auth: profile '%s' is not authenticated: %s", profile, result["error"])
+        return False
+    record_check(profile)
+    return True
+
+
+async def warm_up(profiles: list[str] | None = None):
+    """Check every configured profile concurrently, so the first session needn't."""
+    profiles = profiles or configured_profiles()
+    results = await asyncio.gather(*(check_profile(p) for p in profiles), return_exceptions=True)
+    valid = [p for p, ok in zip(profiles, results) if ok is True]
+    logger.info("auth warm-up: %d of %d profiles authenticated %s", len(valid), len(profiles), valid)
+
+
+async def recheck_forever(interval: float = RECHECK_INTERVAL):
+    """Re-check each valid profile once it is within RECHECK_MARGIN of expiry, until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        due = [p for p in profile_auth.profiles() if (profile_auth.expires_in(p) or 0) < RECHECK_MARGIN]
+        if not due:
+            continue
+        results = await asyncio.gather(*(check_profile(p) for p in due), return_exceptions=True)
+        for profile, ok in zip(due, results):
+            if ok is True:
+                logger.info("auth: profile '%s' expires in %s minutes", profile, profile_auth.minutes_left(profile))
+            else:
+                logger.warning("auth: profile '%s' no longer authenticated: %s", profile, ok)
@@ -0,0 +1,259 @@
+"""Read-through cache for nlm list/get/status calls.
+
+Entries are keyed by (profile, args), expire after a per-command TTL and are
+bounded by an LRU size limit. Past their TTL, entries are still served for
+STALE_SECONDS while a single background refresh runs (stale-while-revalidate),
+so a slow upstream never stalls a read that has an answer on hand. Status
+reads that callers poll (NO_STALE) are never served stale: a poller would
+always see the answer from one poll before.
+
+Callers get their own copy of a cached result, so changing it can't change
+what the next caller sees.
+
+Mutations invalidate exactly the reads they affect — see
+invalidate_after().
+"""
+
+import asyncio
+import contextvars
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from .commands import command_key, read_only
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.environ.get("NLM_CACHE", "1") != "0"
+DEFAULT_TTL = int(os.environ.get("NLM_CACHE_TTL", "60"))
+STALE_SECONDS = int(os.environ.get("NLM_CACHE_STALE", "300"))
+MAX_ENTRIES = int(os.environ.get("NLM_CACHE_MAX_ENTRIES", "512"))
+
+# Cacheable read commands (a subset of commands.READ_ONLY) → TTL in seconds
+READ_TTLS: dict[tuple[str, str], int] = {
+    ("notebook", "list"): DEFAULT_TTL,
+    ("notebook", "get"): DEFAULT_TTL,
+    ("source", "list"): DEFAULT_TTL,
+    ("note", "list"): DEFAULT_TTL,
+    ("share", "status"): DEFAULT_TTL,
+    ("studio", "status"): min(DEFAULT_TTL, 10),  # generation state moves quickly
+}
+
+# Polled for progress: once expired, fetch again rather than serve stale
+NO_STALE = {("studio", "status")}
+
+STUDIO_TYPES = {
+    "audio", "video", "mindmap", "infographic", "slides",
+    "data-table", "report", "quiz", "flashcards",
+}
+
+Key = tuple[str, tuple[str, ...]]
+
+# Set by helpers.run_sync: its event loop closes when the call returns, so a
+# refresh started there as a task would be cancelled with it
+private_loop: contextvars.ContextVar[bool] = contextvars.ContextVar("private_loop", default=False)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until")
+
+    def __init__(self, value, ttl: int, stale: int = STALE_SECONDS):
+        now = time.monotonic()
+        self.value = value
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale
+
+
+class ReadCache:
+    """Per-profile TTL + LRU cache with stale-while-revalidate."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Key, _Entry] = OrderedDict()
+        self._refreshing: set[Key] = set()
+        self._tasks: set[asyncio.Task] = set()
+        # Bumped on every invalidation so a read that started before a
+        # mutation can't store its now-outdated result afterwards
+        self._generation: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cacheable(args: list[str], json_output: bool) -> bool:
+        return json_output and read_only(args) and command_key(args) in READ_TTLS
+
+    def read_through(self, args: list[str], profile: str, fetch: Callable[[], dict]) -> dict:
+        key = (profile, tuple(args))
+        entry, fresh, generation = self._lookup(key)
+        if entry is not None:
+            if not fresh and self._claim_refresh(key):
+                threading.Thread(
+                    target=self._refresh, args=(key, fetch, generation), daemon=True
+                ).start()
+            return copy.deepcopy(entry.value)
+        result = fetch()
+        self._store(key, result, generation)
+        return result
+
+    async def read_through_async(
+        self, args: list[str], profile: str, fetch: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        key = (profile, tuple(args))
+        entry, fresh, generation = self._lookup(key)
+        if entry is not None:
+            if not fresh and self._claim_refresh(key):
+                refresh = self._refresh_async(key, fetch, generation)
+                if private_loop.get():
+                    threading.Thread(
+                        target=contextvars.copy_context().run,
+                        args=(asyncio.run, refresh),
+                        daemon=True,
+                    ).start()
+                else:
+                    task = asyncio.create_task(refresh)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            return copy.deepcopy(entry.value)
+        result = await fetch()
+        self._store(key, result, generation)
+        return result
+
+    def invalidate(self, profile: str, *prefixes: tuple[str, ...]):
+        """Drop entries for profile whose args start with any of the prefixes."""
+        with self._lock:
+            self._bump(profile)
+            for key in list(self._entries):
+                if key[0] == profile and any(key[1][: len(p)] == p for p in prefixes):
+                    del self._entries[key]
+
+    def clear(self, profile: str | None = None):
+        with self._lock:
+            for key in [k for k in self._entries if profile is None or k[0] == profile]:
+                del self._entries[key]
+            for p in [profile] if profile is not None else list(self._generation):
+                self._bump(p)
+
+    def invalidate_after(self, args: list[str], profile: str):
+        """Invalidate the reads affected by a mutating command.
+
+        Called whatever the outcome: a timed-out `source add` may still have
+        landed upstream.
+        """
+        group, verb = (list(args[:2]) + ["", ""])[:2]
+        target = args[2] if len(args) > 2 else ""
+
+        if group == "login":
+            if "--check" not in args:
+                self.clear(profile)
+        elif group == "notebook" and verb == "create":
+            self.invalidate(profile, ("notebook", "list"))
+        elif group == "notebook" and verb == "rename":
+            self.invalidate(profile, ("notebook", "list"), ("notebook", "get", target))
+        elif group == "notebook" and verb == "delete":
+            self.invalidate(
+                profile,
+                ("notebook", "list"),
+                ("notebook", "get", target),
+                ("source", "list", target),
+                ("note", "list", target),
+                ("share", "status", target),
+                ("studio", "status", target),
+            )
+        elif (group == "source" and verb == "add") or (group == "research" and verb == "import"):
+            self._invalidate_sources(profile, target)
+        elif group == "source" and verb == "delete":
+            notebook_id = self._notebook_of_source(profile, target)
+            if notebook_id:
+                self._invalidate_sources(profile, notebook_id)
+            else:
+                self.invalidate(
+                    profile, ("notebook", "list"), ("notebook", "get"), ("source", "list")
+                )
+        elif group == "note" and verb in ("create", "update", "delete"):
+            self.invalidate(profile, ("note", "list", target))
+        elif group == "share" and verb in ("public", "private", "invite"):
+            self.invalidate(profile, ("share", "status", target))
+        elif (group in STUDIO_TYPES and verb == "create") or (group == "studio" and verb == "delete"):
+            self.invalidate(profile, ("studio", "status", target))
+
+    def _invalidate_sources(self, profile: str, notebook_id: str):
+        self.invalidate(
+            profile,
+            ("notebook", "list"),  # source counts
+            ("notebook", "get", notebook_id),
+            ("source", "list", notebook_id),
+        )
+
+    def _notebook_of_source(self, profile: str, source_id: str) -> str | None:
+        """Find which cached source list contains source_id."""
+        with self._lock:
+            for (p, args), entry in self._entries.items():
+                if p != profile or args[:2] != ("source", "list") or len(args) < 3:
+                    continue
+                records = entry.value if isinstance(entry.value, list) else []
+                if any(isinstance(r, dict) and r.get("id") == source_id for r in records):
+                    return args[2]
+        return None
+
+    def _bump(self, profile: str):
+        self._generation[profile] = self._generation.get(profile, 0) + 1
+
+    def _lookup(self, key: Key) -> tuple[_Entry | None, bool, int]:
+        """Return (entry, is_fresh, generation) for key."""
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation.get(key[0], 0)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False, generation
+            if now > entry.stale_until:
+                del self._entries[key]
+                return None, False, generation
+            self._entries.move_to_end(key)
+            return entry, now <= entry.expires_at, generation
+
+    def _store(self, key: Key, result, generation: int):
+        if isinstance(result, dict) and "error" in result:
+            return
+        command = key[1][:2]
+        value = copy.deepcopy(result)  # the caller keeps result to itself
+        with self._lock:
+            if self._generation.get(key[0], 0) != generation:
+                return
+            self._entries[key] = _Entry(value, READ_TTLS[command], 0 if command in NO_STALE else STALE_SECONDS)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _claim_refresh(self, key: Key) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: Key, fetch: Callable[[], dict], generation: int):
+        try:
+            self._store(key, fetch(), generation)
+        except Exception:
+            logger.exception("background refresh failed for %s", " ".join(key[1]))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(
+        self, key: Key, fetch: Callable[[], Awaitable[dict]], generation: int
+    ):
+        try:
+            self._store(key, await fetch(), generation)
+        except Exception:
+            logger.exception("background refresh failed for %s", " ".join(key[1]))
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+read_cache: ReadCache | None = ReadCache() if CACHE_ENABLED else None
@@ -0,0 +1,31 @@
+"""The nlm subcommands that only read, in one place.
+
+Everything that treats reads differently builds on READ_ONLY: the read cache
+(cache.py) caches them, admission (admission.py) puts them in the priority
+lane, resilience.py retries them, singleflight.py merges identical ones and
+the worker pool (pool.py) re-runs them after a worker crash. A command missing
+here is simply treated as a mutation everywhere — never add one that changes
+anything upstream.
+"""
+
+READ_ONLY = frozenset({
+    ("notebook", "list"),
+    ("notebook", "get"),
+    ("source", "list"),
+    ("source", "get"),
+    ("source", "describe"),
+    ("note", "list"),
+    ("studio", "status"),
+    ("share", "status"),
+    ("research", "status"),
+    ("login", "--check"),
+})
+
+
+def command_key(args: list[str]) -> tuple[str, ...]:
+    """The subcommand part of args: ("notebook", "list"), ("login", "--check"), ..."""
+    return tuple(args[:2])
+
+
+def read_only(args: list[str]) -> bool:
+    return command_key(args) in READ_ONLY
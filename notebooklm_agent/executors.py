@@ -0,0 +1,436 @@
+"""Execution backends for nlm commands.
+
+run_nlm() builds the argument list; an executor turns it into the result
+dict the tools see. The backend is chosen once per process from the
+NLM_BACKEND environment variable:
+
+    subprocess  (default) `nlm` CLI, on a warm worker when the pool is
+                enabled, else a fresh process per call; long commands run
+                for a watched ADK session stream their stdout as progress events
+    inprocess   notebooklm-mcp-cli's client called directly, one HTTP
+                session kept per profile; commands without an in-process
+                handler still go through the subprocess executor
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+from .metrics import command_label, exit_codes, stdout_bytes
+from .pool import pool
+from .progress import parse_line, progress_hub, session_var, streamed
+
+logger = logging.getLogger(__name__)
+
+NLM_PATH = shutil.which("nlm") or "nlm"
+NLM_BACKEND = os.environ.get("NLM_BACKEND", "subprocess")
+
+USAGE_EXIT_CODE = 2  # nlm (click) refused the arguments
+
+AUTH_KEYWORDS = ["unauthorized", "401", "auth", "cookie", "session expired", "login required"]
+
+
+def error_result(msg: str) -> dict:
+    """Build the {"error": ...} dict, flagging messages that look like auth failures."""
+    result = {"error": msg}
+    if any(kw in msg.lower() for kw in AUTH_KEYWORDS):
+        result["auth_expired"] = True
+    return result
+
+
+class Executor:
+    """Runs one nlm command and returns run_nlm's result dict."""
+
+    name = "base"
+
+    def execute(
+        self, args: list[str], profile: str, json_output: bool, timeout: int
+    ) -> dict | list:
+        raise NotImplementedError
+
+    async def execute_async(
+        self, args: list[str], profile: str, json_output: bool, timeout: int
+    ) -> dict | list:
+        """Async variant of execute(); backends without native async use a thread."""
+        return await asyncio.to_thread(self.execute, args, profile, json_output, timeout)
+
+    def reset(self, profile: str):
+        """Drop any per-profile state (called after the profile re-logs in)."""
+
+
+class SubprocessExecutor(Executor):
+    """Runs the `nlm` CLI and parses its stdout."""
+
+    name = "subprocess"
+
+    def command(self, args: list[str], profile: str, json_output: bool) -> list[str]:
+        cmd = [NLM_PATH] + args + ["--profile", profile]
+        if json_output:
+            cmd.append("--json")
+        return cmd
+
+    def execute(self, args, profile, json_output, timeout):
+        cmd = self.command(args, profile, json_output)
+        try:
+            result = pool.run(cmd[1:], profile, timeout) if pool else None
+            if result is None:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                )
+        except subprocess.TimeoutExpired:
+            return {"error": f"Command timed out after {timeout}s: {' '.join(cmd)}", "timed_out": True}
+        except FileNotFoundError:
+            return {"error": f"nlm CLI not found at {NLM_PATH}. Is it installed?", "error_kind": "permanent"}
+        self._record(args, profile, result)
+        return self.parse(result, json_output)
+
+    async def execute_async(self, args, profile, json_output, timeout):
+        cmd = self.command(args, profile, json_output)
+        try:
+            session = session_var.get()
+            if session and streamed(args) and progress_hub.watched(session):
+                # Someone is watching: spawn so stdout can be streamed
+                # (a pooled worker only answers once the command is done)
+                result = await self._stream_async(args, cmd, timeout)
+            else:
+                # A warm worker is still the cheapest path; pool.run returns None
+                # straight away when saturated, so at most POOL_SIZE threads wait here.
+                result = await asyncio.to_thread(pool.run, cmd[1:], profile, timeout) if pool else None
+                if result is None:
+                    result = await self._spawn_async(cmd, timeout)
+        except subprocess.TimeoutExpired:
+            return {"error": f"Command timed out after {timeout}s: {' '.join(cmd)}", "timed_out": True}
+        except FileNotFoundError:
+            return {"error": f"nlm CLI not found at {NLM_PATH}. Is it installed?", "error_kind": "permanent"}
+        self._record(args, profile, result)
+        return self.parse(result, json_output)
+
+    def _record(self, args: list[str], profile: str, result: subprocess.CompletedProcess):
+        labels = {"command": command_label(args), "profile": profile}
+        exit_codes.inc(code=result.returncode, **labels)
+        stdout_bytes.observe(len(result.stdout or ""), **labels)
+
+    async def _stream_async(
+        self, args: list[str], cmd: list[str], timeout: int
+    ) -> subprocess.CompletedProcess:
+        """_spawn_async, publishing each stdout line as a progress event."""
+        command = " ".join(args[:2])
+        progress_hub.emit({"type": "command", "command": command, "status": "started"})
+        started = time.monotonic()
+
+        def on_line(line: str):
+            event = parse_line(line)
+            if event:
+                progress_hub.emit({**event, "command": command})
+
+        ok = False
+        try:
+            result = await self._spawn_async(cmd, timeout, on_line)
+            ok = result.returncode == 0
+            return result
+        finally:
+            progress_hub.emit({
+                "type": "command",
+                "command": command,
+                "status": "finished" if ok else "failed",
+                "seconds": round(time.monotonic() - started, 1),
+            })
+
+    async def _spawn_async(
+        self, cmd: list[str], timeout: int, on_line=None
+    ) -> subprocess.CompletedProcess:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            if on_line is None:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            else:
+                stdout, stderr = await asyncio.wait_for(_read_lines(proc, on_line), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return subprocess.CompletedProcess(
+            cmd,
+            proc.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+
+    def parse(self, result: subprocess.CompletedProcess, json_output: bool) -> dict | list:
+        if result.returncode != 0:
+            stderr = result.stderr.strip()
+            stdout = result.stdout.strip()
+            error = error_result(
+                stderr or stdout or f"Command failed with exit code {result.returncode}"
+            )
+            error["exit_code"] = result.returncode
+            return error
+
+        stdout = result.stdout.strip()
+        if not stdout:
+            return {"output": "OK"}
+
+        if json_output:
+            try:
+                return json.loads(stdout)
+            except json.JSONDecodeError:
+                return {"output": stdout}
+
+        return {"output": stdout}
+
+    def reset(self, profile):
+        if pool:
+            pool.discard(profile)
+
+
+class InProcessExecutor(Executor):
+    """Calls the notebooklm-mcp-cli client directly, reusing one session per profile.
+
+    Handlers return the same data `nlm ... --json` would print, without the
+    process spawn or the JSON round trip. Anything without a handler (writes,
+    non-JSON output, login) is delegated to the subprocess executor.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, fallback: Executor):
+        self.fallback = fallback
+        self._clients: dict[str, object] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        # command -> (handler, positional count, options that take a value)
+        self._handlers = {
+            ("notebook", "list"): (self._notebook_list, 0, ()),
+            ("notebook", "get"): (self._notebook_get, 1, ()),
+            ("notebook", "query"): (
+                self._notebook_query, 2, ("--source-ids", "-s", "--conversation-id", "-c"),
+            ),
+            ("source", "list"): (self._source_list, 1, ()),
+            ("note", "list"): (self._note_list, 1, ()),
+            ("share", "status"): (self._share_status, 1, ()),
+            ("studio", "status"): (self._studio_status, 1, ()),
+        }
+
+    def execute(self, args, profile, json_output, timeout):
+        spec = self._handlers.get(tuple(args[:2]))
+        if spec is None or not json_output:
+            return self.fallback.execute(args, profile, json_output, timeout)
+        handler, positionals, value_options = spec
+
+        import httpx
+        from notebooklm_tools.core.alias import get_alias_manager
+        from notebooklm_tools.core.errors import ClientAuthenticationError, NotebookLMError
+        from notebooklm_tools.core.exceptions import AuthenticationError, NLMError
+        from notebooklm_tools.services import ServiceError
+
+        positional, options = _split_args(args[2:], positionals, value_options)
+        if positional:
+            positional[0] = get_alias_manager().resolve(positional[0])
+
+        with self._lock(profile):
+            try:
+                client = self._client(profile)
+                return handler(client, positional, options)
+            except (AuthenticationError, ClientAuthenticationError) as e:
+                self.reset(profile)
+                return {"error": f"Authentication Error: {e}", "auth_expired": True}
+            except ServiceError as e:
+                return error_result(f"Error: {e.user_message}")
+            except NLMError as e:
+                return error_result(f"Error: {e.message}")
+            except NotebookLMError as e:
+                return error_result(f"Error: {e}")
+            except httpx.TimeoutException as e:
+                return {"error": f"Request timed out: {e}", "timed_out": True}
+            except httpx.TransportError as e:
+                return {"error": f"Network error: {e}", "error_kind": "transient"}
+            except Exception as e:
+                logger.exception("in-process nlm %s failed", " ".join(args[:2]))
+                return {"error": f"Unexpected Error: {e}"}
+
+    async def execute_async(self, args, profile, json_output, timeout):
+        if tuple(args[:2]) not in self._handlers or not json_output:
+            return await self.fallback.execute_async(args, profile, json_output, timeout)
+        return await super().execute_async(args, profile, json_output, timeout)
+
+    def reset(self, profile):
+        with self._guard:
+            client = self._clients.pop(profile, None)
+        if client is not None:
+            client.close()
+        self.fallback.reset(profile)
+
+    def _lock(self, profile: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(profile, threading.Lock())
+
+    def _client(self, profile: str):
+        client = self._clients.get(profile)
+        if client is None:
+            from notebooklm_tools.core.auth import AuthManager
+            from notebooklm_tools.core.client import NotebookLMClient
+            from notebooklm_tools.core.exceptions import ProfileNotFoundError
+
+            manager = AuthManager(profile)
+            if not manager.profile_exists():
+                raise ProfileNotFoundError(profile)
+            p = manager.load_profile()
+            client = NotebookLMClient(
+                cookies=p.cookies,
+                csrf_token=p.csrf_token or "",
+                session_id=p.session_id or "",
+            )
+            self._clients[profile] = client
+        return client
+
+    # --- Handlers: mirror the CLI's --json output shapes ---
+
+    def _notebook_list(self, client, positional, options):
+        data = []
+        for nb in client.list_notebooks():
+            src_count = getattr(nb, "source_count", None) or getattr(nb, "sources_count", 0)
+            item = {"id": nb.id, "title": nb.title, "source_count": src_count}
+            updated = getattr(nb, "modified_at", None) or getattr(nb, "updated_at", None)
+            if updated:
+                item["updated_at"] = updated if isinstance(updated, str) else updated.isoformat()
+            data.append(item)
+        return data
+
+    def _notebook_get(self, client, positional, options):
+        from notebooklm_tools.services import notebooks as notebooks_service
+
+        return {"value": notebooks_service.get_notebook(client, positional[0])}
+
+    def _notebook_query(self, client, positional, options):
+        from notebooklm_tools.services import chat as chat_service
+
+        source_ids = options.get("--source-ids") or options.get("-s")
+        result = chat_service.query(
+            client,
+            positional[0],
+            positional[1],
+            source_ids=source_ids.split(",") if source_ids else None,
+            conversation_id=options.get("--conversation-id") or options.get("-c"),
+        )
+        return {"value": result}
+
+    def _source_list(self, client, positional, options):
+        return [
+            {
+                "id": src.get("id", ""),
+                "title": src.get("title", ""),
+                "type": src.get("source_type_name") or src.get("type", ""),
+                "url": src.get("url", ""),
+            }
+            for src in client.get_notebook_sources_with_types(positional[0])
+        ]
+
+    def _note_list(self, client, positional, options):
+        from notebooklm_tools.services import notes as notes_service
+
+        return notes_service.list_notes(client, positional[0])
+
+    def _share_status(self, client, positional, options):
+        from notebooklm_tools.services import sharing as sharing_service
+
+        return sharing_service.get_share_status(client, positional[0])
+
+    def _studio_status(self, client, positional, options):
+        data = []
+        for art in client.poll_studio_status(positional[0]):
+            if isinstance(art, dict):
+                item = {
+                    "id": art.get("artifact_id", art.get("id", "")),
+                    "type": art.get("type", ""),
+                    "status": art.get("status", ""),
+                    "custom_instructions": art.get("custom_instructions", None),
+                }
+            else:
+                item = {
+                    "id": art.id,
+                    "type": art.type,
+                    "status": art.status,
+                    "custom_instructions": getattr(art, "custom_instructions", None),
+                }
+            data.append(item)
+        return data
+
+
+async def _read_lines(proc: asyncio.subprocess.Process, on_line) -> tuple[bytes, bytes]:
+    """communicate(), but calling on_line(str) for each stdout line as it arrives.
+
+    stdout is read in chunks rather than by readline, which gives up on lines
+    over the stream's 64 KiB limit (a --json payload can be one such line).
+    """
+
+    async def pump() -> bytes:
+        chunks, partial = [], b""
+        while chunk := await proc.stdout.read(65536):
+            chunks.append(chunk)
+            *lines, partial = (partial + chunk).split(b"\n")
+            for raw in lines:
+                on_line(raw.decode(errors="replace"))
+        if partial:
+            on_line(partial.decode(errors="replace"))
+        return b"".join(chunks)
+
+    stdout, stderr = await asyncio.gather(pump(), proc.stderr.read())
+    await proc.wait()
+    return stdout, stderr
+
+
+def _split_args(args: list[str], positionals: int, value_options) -> tuple[list[str], dict[str, str]]:
+    """Split one command's args into positionals and option -> value (flags map to "").
+
+    The tools put positionals first, so the first `positionals` args are taken
+    as given: a question or title starting with "-" is not an option. After
+    that, an option in `value_options` always consumes the next arg.
+    """
+    positional, options = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if len(positional) < positionals:
+            positional.append(arg)
+        elif arg in value_options and i + 1 < len(args):
+            options[arg] = args[i + 1]
+            i += 1
+        elif arg.startswith("-") and len(arg) > 1:
+            options[arg] = ""
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, options
+
+
+def _make_executor(name: str) -> Executor:
+    subprocess_executor = SubprocessExecutor()
+    if name == "inprocess":
+        try:
+            import notebooklm_tools  # noqa: F401
+        except ImportError:
+            logger.warning("notebooklm-mcp-cli not importable; using the subprocess backend")
+            return subprocess_executor
+        return InProcessExecutor(fallback=subprocess_executor)
+    if name != "subprocess":
+        logger.warning("Unknown NLM_BACKEND '%s'; using the subprocess backend", name)
+    return subprocess_executor
+
+
+executor: Executor = _make_executor(NLM_BACKEND)
@@ -1,12 +1,198 @@
-"""Shared subprocess runner for the nlm CLI."""
+"""Shared runner for the nlm CLI (sync and asyncio variants)."""
 
-import json
+import asyncio
 import os
-import shutil
-import subprocess
+import re
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-NLM_PATH = shutil.which("nlm") or "nlm"
+from . import metrics, tracing
+from .admission import admit, admit_async
+from .answers import answer_cache
+from .cache import private_loop, read_cache
+from .commands import read_only
+from .executors import NLM_PATH, USAGE_EXIT_CODE, executor  # noqa: F401  (NLM_PATH re-exported)
+from .resilience import backoff, breaker, classify, should_retry
+from .singleflight import inflight
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I)
+_RESEARCH_STATUS_RE = re.compile(r"^\s*Status:\s*(.+?)\s*$", re.M)
+_RESEARCH_TASK_RE = re.compile(r"^\s*Task ID:\s*(\S+)", re.M)
+_RESEARCH_COUNT_RE = re.compile(r"^\s*Sources (?:found|found so far|available):\s*(\d+)", re.M)
+
+MAX_DEADLINE = 900  # longest await_research wait, in seconds
+POLL_INITIAL = 2.0  # first status check after this many seconds, doubling...
+POLL_MAX = 30.0  # ...up to this
+IMPORTED_TTL = 24 * 3600  # remember an imported task this long...
+MAX_IMPORTED = 1000  # ...and at most this many
+
+# (profile, notebook_id, task_id) of research tasks already imported → when to
+# forget them, so an import happens once per task however many callers wait on it
+_imported: OrderedDict[tuple[str, str, str], float] = OrderedDict()
+_imported_lock = threading.Lock()
+
+
+def find_id(result: dict) -> str | None:
+    """Pull the first UUID out of a plain-text nlm result (e.g. `notebook create`)."""
+    if not isinstance(result, dict) or "error" in result:
+        return None
+    match = _UUID_RE.search(str(result.get("output", "")))
+    return match.group(0) if match else None
+
+
+def research_state(result: dict) -> dict:
+    """Read `nlm research status` (or a refused `research start`) text.
+
+    Returns {"status", "task_id", "sources_found"}; status is one of the
+    CLI's values (completed, in_progress, pending, failed, ...), "no_research",
+    or "unknown" when the text doesn't say.
+    """
+    text = str(result.get("output") or result.get("error") or "") if isinstance(result, dict) else ""
+    status = _RESEARCH_STATUS_RE.search(text)
+    task = _RESEARCH_TASK_RE.search(text)
+    count = _RESEARCH_COUNT_RE.search(text)
+    state = status.group(1).lower() if status else "unknown"
+    if "no research" in state:
+        state = "no_research"
+    elif "already in progress" in text:
+        state = "in_progress"
+    elif "completed with sources not yet imported" in text:
+        state = "completed"
+    return {
+        "status": state,
+        "task_id": task.group(1) if task else None,
+        "sources_found": int(count.group(1)) if count else 0,
+    }
+
+
+def run_sync(coro):
+    """Run a coroutine to completion from sync code.
+
+    Used by the sync variants of composite tools. Runs on a private event
+    loop, in a worker thread if this thread already has one running.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_on_private_loop(coro))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _on_private_loop(coro)).result()
+
+
+async def _on_private_loop(coro):
+    private_loop.set(True)
+    return await coro
+
+
+def _observe(args: list[str], profile: str, result, seconds: float):
+    """Record one backend execution in the /metrics counters; returns the outcome."""
+    labels = {"command": metrics.command_label(args), "profile": profile}
+    error = result.get("error") if isinstance(result, dict) else None
+    if error is None:
+        outcome = "ok"
+    elif result.get("timed_out"):
+        outcome = "timeout"
+    else:
+        outcome = "error"
+    metrics.command_seconds.observe(seconds, **labels)
+    metrics.commands.inc(outcome=outcome, **labels)
+    if isinstance(result, dict) and result.get("auth_expired"):
+        metrics.auth_expired.inc(**labels)
+    return outcome
+
+
+def _span(args: list[str], profile: str, timeout: int, attempt: int):
+    """The trace span for one execution, a child of the calling tool's span."""
+    command = metrics.command_label(args)
+    return tracing.span(
+        f"nlm {command}",
+        **{"nlm.command": command, "nlm.profile": profile, "nlm.timeout": timeout, "nlm.attempt": attempt},
+    )
+
+
+def _shared(args: list[str], profile: str, json_output: bool, timeout: int):
+    """_execute, joining an identical read-only call already in flight (see singleflight.py)."""
+    if inflight is None or not read_only(args):
+        return _execute(args, profile, json_output, timeout)
+    return inflight.do((profile, tuple(args), json_output), lambda: _execute(args, profile, json_output, timeout))
+
+
+async def _shared_async(args: list[str], profile: str, json_output: bool, timeout: int):
+    """Async variant of _shared."""
+    if inflight is None or not read_only(args):
+        return await _execute_async(args, profile, json_output, timeout)
+    return await inflight.do_async(
+        (profile, tuple(args), json_output), lambda: _execute_async(args, profile, json_output, timeout)
+    )
+
+
+def _execute(args: list[str], profile: str, json_output: bool, timeout: int):
+    """Run one command through the profile's circuit breaker, retrying transient failures."""
+    rejected = breaker.check(profile, args)
+    if rejected is not None:
+        return rejected
+    attempt = 0
+    try:
+        while True:
+            result = _attempt(args, profile, json_output, timeout, attempt)
+            if not should_retry(args, result, attempt):
+                break
+            metrics.retries.inc(command=metrics.command_label(args), profile=profile, kind=result["error_kind"])
+            time.sleep(backoff(attempt, result["error_kind"]))
+            attempt += 1
+    except BaseException:
+        breaker.abandon(profile)
+        raise
+    breaker.settle(profile, args, result)
+    return result
+
+
+async def _execute_async(args: list[str], profile: str, json_output: bool, timeout: int):
+    """Async variant of _execute."""
+    rejected = breaker.check(profile, args)
+    if rejected is not None:
+        return rejected
+    attempt = 0
+    try:
+        while True:
+            result = await _attempt_async(args, profile, json_output, timeout, attempt)
+            if not should_retry(args, result, attempt):
+                break
+            metrics.retries.inc(command=metrics.command_label(args), profile=profile, kind=result["error_kind"])
+            await asyncio.sleep(backoff(attempt, result["error_kind"]))
+            attempt += 1
+    except BaseException:
+        breaker.abandon(profile)
+        raise
+    breaker.settle(profile, args, result)
+    return result
+
+
+def _attempt(args: list[str], profile: str, json_output: bool, timeout: int, attempt: int):
+    """Run one command on the backend once admitted, timed, counted and traced."""
+    with _span(args, profile, timeout, attempt) as span:
+        with admit(args, profile):
+            started = time.monotonic()
+            result = executor.execute(args, profile, json_output, timeout)
+        span.set_attribute("nlm.outcome", _observe(args, profile, result, time.monotonic() - started))
+        classify(result)
+        tracing.record_result(span, result)
+    return result
+
+
+async def _attempt_async(args: list[str], profile: str, json_output: bool, timeout: int, attempt: int):
+    """Async variant of _attempt."""
+    with _span(args, profile, timeout, attempt) as span:
+        async with admit_async(args, profile):
+            started = time.monotonic()
+            result = await executor.execute_async(args, profile, json_output, timeout)
+        span.set_attribute("nlm.outcome", _observe(args, profile, result, time.monotonic() - started))
+        classify(result)
+        tracing.record_result(span, result)
+    return result
 
 
 def run_nlm(
@@ -17,6 +203,15 @@ def run_nlm(
 ) -> dict:
     """Execute an nlm CLI command and return parsed output.
 
+    The command runs on the backend selected by NLM_BACKEND (see executors.py)
+    once the profile's scheduler admits it (admission.py), and each execution
+    is recorded for /metrics (see metrics.py). Errors carry an error_kind;
+    transient failures of reads are retried, and a profile whose upstream keeps
+    failing fails fast for a while (see resilience.py). List/get/status reads
+    go through the read cache (see cache.py) and share an identical call
+    already in flight (singleflight.py); every other command invalidates the
+    cached reads and answers (answers.py) it affects.
+
     Args:
         args: Command arguments (e.g. ["notebook", "list"]).
         profile: Auth profile name.
@@ -25,45 +220,53 @@ def run_nlm(
 
     Returns:
         dict with either parsed JSON data or {"output": raw_text} on success,
-        or {"error": message} on failure.
+        or {"error": message, "error_kind": kind} on failure.
     """
-    cmd = [NLM_PATH] + args + ["--profile", profile]
-    if json_output:
-        cmd.append("--json")
+    if read_cache and read_cache.cacheable(args, json_output):
+        return read_cache.read_through(
+            args, profile, lambda: _shared(args, profile, json_output, timeout)
+        )
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+    result = _shared(args, profile, json_output, timeout)
+    if read_cache:
+        read_cache.invalidate_after(args, profile)
+    if answer_cache:
+        answer_cache.invalidate_after(args, profile)
+
+    if args[:1] == ["login"] and "--check" not in args and "error" not in result:
+        # New cookies on disk — drop sessions and workers warmed up before
+        executor.reset(profile)
+
+    return result
+
+
+async def run_nlm_async(
+    args: list[str],
+    profile: str = "default",
+    json_output: bool = True,
+    timeout: int = 120,
+) -> dict:
+    """Async variant of run_nlm.
+
+    On the subprocess backend this runs on asyncio.create_subprocess_exec, so
+    long commands don't hold a thread; cancelling the caller kills the process.
+    Arguments and return value are the same as run_nlm.
+    """
+    if read_cache and read_cache.cacheable(args, json_output):
+        return await read_cache.read_through_async(
+            args, profile, lambda: _shared_async(args, profile, json_output, timeout)
         )
-    except subprocess.TimeoutExpired:
-        return {"error": f"Command timed out after {timeout}s: {' '.join(cmd)}"}
-    except FileNotFoundError:
-        return {"error": f"nlm CLI not found at {NLM_PATH}. Is it installed?"}
-
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
-        stdout = result.stdout.strip()
-        msg = stderr or stdout or f"Command failed with exit code {result.returncode}"
-        error_result = {"error": msg}
-        auth_keywords = ["unauthorized", "401", "auth", "cookie", "session expired", "login required"]
-        if any(kw in msg.lower() for kw in auth_keywords):
-            error_result["auth_expired"] = True
-        return error_result
-
-    stdout = result.stdout.strip()
-    if not stdout:
-        return {"output": "OK"}
-
-    if json_output:
-        try:
-            return json.loads(stdout)
-        except json.JSONDecodeError:
-            return {"output": stdout}
 
-    return {"output": stdout}
+    result = await _shared_async(args, profile, json_output, timeout)
+    if read_cache:
+        read_cache.invalidate_after(args, profile)
+    if answer_cache:
+        answer_cache.invalidate_after(args, profile)
+
+    if args[:1] == ["login"] and "--check" not in args and "error" not in result:
+        executor.reset(profile)
+
+    return result
 
 
 def run_nlm_with_tempfile(
@@ -106,3 +309,113 @@ def run_nlm_with_tempfile(
             os.unlink(path)
         except OSError:
             pass
+
+
+async def run_nlm_with_tempfile_async(
+    args_before: list[str],
+    file_content: str,
+    args_after: list[str] | None = None,
+    profile: str = "default",
+    json_output: bool = False,
+    timeout: int = 30,
+) -> dict:
+    """Async variant of run_nlm_with_tempfile."""
+    fd, path = tempfile.mkstemp(suffix=".txt", prefix="nlm_")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(file_content)
+        full_args = args_before + ["--file", path] + (args_after or [])
+        return await run_nlm_async(
+            full_args,
+            profile=profile,
+            json_output=json_output,
+            timeout=timeout,
+        )
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# --- Research tasks (shared by tools.research and tools.workflows) ---
+
+
+async def await_research(profile: str, notebook_id: str, deadline: int) -> dict:
+    """Poll `research status` with exponential backoff until done or deadline."""
+    deadline = max(0, min(deadline, MAX_DEADLINE))
+    started = time.monotonic()
+    delay = POLL_INITIAL
+    while True:
+        result = await run_nlm_async(
+            ["research", "status", notebook_id, "--max-wait", "0"],
+            profile=profile,
+            json_output=False,
+        )
+        if "error" in result:
+            return result
+        state = research_state(result)
+        waited = round(time.monotonic() - started)
+        if state["status"] == "completed":
+            return {**state, "waited_seconds": waited}
+        if state["status"] in ("failed", "no_research"):
+            return {"error": f"Research {state['status'].replace('_', ' ')}.", **state}
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            return {
+                "error": f"Research still running after {waited}s.",
+                "action": "Call wait_for_research again later; it imports once when done.",
+                **state,
+            }
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, POLL_MAX)
+
+
+def _claim_import(key: tuple[str, str, str]) -> bool:
+    """Mark a task as imported; False if it already was (or is being) imported."""
+    now = time.monotonic()
+    with _imported_lock:
+        while _imported and next(iter(_imported.values())) <= now:
+            _imported.popitem(last=False)
+        if key in _imported:
+            return False
+        _imported[key] = now + IMPORTED_TTL
+        while len(_imported) > MAX_IMPORTED:
+            _imported.popitem(last=False)
+        return True
+
+
+async def import_once(profile: str, notebook_id: str, state: dict) -> dict:
+    """Import a completed research task's sources, at most once per task."""
+    task_id = state.get("task_id")
+    # Without a task ID there is nothing to tell one research run from the
+    # next, so the import isn't deduplicated at all
+    key = (profile, notebook_id, task_id)
+    if task_id and not _claim_import(key):
+        return {**state, "imported": False, "already_imported": True}
+    args = ["research", "import", notebook_id]
+    if task_id:
+        args.append(task_id)
+    result = await run_nlm_async(args, profile=profile, json_output=False, timeout=300)
+    if "error" not in result:
+        return {**state, "imported": True, "output": result.get("output")}
+    if _never_ran(result):
+        with _imported_lock:
+            _imported.pop(key, None)  # nothing landed; a retry may import
+        return {**result, **state, "imported": False}
+    # A timeout or an upstream error can come after the import landed: keep
+    # the claim rather than risk importing every source twice
+    return {
+        **result,
+        **state,
+        "imported": False,
+        "may_have_imported": True,
+        "action": "Check list_sources: the sources may have been imported. If they "
+        "are missing, start the research again.",
+    }
+
+
+def _never_ran(result: dict) -> bool:
+    """Whether a failed command provably changed nothing upstream."""
+    # Exit code 2 is the CLI rejecting its arguments before doing anything
+    return result.get("exit_code") == USAGE_EXIT_CODE or bool(result.get("circuit_open"))
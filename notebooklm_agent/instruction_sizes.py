@@ -0,0 +1,24 @@
+"""Print the estimated token size of every instruction section.
+
+    python -m notebooklm_agent.instruction_sizes
+
+Sections marked * are CORE: the static instruction sent on every call. The
+rest are added per call by instructions.build_instruction.
+"""
+
+from .instructions import CORE, section_report
+
+
+def main():
+    report = section_report()
+    width = max(map(len, report["sections"]))
+    for name, size in report["sections"].items():
+        marker = "*" if name in CORE else " "
+        print(f"{marker} {name:<{width}}  {size:>5}")
+    core = section_report(list(CORE))["total"]
+    print(f"  {'core':<{width}}  {core:>5}")
+    print(f"  {'full':<{width}}  {report['total']:>5}")
+
+
+if __name__ == "__main__":
+    main()
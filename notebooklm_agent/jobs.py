@@ -0,0 +1,205 @@
+"""Background jobs for long nlm operations.
+
+A tool called with background=True hands its work to the job manager and
+returns a job ID straight away instead of holding the chat turn for minutes.
+Jobs run on a dedicated event loop thread, at most JOB_WORKERS at a time
+(the rest wait as "queued"), can be cancelled, and are kept for
+JOB_RETENTION seconds after they finish so job_status can still report them.
+A job belongs to the ADK session that started it: only that session can look
+it up, list it or cancel it.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+from .progress import progress_hub, session_var
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("NLM_JOB_WORKERS", "4"))
+JOB_RETENTION = int(os.environ.get("NLM_JOB_RETENTION", "3600"))  # seconds after finishing
+MAX_JOBS = 500  # retained jobs, oldest finished dropped first
+
+ACTIVE = ("queued", "running")
+
+
+class Job:
+    """One background operation and its outcome."""
+
+    def __init__(self, kind: str, description: str, profile: str, owner: str | None):
+        self.id = secrets.token_urlsafe(16)
+        self.kind = kind
+        self.description = description
+        self.profile = profile
+        self.owner = owner  # ADK session ID of the caller, if any
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result = None
+        self.error: str | None = None
+        self.future: Future | None = None
+
+    def finish(self, status: str, result=None, error: str | None = None):
+        self.status = status
+        self.result = result
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        end = self.finished_at or time.time()
+        info = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "description": self.description,
+            "status": self.status,
+            "elapsed_seconds": round(end - (self.started_at or self.created_at)),
+        }
+        if self.error:
+            info["error"] = self.error
+        if include_result and self.result is not None:
+            info["result"] = self.result
+        return info
+
+
+class JobManager:
+    """Runs jobs on a private event loop with bounded concurrency."""
+
+    def __init__(self, workers: int = JOB_WORKERS, retention: int = JOB_RETENTION):
+        self.workers = workers
+        self.retention = retention
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def submit(
+        self,
+        kind: str,
+        description: str,
+        factory: Callable[[], Awaitable],
+        profile: str = "default",
+        owner: str | None = None,
+    ) -> Job:
+        """Start factory() in the background; returns the (queued) job."""
+        loop = self._ensure_loop()
+        job = Job(kind, description, profile, owner)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, factory), loop)
+        job.future.add_done_callback(lambda f: self._settle(job, f))
+        return job
+
+    def get(self, job_id: str, owner: str | None) -> Job | None:
+        """The job, if it exists and belongs to owner."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        return job if job is not None and job.owner == owner else None
+
+    def list(self, owner: str | None) -> list[Job]:
+        """owner's retained jobs, newest first."""
+        with self._lock:
+            self._prune()
+            jobs = [j for j in self._jobs.values() if j.owner == owner]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def cancel(self, job_id: str, owner: str | None) -> Job | None:
+        """Cancel owner's queued or running job; running nlm processes are killed."""
+        job = self.get(job_id, owner)
+        if job is not None and job.status in ACTIVE and job.future is not None:
+            job.future.cancel()
+        return job
+
+    def close(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+            loop = self._loop
+        for job in jobs:
+            if job.status in ACTIVE and job.future is not None:
+                job.future.cancel()
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _run(self, job: Job, factory: Callable[[], Awaitable]):
+        session_var.set(job.owner)  # progress from the job's commands goes to its session
+        async with self._slots:
+            job.status = "running"
+            job.started_at = time.time()
+            self._announce(job)
+            try:
+                result = await factory()
+            except asyncio.CancelledError:
+                job.finish("cancelled")
+                self._announce(job)
+                raise
+            except Exception as e:
+                logger.exception("job %s (%s) failed", job.id, job.kind)
+                job.finish("failed", error=f"Unexpected Error: {e}")
+                self._announce(job)
+                return
+        if isinstance(result, dict) and "error" in result:
+            job.finish("failed", result=result, error=result["error"])
+        else:
+            job.finish("succeeded", result=result)
+        self._announce(job)
+
+    def _settle(self, job: Job, future: Future):
+        # A job cancelled while still queued never reaches _run's handler
+        if future.cancelled() and job.status in ACTIVE:
+            job.finish("cancelled")
+            self._announce(job)
+
+    @staticmethod
+    def _announce(job: Job):
+        if job.owner:
+            progress_hub.publish(job.owner, {"type": "job", **job.to_dict(include_result=False)})
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="nlm-jobs", daemon=True).start()
+                self._slots = asyncio.Semaphore(self.workers)
+                self._loop = loop
+            return self._loop
+
+    def _prune(self):
+        """Drop finished jobs past retention, then the oldest beyond MAX_JOBS (lock held)."""
+        cutoff = time.time() - self.retention
+        for job_id in [i for i, j in self._jobs.items() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished_at), key=lambda j: j.finished_at
+        )
+        for job in finished[: max(0, len(self._jobs) - MAX_JOBS)]:
+            del self._jobs[job.id]
+
+
+def start_job(tool_context, kind: str, description: str, factory: Callable[[], Awaitable]) -> dict:
+    """Submit a tool's work as a job and build the tool's immediate reply."""
+    session = getattr(tool_context, "session", None)
+    job = job_manager.submit(
+        kind,
+        description,
+        factory,
+        profile=tool_context.state.get("profile", "default"),
+        owner=getattr(session, "id", None),
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "message": f"{description} is running in the background. Check it with job_status.",
+    }
+
+
+job_manager = JobManager()
+atexit.register(job_manager.close)
@@ -0,0 +1,177 @@
+"""Process-local metrics in the Prometheus text format, stdlib only.
+
+Counters, gauges and histograms with labels, rendered by Registry.render()
+for the server's /metrics route. Each server process keeps its own values;
+scrape every worker (or run one) to see them all.
+
+What's recorded:
+
+    nlm_command_duration_seconds  histogram  command, profile
+    nlm_commands_total            counter    command, profile, outcome (ok, error, timeout)
+    nlm_auth_expired_total        counter    command, profile
+    nlm_exit_codes_total          counter    command, profile, code  (subprocess backend)
+    nlm_stdout_bytes              histogram  command, profile         (subprocess backend)
+    agent_tool_calls_total        counter    tool, decision (allowed, blocked)
+    nlm_admission_queue_depth     gauge      profile, lane (interactive, bulk)
+    nlm_admission_wait_seconds    histogram  profile, lane
+    nlm_retries_total             counter    command, profile, kind (transient, rate_limited)
+    nlm_circuit_open              gauge      profile (1 while failing fast)
+    nlm_coalesced_total           counter    command, profile (calls that joined one in flight)
+"""
+
+import bisect
+import re
+import threading
+
+_ID_RE = re.compile(r"^[0-9a-f]{8}-|^/|^https?:", re.I)
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def command_label(args: list[str]) -> str:
+    """The nlm subcommand ("notebook list", "login --check"), without IDs, paths or URLs."""
+    return " ".join(a for a in args[:2] if not _ID_RE.match(a)) or "nlm"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_labels(self.label_names, key)} {value}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DURATION_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])  # counts, sum, count
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            le = 'le="%s"' % bound
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+        le = 'le="+Inf"'
+        lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {count}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {total}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+command_seconds = registry.register(Histogram(
+    "nlm_command_duration_seconds", "Wall time of nlm command executions.", ("command", "profile")
+))
+commands = registry.register(Counter(
+    "nlm_commands_total", "nlm command executions by outcome.", ("command", "profile", "outcome")
+))
+auth_expired = registry.register(Counter(
+    "nlm_auth_expired_total", "nlm commands that failed with an auth error.", ("command", "profile")
+))
+exit_codes = registry.register(Counter(
+    "nlm_exit_codes_total", "Exit codes of nlm processes.", ("command", "profile", "code")
+))
+stdout_bytes = registry.register(Histogram(
+    "nlm_stdout_bytes", "Bytes nlm printed to stdout.", ("command", "profile"), BYTES_BUCKETS
+))
+tool_calls = registry.register(Counter(
+    "agent_tool_calls_total", "Tool calls seen by the auth guard.", ("tool", "decision")
+))
+admission_queue = registry.register(Gauge(
+    "nlm_admission_queue_depth", "nlm commands waiting for an admission slot.", ("profile", "lane")
+))
+admission_wait = registry.register(Histogram(
+    "nlm_admission_wait_seconds", "Time nlm commands waited for admission.", ("profile", "lane")
+))
+retries = registry.register(Counter(
+    "nlm_retries_total", "nlm commands retried after a transient failure.", ("command", "profile", "kind")
+))
+circuit_open = registry.register(Gauge(
+    "nlm_circuit_open", "1 while a profile's circuit breaker fails commands fast.", ("profile",)
+))
+coalesced = registry.register(Counter(
+    "nlm_coalesced_total", "Read calls that shared an identical call already in flight.", ("command", "profile")
+))
@@ -0,0 +1,229 @@
+"""Pool of long-lived nlm worker processes, kept per auth profile.
+
+Spawning `nlm` costs a cold interpreter start and a full import of
+notebooklm-mcp-cli on every tool call. The pool keeps a few warm workers
+(see worker.py) per profile and hands commands to them over a pipe.
+
+run() returns a subprocess.CompletedProcess, or None when no worker can take
+the command (pool saturated, worker failed to start or died before the command
+reached it) — the caller then falls back to spawning `nlm` directly. A worker
+that fails after the command reached it may already have applied it, so only
+read-only commands (commands.py) fall back then; anything else gets an error
+result instead of running a second time.
+"""
+
+import atexit
+import json
+import logging
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .commands import read_only
+
+logger = logging.getLogger(__name__)
+
+POOL_ENABLED = os.environ.get("NLM_WORKER_POOL", "1") != "0"
+POOL_SIZE = int(os.environ.get("NLM_POOL_SIZE", "2"))  # workers per profile
+MAX_COMMANDS = int(os.environ.get("NLM_WORKER_MAX_COMMANDS", "100"))  # recycle after N
+HEALTH_CHECK_AFTER = 60  # ping workers idle longer than this (seconds)
+START_TIMEOUT = 30
+START_FAILURE_COOLDOWN = 300  # don't retry a failing profile for 5 min
+
+WORKER_SCRIPT = Path(__file__).with_name("worker.py")
+
+
+class WorkerError(Exception):
+    """The worker died, hung, or spoke garbage; it has been killed.
+
+    dispatched is False when the request never reached the worker.
+    """
+
+    def __init__(self, message: str, dispatched: bool = True):
+        super().__init__(message)
+        self.dispatched = dispatched
+
+
+class Worker:
+    """One warm nlm worker process bound to a profile."""
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.commands = 0
+        self.last_used = time.monotonic()
+        self._pending = b""  # reply bytes read past the last newline
+        self.proc = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # First ping blocks until the CLI import has finished
+        self._request({"op": "ping"}, START_TIMEOUT)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def healthy(self) -> bool:
+        """Cheap liveness check; pings only if the worker sat idle for a while."""
+        if not self.alive():
+            return False
+        if time.monotonic() - self.last_used < HEALTH_CHECK_AFTER:
+            return True
+        try:
+            return self._request({"op": "ping"}, 5).get("ok", False)
+        except (WorkerError, TimeoutError):
+            return False
+
+    def run(self, args: list[str], timeout: int) -> dict:
+        reply = self._request({"op": "run", "args": args}, timeout)
+        self.commands += 1
+        self.last_used = time.monotonic()
+        return reply
+
+    def kill(self):
+        if self.alive():
+            self.proc.kill()
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def _request(self, msg: dict, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        try:
+            self.proc.stdin.write((json.dumps(msg) + "\n").encode())
+            self.proc.stdin.flush()
+        except OSError as e:
+            self.kill()
+            raise WorkerError(f"could not reach worker: {e}", dispatched=False) from e
+        try:
+            return json.loads(self._read_line(deadline, timeout))
+        except TimeoutError:
+            raise  # an OSError too, but the caller handles it as a timeout
+        except (OSError, ValueError) as e:
+            self.kill()
+            raise WorkerError(str(e)) from e
+
+    def _read_line(self, deadline: float, timeout: float) -> bytes:
+        """One reply line, read straight from the pipe so a partial line can't block past deadline."""
+        fd = self.proc.stdout.fileno()
+        while b"\n" not in self._pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                self.kill()
+                raise TimeoutError(f"worker did not answer within {timeout}s")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self.kill()
+                raise WorkerError("worker exited")
+            self._pending += chunk
+        line, _, self._pending = self._pending.partition(b"\n")
+        return line
+
+
+class WorkerPool:
+    """Per-profile pool of warm workers with health checks and recycling."""
+
+    def __init__(self, size: int = POOL_SIZE, max_commands: int = MAX_COMMANDS):
+        self.size = size
+        self.max_commands = max_commands
+        self._idle: dict[str, list[Worker]] = {}
+        self._busy: dict[str, int] = {}
+        self._failed_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def run(
+        self, args: list[str], profile: str, timeout: int
+    ) -> subprocess.CompletedProcess | None:
+        """Run `nlm <args>` on a pooled worker.
+
+        Raises subprocess.TimeoutExpired on timeout (the worker is killed),
+        like subprocess.run does. Returns None if the caller should spawn.
+        args are the full CLI arguments, "--profile" included.
+        """
+        worker = self._checkout(profile)
+        if worker is None:
+            return None
+        try:
+            reply = worker.run(args, timeout)
+        except TimeoutError:
+            self._release(worker, keep=False)
+            raise subprocess.TimeoutExpired(["nlm"] + args, timeout)
+        except WorkerError as e:
+            logger.warning("nlm worker for '%s' failed: %s", profile, e)
+            self._release(worker, keep=False)
+            if not e.dispatched or read_only(args):
+                return None  # nothing ran, or running it again is harmless
+            return subprocess.CompletedProcess(
+                ["nlm"] + args,
+                1,
+                "",
+                f"The nlm worker failed while running the command ({e}); it may or may not "
+                "have taken effect. Check before running it again.",
+            )
+        self._release(worker, keep=worker.commands < self.max_commands)
+        return subprocess.CompletedProcess(
+            ["nlm"] + args, reply["returncode"], reply["stdout"], reply["stderr"]
+        )
+
+    def discard(self, profile: str):
+        """Kill all idle workers for a profile (e.g. after re-login)."""
+        with self._lock:
+            workers = self._idle.pop(profile, [])
+        for w in workers:
+            w.kill()
+
+    def close(self):
+        with self._lock:
+            workers = [w for ws in self._idle.values() for w in ws]
+            self._idle.clear()
+        for w in workers:
+            w.kill()
+
+    def _checkout(self, profile: str) -> Worker | None:
+        while True:
+            with self._lock:
+                idle = self._idle.setdefault(profile, [])
+                if idle:
+                    worker = idle.pop()
+                    self._busy[profile] = self._busy.get(profile, 0) + 1
+                elif self._busy.get(profile, 0) >= self.size:
+                    return None  # saturated — spawn rather than queue
+                elif time.monotonic() - self._failed_at.get(profile, -START_FAILURE_COOLDOWN) < START_FAILURE_COOLDOWN:
+                    return None
+                else:
+                    worker = None
+                    self._busy[profile] = self._busy.get(profile, 0) + 1
+
+            if worker is None:
+                try:
+                    return Worker(profile)
+                except (WorkerError, TimeoutError, OSError) as e:
+                    logger.warning("could not start nlm worker for '%s': %s", profile, e)
+                    with self._lock:
+                        self._busy[profile] -= 1
+                        self._failed_at[profile] = time.monotonic()
+                    return None
+
+            if worker.healthy():
+                return worker
+            self._release(worker, keep=False)
+
+    def _release(self, worker: Worker, keep: bool):
+        if not keep:
+            worker.kill()
+        with self._lock:
+            self._busy[worker.profile] -= 1
+            if keep:
+                self._idle.setdefault(worker.profile, []).append(worker)
+
+
+pool: WorkerPool | None = WorkerPool() if POOL_ENABLED else None
+
+if pool is not None:
+    atexit.register(pool.close)
@@ -0,0 +1,127 @@
+"""Live progress events for long nlm commands, per ADK session.
+
+auth_guard records the calling session in session_var before each tool runs.
+While that session has a live subscriber, long commands (STREAMED) run on a
+streaming subprocess whose stdout lines are parsed into events as they
+arrive; otherwise they keep the warm worker pool. Background jobs publish
+their start and finish. Events fan out to any /progress/{session} SSE
+subscriber (see server.py), and the last few are replayed to late joiners.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+HISTORY = 50  # events kept per session for late subscribers
+MAX_SESSIONS = 256
+
+# Commands worth streaming: they print as they go and can run for minutes
+STREAMED = {
+    ("source", "add"),
+    ("research", "import"),
+    ("download",),
+    ("audio", "create"),
+    ("video", "create"),
+    ("slides", "create"),
+    ("infographic", "create"),
+    ("report", "create"),
+    ("quiz", "create"),
+    ("flashcards", "create"),
+    ("mindmap", "create"),
+    ("data-table", "create"),
+}
+
+session_var: ContextVar[str | None] = ContextVar("nlm_progress_session", default=None)
+
+_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_PERCENT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+_STAGES = [
+    ("error", ("error:",)),
+    ("uploading", ("uploading",)),
+    ("processing", ("waiting for processing", "processing")),
+    ("done", ("added source", "imported", "downloaded", "created", "generation started")),
+]
+
+
+def streamed(args: list[str]) -> bool:
+    return tuple(args[:2]) in STREAMED or tuple(args[:1]) in STREAMED
+
+
+def parse_line(line: str) -> dict | None:
+    """Turn one line of nlm output into an event, or None if it says nothing."""
+    text = _ANSI.sub("", line).strip().lstrip("✓•").strip()
+    if not text:
+        return None
+    event = {"type": "output", "message": text}
+    percent = _PERCENT.search(text)
+    if percent:
+        event["percent"] = min(100, round(float(percent.group(1))))
+    lowered = text.lower()
+    for stage, markers in _STAGES:
+        if any(m in lowered for m in markers):
+            event["stage"] = stage
+            break
+    return event
+
+
+class ProgressHub:
+    """Per-session event history plus live subscriber queues (thread-safe)."""
+
+    def __init__(self, history: int = HISTORY):
+        self.history = history
+        self._events: dict[str, deque] = {}
+        self._subscribers: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, session: str, event: dict):
+        event = {"time": round(time.time(), 3), **event}
+        with self._lock:
+            if session not in self._events and len(self._events) >= MAX_SESSIONS:
+                del self._events[next(iter(self._events))]
+            self._events.setdefault(session, deque(maxlen=self.history)).append(event)
+            subscribers = list(self._subscribers.get(session, []))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def watched(self, session: str) -> bool:
+        """Whether anyone is subscribed to session's events right now."""
+        with self._lock:
+            return bool(self._subscribers.get(session))
+
+    def emit(self, event: dict):
+        """Publish to the current session, if any."""
+        session = session_var.get()
+        if session:
+            self.publish(session, event)
+
+    def recent(self, session: str) -> list[dict]:
+        with self._lock:
+            return list(self._events.get(session, ()))
+
+    async def stream(self, session: str) -> AsyncIterator[dict]:
+        """Yield recent events, then live ones until the consumer stops."""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (loop, queue)
+        with self._lock:
+            backlog = list(self._events.get(session, ()))
+            self._subscribers.setdefault(session, []).append(entry)
+        try:
+            for event in backlog:
+                yield event
+            while True:
+                yield await queue.get()
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(session, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(session, None)
+
+
+progress_hub = ProgressHub()
@@ -0,0 +1,248 @@
+"""Compact tool responses before they reach the model.
+
+Raw `nlm --json` payloads carry IDs, timestamps and metadata the UX rules
+never show. project_response (an after_tool_callback) rewrites each tool's
+result to the fields the agent actually presents — numbered lists of titles
+and counts — and keeps the IDs in session state, where the tools read them
+back from a list number (see resolver.list_ref). Whatever is still over
+RESPONSE_BUDGET bytes is cut to fit; the remainder waits in the result store
+behind a handle the model can page through with fetch_result.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from .resolver import notebook_records
+
+RESPONSE_BUDGET = int(os.environ.get("NLM_RESPONSE_BUDGET", "6000"))  # bytes of JSON per tool response
+RESULT_TTL = int(os.environ.get("NLM_RESULT_TTL", "1800"))  # seconds a remainder stays fetchable
+MAX_RESULTS = 256
+
+UNBUDGETED = {"fetch_result"}  # pages itself
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode())
+
+
+def _records(payload, key: str | None = None) -> list[dict] | None:
+    """Dict records with an ID from a list result, or from payload[key]."""
+    if isinstance(payload, dict) and key:
+        payload = payload.get(key)
+    if not isinstance(payload, list):
+        return None
+    return [r for r in payload if isinstance(r, dict) and r.get("id")]
+
+
+def _numbered(state, key: str, records: list[dict], fields, notebook_id: str | None = None) -> list[dict]:
+    """Number the records for the model; remember their IDs under state[key].
+
+    notebook_id, for lists inside a notebook, goes under state[key + "_notebook"]
+    so a number is never taken from one notebook's list for another.
+    """
+    state[key] = [r["id"] for r in records]
+    state[f"{key}_notebook"] = notebook_id
+    return [{"n": i, **fields(r)} for i, r in enumerate(records, 1)]
+
+
+def _notebooks(result, state, args):
+    records = notebook_records(result)
+    if not records:
+        return result
+    return {
+        "notebooks": _numbered(
+            state,
+            "last_notebook_list",
+            records,
+            lambda r: {"title": r.get("title") or "Untitled", "sources": r.get("source_count", 0)},
+        ),
+        "count": len(records),
+    }
+
+
+def _source_fields(r: dict) -> dict:
+    return {"title": r.get("title") or "Untitled", "type": r.get("type") or r.get("source_type_name") or ""}
+
+
+def _sources(result, state, args):
+    records = _records(result, "sources")
+    if records is None:
+        return result
+    sources = _numbered(state, "last_source_list", records, _source_fields, args.get("notebook_id"))
+    return {"sources": sources, "count": len(records)}
+
+
+def _notebook(result, state, args):
+    if not isinstance(result, dict) or "error" in result:
+        return result
+    projected = {k: result[k] for k in ("title", "source_count", "sources_count") if k in result}
+    records = _records(result, "sources")
+    if records is not None:
+        projected["sources"] = _numbered(
+            state, "last_source_list", records, _source_fields, args.get("notebook_id")
+        )
+    return projected or result
+
+
+def _notes(result, state, args):
+    records = _records(result, "notes")
+    if records is None:
+        return result
+
+    def fields(r):
+        preview = (r.get("content") or r.get("preview") or "").strip()
+        return {"title": r.get("title") or "Untitled", "preview": preview[:160]}
+
+    notes = _numbered(state, "last_note_list", records, fields, args.get("notebook_id"))
+    return {"notes": notes, "count": len(records)}
+
+
+def _artifacts(result, state, args):
+    records = _records(result, "artifacts")
+    if records is None:
+        return result
+
+    def fields(r):
+        entry = {"type": r.get("type", ""), "status": r.get("status", "")}
+        if r.get("title"):
+            entry["title"] = r["title"]
+        return entry
+
+    return {"artifacts": _numbered(state, "last_artifact_list", records, fields, args.get("notebook_id"))}
+
+
+def _query(result, state, args):
+    value = result.get("value", result) if isinstance(result, dict) else result
+    if not isinstance(value, dict) or "error" in value or "answer" not in value:
+        return result
+    projected = {"answer": value["answer"]}
+    if value.get("conversation_id"):
+        projected["conversation_id"] = value["conversation_id"]
+    if value.get("sources_used"):
+        projected["sources_cited"] = len(value["sources_used"])
+    if isinstance(result, dict) and result.get("cached"):
+        projected["cached"] = True
+        projected["note"] = result.get("note")
+    return projected
+
+
+# Tool name → projector(result, state, args) returning what the model should see
+PROJECTORS = {
+    "list_notebooks": _notebooks,
+    "get_notebook": _notebook,
+    "list_sources": _sources,
+    "list_notes": _notes,
+    "studio_status": _artifacts,
+    "query_notebook": _query,
+}
+
+
+class ResultStore:
+    """Remainders of cut responses, by handle, for the session that got them."""
+
+    def __init__(self, ttl: int = RESULT_TTL, max_entries: int = MAX_RESULTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, owner: str | None, field: str, value, position: int) -> str:
+        handle = secrets.token_hex(4)
+        with self._lock:
+            self._prune()
+            self._entries[handle] = {
+                "owner": owner,
+                "field": field,
+                "value": value,
+                "position": position,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def next_page(self, owner: str | None, handle: str, budget: int = RESPONSE_BUDGET) -> dict:
+        """The next part of a remainder that fits the budget, advancing its position."""
+        with self._lock:
+            self._prune()
+            entry = self._entries.get(handle)
+            if entry is None or entry["owner"] != owner:
+                return {"error": f"No stored result '{handle}' (they expire after {self.ttl // 60} minutes)."}
+            value, start = entry["value"], entry["position"]
+            part = _prefix(value[start:], budget - 200)
+            if not part and start < len(value):
+                part = value[start:start + 1]  # one oversized item still goes out whole
+            entry["position"] = start + len(part)
+            page = {"field": entry["field"], "part": part}
+            if entry["position"] < len(value):
+                page["more"] = {"handle": handle, "shown": entry["position"], "total": len(value)}
+            else:
+                del self._entries[handle]
+            return page
+
+    def _prune(self):
+        now = time.monotonic()
+        for handle in [h for h, e in self._entries.items() if e["expires_at"] < now]:
+            del self._entries[handle]
+
+
+result_store = ResultStore()
+
+
+def _prefix(value, room: int):
+    """The longest leading slice of a list or string whose JSON fits in room bytes."""
+    if isinstance(value, list):
+        used, count = 2, 0
+        for item in value:
+            used += _size(item) + 2
+            if used > room:
+                break
+            count += 1
+        return value[:count]
+    low, high = 0, len(value)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _size(value[:mid]) <= room:
+            low = mid
+        else:
+            high = mid - 1
+    return value[:low]
+
+
+def fit_budget(response: dict, owner: str | None, budget: int = RESPONSE_BUDGET) -> dict:
+    """Cut the largest field of an over-budget response and store the rest."""
+    if _size(response) <= budget:
+        return response
+    field = max(response, key=lambda k: _size(response[k]))
+    value = response[field]
+    if not isinstance(value, (list, str)):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    more = {
+        "handle": "0" * 8,
+        "shown": len(value),
+        "total": len(value),
+        "message": "Cut to fit. Call fetch_result with this handle only if you need the rest.",
+    }
+    shown = _prefix(value, budget - _size({**response, field: value[:0], "more": more}))
+    more["handle"] = result_store.put(owner, field, value, len(shown))
+    more["shown"] = len(shown)
+    return {**response, field: shown, "more": more}
+
+
+def project_response(tool, args, tool_context, tool_response):
+    """after_tool_callback: project the result, then hold it to the byte budget."""
+    if tool.name in UNBUDGETED:
+        return None
+    projector = PROJECTORS.get(tool.name)
+    response = tool_response
+    if projector is not None and not (isinstance(response, dict) and "error" in response):
+        response = projector(response, tool_context.state, args or {})
+    if not isinstance(response, dict):
+        response = {"result": response}
+    owner = getattr(getattr(tool_context, "session", None), "id", None)
+    response = fit_budget(response, owner)
+    return None if response is tool_response else response
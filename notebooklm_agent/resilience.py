@@ -0,0 +1,165 @@
+"""Failure classification, retries and circuit breaking for nlm commands.
+
+Every error result gets an error_kind:
+
+    transient     network trouble, 5xx, timeouts — may work if tried again
+    rate_limited  the account is being throttled (429, quota)
+    auth          cookies expired or rejected (auth_expired is set too)
+    not_found     the notebook, source or artifact doesn't exist
+    permanent     anything else: bad arguments, unsupported operation, ...
+
+The executors' structured fields decide first (an error_kind they set,
+auth_expired, timed_out, the CLI's usage exit code); only then is the
+message matched, on whole words and phrases, for HTTP statuses and
+network errors.
+
+Transient and rate-limited failures of read-only commands (commands.py) are
+retried in-process with jittered exponential backoff, so the model doesn't
+spend a turn on it. A timed-out command isn't retried: it already used its
+whole budget. Mutations are never retried — a lost response doesn't mean
+the write didn't happen.
+
+Each profile has a circuit breaker. After BREAKER_THRESHOLD transient or
+rate-limited failures in a row it opens, and commands fail at once with
+circuit_open for BREAKER_COOLDOWN seconds instead of each waiting out its
+timeout. Then one probe goes through; success closes the breaker, failure
+opens it again. Login commands always go through, and a mutation that
+timed out isn't counted either way: a slow write says nothing about
+whether NotebookLM is up.
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from . import metrics
+from .commands import read_only
+from .executors import USAGE_EXIT_CODE
+
+logger = logging.getLogger(__name__)
+
+RETRIES = int(os.environ.get("NLM_RETRIES", "2"))  # extra attempts after the first
+BACKOFF_BASE = 0.5  # seconds; doubles per attempt, full jitter
+BACKOFF_CAP = 8.0
+RATE_LIMIT_BASE = 2.0  # throttled: back off harder
+BREAKER_THRESHOLD = int(os.environ.get("NLM_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = int(os.environ.get("NLM_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_KINDS = {"transient", "rate_limited"}
+
+_RATE_LIMITED = re.compile(r"\b429\b|\brate[ -]limit|too many requests|quota|resource[ _]exhausted", re.I)
+_NOT_FOUND = re.compile(r"\b404\b|\bnot found\b|does not exist|no such (notebook|source|note|artifact|file)|could not find", re.I)
+_TRANSIENT = re.compile(
+    r"\b50[0234]\b|internal server error|bad gateway|service unavailable|temporarily unavailable"
+    r"|connection (reset|refused|aborted|error)|reset by peer|broken pipe|network is unreachable"
+    r"|name resolution|eof occurred",
+    re.I,
+)
+
+
+def classify(result) -> str | None:
+    """The error_kind of a result (set on it too), or None for a success."""
+    if not isinstance(result, dict) or "error" not in result:
+        return None
+    if "error_kind" in result:
+        return result["error_kind"]
+    msg = str(result["error"])
+    if result.get("auth_expired"):
+        kind = "auth"
+    elif result.get("timed_out"):
+        kind = "transient"
+    elif result.get("exit_code") == USAGE_EXIT_CODE:
+        kind = "permanent"
+    elif _RATE_LIMITED.search(msg):
+        kind = "rate_limited"
+    elif _NOT_FOUND.search(msg):
+        kind = "not_found"
+    elif _TRANSIENT.search(msg):
+        kind = "transient"
+    else:
+        kind = "permanent"
+    result["error_kind"] = kind
+    return kind
+
+
+def should_retry(args: list[str], result, attempt: int) -> bool:
+    """Whether attempt (0-based) failed in a way worth another try."""
+    if attempt >= RETRIES or not read_only(args) or not isinstance(result, dict):
+        return False
+    if result.get("timed_out"):
+        return False
+    return classify(result) in RETRYABLE_KINDS
+
+
+def backoff(attempt: int, kind: str | None) -> float:
+    """Seconds to wait before retry number attempt + 1: full jitter, capped."""
+    base = RATE_LIMIT_BASE if kind == "rate_limited" else BACKOFF_BASE
+    return random.uniform(0, min(BACKOFF_CAP, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Consecutive upstream failures by profile; open profiles fail fast."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: int = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: dict[str, int] = {}
+        self._open_until: dict[str, float] = {}
+        self._probing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def check(self, profile: str, args: list[str]) -> dict | None:
+        """The fail-fast result while profile's breaker is open, else None (go ahead)."""
+        if self.threshold <= 0 or args[:1] == ["login"]:
+            return None
+        with self._lock:
+            until = self._open_until.get(profile)
+            if until is None:
+                return None
+            now = time.monotonic()
+            if now >= until and profile not in self._probing:
+                self._probing.add(profile)  # half-open: this call is the probe
+                return None
+            failures = self._failures.get(profile, 0)
+            wait = max(1, int(until - now))
+        return {
+            "error": f"NotebookLM isn't responding ({failures} failures in a row); "
+            f"not trying again for about {wait}s.",
+            "error_kind": "transient",
+            "circuit_open": True,
+        }
+
+    def abandon(self, profile: str):
+        """A call check() let through ended without an outcome (cancelled): free the probe."""
+        with self._lock:
+            self._probing.discard(profile)
+
+    def settle(self, profile: str, args: list[str], result):
+        """Record the outcome of a call check() let through, unless it was a mutation that timed out."""
+        if isinstance(result, dict) and result.get("timed_out") and not read_only(args):
+            self.abandon(profile)
+        else:
+            self.record(profile, classify(result))
+
+    def record(self, profile: str, kind: str | None):
+        """Count the outcome of a call check() let through."""
+        with self._lock:
+            self._probing.discard(profile)
+            if kind not in RETRYABLE_KINDS:
+                if self._open_until.pop(profile, None) is not None:
+                    logger.info("circuit breaker: profile '%s' closed", profile)
+                self._failures.pop(profile, None)
+                metrics.circuit_open.set(0, profile=profile)
+                return
+            failures = self._failures[profile] = self._failures.get(profile, 0) + 1
+            if failures >= self.threshold:
+                if profile not in self._open_until or time.monotonic() >= self._open_until[profile]:
+                    logger.warning("circuit breaker: profile '%s' open after %d failures", profile, failures)
+                self._open_until[profile] = time.monotonic() + self.cooldown
+                metrics.circuit_open.set(1, profile=profile)
+
+
+breaker = CircuitBreaker()
@@ -0,0 +1,167 @@
+"""In-memory notebook title index for name → ID resolution.
+
+One index per profile, fed by list_notebooks results and kept current by the
+create/rename/delete tools, so resolving "my Kubernetes notebook" doesn't need
+a model turn or the whole notebook list in the prompt.
+"""
+
+import difflib
+import re
+import threading
+
+FUZZY_CUTOFF = 0.6
+
+# Words users wrap around a title that never appear in it
+_FILLER = {"my", "the", "a", "an", "notebook", "notebooks", "nb", "one", "called", "named"}
+
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+    "last": -1,
+}
+
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def notebook_records(payload) -> list[dict]:
+    """Pull [{"id", "title", ...}] out of a `notebook list` result."""
+    if isinstance(payload, dict):
+        payload = payload.get("notebooks", [])
+    if not isinstance(payload, list):
+        return []
+    return [r for r in payload if isinstance(r, dict) and r.get("id")]
+
+
+def parse_index(text: str) -> int | None:
+    """Read "3", "#3", "number 3", "the third one" or "last" as a list position.
+
+    Returns a 1-based position, -1 for "last", or None if text isn't one.
+    """
+    words = [w for w in _tokens(text) if w not in _FILLER and w not in ("number", "no", "st", "nd", "rd", "th")]
+    if len(words) != 1:
+        return None
+    word = words[0]
+    if word in _ORDINALS:
+        return _ORDINALS[word]
+    match = re.fullmatch(r"(\d+)(?:st|nd|rd|th)?", word)
+    return int(match.group(1)) if match else None
+
+
+class StaleListRef(ValueError):
+    """A list number given for another notebook than the list was shown for."""
+
+
+def list_ref(state, key: str, ref: str, notebook_id: str | None = None) -> str:
+    """Map a position in the list kept under state[key] to its ID.
+
+    The response projection (see projection.py) shows lists numbered and
+    keeps their IDs in session state; tools taking a source, note or
+    artifact ID pass it through here so "3" or "the second one" works too.
+    Anything that isn't a position in that list is returned unchanged.
+
+    The list belongs to the notebook it was shown for: a position given for
+    any other notebook_id raises StaleListRef rather than picking the item at
+    that position in the wrong notebook.
+    """
+    position = parse_index(ref)
+    shown = state.get(key) or []
+    if position is None or not shown:
+        return ref
+    if state.get(f"{key}_notebook") != notebook_id or not notebook_id:
+        raise StaleListRef(
+            f"'{ref}' is a number from the last list, which was shown for a different "
+            "notebook. List this notebook's items again and use a number from that "
+            "list, or pass the ID."
+        )
+    if position == -1:
+        position = len(shown)
+    return shown[position - 1] if 1 <= position <= len(shown) else ref
+
+
+class NotebookIndex:
+    """Titles by notebook ID, per profile."""
+
+    def __init__(self):
+        self._titles: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def loaded(self, profile: str) -> bool:
+        return profile in self._titles
+
+    def update(self, profile: str, payload):
+        """Sync the index with a full `notebook list` result."""
+        records = notebook_records(payload)
+        if not records and not isinstance(payload, list):
+            return  # error or unexpected shape — keep what we have
+        with self._lock:
+            titles = self._titles.setdefault(profile, {})
+            seen = set()
+            for r in records:
+                titles[r["id"]] = r.get("title") or ""
+                seen.add(r["id"])
+            for notebook_id in set(titles) - seen:
+                del titles[notebook_id]
+
+    def add(self, profile: str, notebook_id: str, title: str):
+        with self._lock:
+            if profile in self._titles:
+                self._titles[profile][notebook_id] = title
+
+    def remove(self, profile: str, notebook_id: str):
+        with self._lock:
+            self._titles.get(profile, {}).pop(notebook_id, None)
+
+    def title(self, profile: str, notebook_id: str) -> str | None:
+        return self._titles.get(profile, {}).get(notebook_id)
+
+    def search(self, profile: str, query: str, exact: bool = False) -> list[tuple[str, str]]:
+        """Return [(id, title)] best matches, strongest tier first.
+
+        Tiers: exact (case-insensitive), prefix, all-tokens, substring, fuzzy.
+        The first tier with any hit wins; with exact, only the first is tried.
+        """
+        with self._lock:
+            items = list(self._titles.get(profile, {}).items())
+        q = query.strip().lower()
+        q_tokens = [t for t in _tokens(q) if t not in _FILLER] or _tokens(q)
+        q_clean = " ".join(q_tokens)
+        if not q_clean:
+            return []
+
+        def norm(title: str) -> str:
+            return " ".join(_tokens(title))
+
+        tiers = [
+            lambda t: norm(t) in (q_clean, norm(q)),
+            lambda t: norm(t).startswith(q_clean),
+            lambda t: set(q_tokens) <= set(_tokens(t)),
+            lambda t: q_clean in norm(t),
+        ]
+        for matches in tiers[:1] if exact else tiers:
+            hits = [(i, t) for i, t in items if matches(t)]
+            if hits:
+                return hits
+        if exact:
+            return []
+
+        scored = []
+        for notebook_id, title in items:
+            t_tokens = _tokens(title)
+            whole = difflib.SequenceMatcher(None, q_clean, norm(title)).ratio()
+            # Per-token score handles typos in one word of a longer title
+            per_token = sum(
+                max((difflib.SequenceMatcher(None, q, t).ratio() for t in t_tokens), default=0)
+                for q in q_tokens
+            ) / len(q_tokens)
+            score = max(whole, per_token)
+            if score >= FUZZY_CUTOFF:
+                scored.append((score, notebook_id, title))
+        scored.sort(reverse=True)
+        if scored and (len(scored) == 1 or scored[0][0] - scored[1][0] >= 0.1):
+            return [(scored[0][1], scored[0][2])]
+        return [(i, t) for _, i, t in scored[:3]]
+
+
+notebook_index = NotebookIndex()
@@ -0,0 +1,101 @@
+"""Singleflight: identical read-only nlm calls in flight share one execution.
+
+Sessions on the same profile often ask for the same `notebook list`, `source
+list <id>` or `studio status <id>` at the same moment — on a cache miss, or
+with the cache off. The first call (the leader) runs the command; calls with
+the same (profile, args) that arrive before it finishes wait for its result
+instead of spawning their own nlm process. The leader keeps the object the
+command returned and shares a copy of it, from which each follower takes a
+copy of its own, so no two callers ever hold the same object.
+
+Only read-only commands (commands.READ_ONLY) are shared, so a mutation always
+runs exactly as often as it was asked for. Followers accept the leader's
+timeout. If the leader is cancelled or raises, its followers run the command
+themselves.
+
+The table is shared by the server's event loop, the job loop and sync tools
+in worker threads, so in-flight calls are concurrent.futures Futures any of
+them can wait on.
+"""
+
+import asyncio
+import copy
+import os
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+from . import metrics
+
+SINGLEFLIGHT_ENABLED = os.environ.get("NLM_SINGLEFLIGHT", "1") != "0"
+
+Key = tuple[str, tuple[str, ...], bool]
+
+_RETRY = object()  # the leader gave up without a result
+
+
+class Singleflight:
+    """In-flight calls by (profile, args, json_output)."""
+
+    def __init__(self):
+        self._calls: dict[Key, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Key) -> tuple[Future, bool]:
+        """The call in flight for key and whether this caller leads it (runs it)."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            future.set_running_or_notify_cancel()  # a follower giving up can't cancel it for the rest
+            return future, True
+
+    def _settle(self, key: Key, future: Future, result):
+        if result is not _RETRY:
+            result = copy.deepcopy(result)  # the leader's own object stays private to it
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        future.set_result(result)
+
+    @staticmethod
+    def _count(key: Key):
+        metrics.coalesced.inc(command=metrics.command_label(list(key[1])), profile=key[0])
+
+    def do(self, key: Key, call: Callable[[], dict]) -> dict:
+        """call()'s result, or that of the identical call already in flight."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                self._count(key)
+                result = future.result()
+                if result is _RETRY:
+                    continue
+                return copy.deepcopy(result)
+            result = _RETRY
+            try:
+                result = call()
+                return result
+            finally:
+                self._settle(key, future, result)
+
+    async def do_async(self, key: Key, call: Callable[[], Awaitable[dict]]) -> dict:
+        """Async variant of do."""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                self._count(key)
+                result = await asyncio.wrap_future(future)
+                if result is _RETRY:
+                    continue
+                return copy.deepcopy(result)
+            result = _RETRY
+            try:
+                result = await call()
+                return result
+            finally:
+                self._settle(key, future, result)
+
+
+inflight: Singleflight | None = Singleflight() if SINGLEFLIGHT_ENABLED else None
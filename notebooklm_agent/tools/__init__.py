@@ -1,6 +1,19 @@
 """NotebookLM agent tools — re-exports all tool functions."""
 
-from .auth import check_auth, start_auth, check_auth_token, import_cookies
+import functools
+
+from .auth import (
+    check_auth,
+    start_auth,
+    check_auth_token,
+    wait_for_auth,
+    import_cookies,
+    check_auth_async,
+    start_auth_async,
+    check_auth_token_async,
+    wait_for_auth_async,
+    import_cookies_async,
+)
 from .notebooks import (
     list_notebooks,
     create_notebook,
@@ -8,6 +21,14 @@ from .notebooks import (
     rename_notebook,
     delete_notebook,
     query_notebook,
+    resolve_notebook,
+    list_notebooks_async,
+    create_notebook_async,
+    get_notebook_async,
+    rename_notebook_async,
+    delete_notebook_async,
+    query_notebook_async,
+    resolve_notebook_async,
 )
 from .sources import (
     list_sources,
@@ -17,12 +38,25 @@ from .sources import (
     get_source,
     describe_source,
     delete_source,
+    add_sources_batch,
+    list_sources_async,
+    add_source_url_async,
+    add_source_file_async,
+    add_source_text_async,
+    get_source_async,
+    describe_source_async,
+    delete_source_async,
+    add_sources_batch_async,
 )
 from .notes import (
     list_notes,
     create_note,
     update_note,
     delete_note,
+    list_notes_async,
+    create_note_async,
+    update_note_async,
+    delete_note_async,
 )
 from .studio import (
     create_audio,
@@ -36,24 +70,69 @@ from .studio import (
     create_flashcards,
     studio_status,
     delete_artifact,
+    create_artifacts,
+    create_audio_async,
+    create_video_async,
+    create_mindmap_async,
+    create_infographic_async,
+    create_slides_async,
+    create_data_table_async,
+    create_report_async,
+    create_quiz_async,
+    create_flashcards_async,
+    studio_status_async,
+    delete_artifact_async,
+    create_artifacts_async,
+)
+from .download import (
+    download_artifact,
+    download_artifact_async,
 )
-from .download import download_artifact
 from .sharing import (
     share_status,
     share_public,
     share_private,
     share_invite,
+    share_status_async,
+    share_public_async,
+    share_private_async,
+    share_invite_async,
 )
 from .research import (
     start_research,
     research_status,
     import_research,
+    wait_for_research,
+    start_research_async,
+    research_status_async,
+    import_research_async,
+    wait_for_research_async,
+)
+from .jobs import (
+    job_status,
+    list_jobs,
+    cancel_job,
+    job_status_async,
+    list_jobs_async,
+    cancel_job_async,
+)
+from .results import fetch_result, fetch_result_async
+from .workflows import (
+    research_notebook,
+    project_brain,
+    docs_hub,
+    study_pack,
+    research_notebook_async,
+    project_brain_async,
+    docs_hub_async,
+    study_pack_async,
 )
 
 ALL_TOOLS = [
     check_auth,
     start_auth,
     check_auth_token,
+    wait_for_auth,
     import_cookies,
     list_notebooks,
     create_notebook,
@@ -61,6 +140,7 @@ ALL_TOOLS = [
     rename_notebook,
     delete_notebook,
     query_notebook,
+    resolve_notebook,
     list_sources,
     add_source_url,
     add_source_file,
@@ -68,6 +148,7 @@ ALL_TOOLS = [
     get_source,
     describe_source,
     delete_source,
+    add_sources_batch,
     list_notes,
     create_note,
     update_note,
@@ -83,6 +164,7 @@ ALL_TOOLS = [
     create_flashcards,
     studio_status,
     delete_artifact,
+    create_artifacts,
     download_artifact,
     share_status,
     share_public,
@@ -91,4 +173,82 @@ ALL_TOOLS = [
     start_research,
     research_status,
     import_research,
+    wait_for_research,
+    job_status,
+    list_jobs,
+    cancel_job,
+    fetch_result,
+    research_notebook,
+    project_brain,
+    docs_hub,
+    study_pack,
+]
+
+
+def _as_tool(async_fn, sync_fn):
+    """Expose an async variant to ADK under the sync tool's name and docstring."""
+
+    @functools.wraps(sync_fn)
+    async def tool(*args, **kwargs):
+        return await async_fn(*args, **kwargs)
+
+    return tool
+
+
+# Same tools, same names, backed by run_nlm_async — used by the agent so long
+# nlm calls don't hold a thread each.
+ALL_ASYNC_TOOLS = [
+    _as_tool(check_auth_async, check_auth),
+    _as_tool(start_auth_async, start_auth),
+    _as_tool(check_auth_token_async, check_auth_token),
+    _as_tool(wait_for_auth_async, wait_for_auth),
+    _as_tool(import_cookies_async, import_cookies),
+    _as_tool(list_notebooks_async, list_notebooks),
+    _as_tool(create_notebook_async, create_notebook),
+    _as_tool(get_notebook_async, get_notebook),
+    _as_tool(rename_notebook_async, rename_notebook),
+    _as_tool(delete_notebook_async, delete_notebook),
+    _as_tool(query_notebook_async, query_notebook),
+    _as_tool(resolve_notebook_async, resolve_notebook),
+    _as_tool(list_sources_async, list_sources),
+    _as_tool(add_source_url_async, add_source_url),
+    _as_tool(add_source_file_async, add_source_file),
+    _as_tool(add_source_text_async, add_source_text),
+    _as_tool(get_source_async, get_source),
+    _as_tool(describe_source_async, describe_source),
+    _as_tool(delete_source_async, delete_source),
+    _as_tool(add_sources_batch_async, add_sources_batch),
+    _as_tool(list_notes_async, list_notes),
+    _as_tool(create_note_async, create_note),
+    _as_tool(update_note_async, update_note),
+    _as_tool(delete_note_async, delete_note),
+    _as_tool(create_audio_async, create_audio),
+    _as_tool(create_video_async, create_video),
+    _as_tool(create_mindmap_async, create_mindmap),
+    _as_tool(create_infographic_async, create_infographic),
+    _as_tool(create_slides_async, create_slides),
+    _as_tool(create_data_table_async, create_data_table),
+    _as_tool(create_report_async, create_report),
+    _as_tool(create_quiz_async, create_quiz),
+    _as_tool(create_flashcards_async, create_flashcards),
+    _as_tool(studio_status_async, studio_status),
+    _as_tool(delete_artifact_async, delete_artifact),
+    _as_tool(create_artifacts_async, create_artifacts),
+    _as_tool(download_artifact_async, download_artifact),
+    _as_tool(share_status_async, share_status),
+    _as_tool(share_public_async, share_public),
+    _as_tool(share_private_async, share_private),
+    _as_tool(share_invite_async, share_invite),
+    _as_tool(start_research_async, start_research),
+    _as_tool(research_status_async, research_status),
+    _as_tool(import_research_async, import_research),
+    _as_tool(wait_for_research_async, wait_for_research),
+    _as_tool(job_status_async, job_status),
+    _as_tool(list_jobs_async, list_jobs),
+    _as_tool(cancel_job_async, cancel_job),
+    _as_tool(fetch_result_async, fetch_result),
+    _as_tool(research_notebook_async, research_notebook),
+    _as_tool(project_brain_async, project_brain),
+    _as_tool(docs_hub_async, docs_hub),
+    _as_tool(study_pack_async, study_pack),
 ]
@@ -1,5 +1,6 @@
 """Authentication tools for NotebookLM agent."""
 
+import asyncio
 import logging
 import secrets
 import time
@@ -9,39 +10,73 @@ import auth_store
 logger = logging.getLogger(__name__)
 
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm, run_nlm_with_tempfile
+from notebooklm_agent.auth_cache import profile_auth, record_check
+from notebooklm_agent.helpers import (
+    run_nlm,
+    run_nlm_async,
+    run_nlm_with_tempfile,
+    run_nlm_with_tempfile_async,
+    run_sync,
+)
 
+AUTH_WAIT_MAX = 300  # seconds wait_for_auth may block
 
-def _set_auth_valid(tool_context: ToolContext, profile: str):
-    """Mark authentication as valid in session state."""
+
+def _set_auth_valid(tool_context: ToolContext, profile: str, renewed: bool = True):
+    """Mark authentication as valid in session state, and for every other session.
+
+    renewed: new cookies were just imported. A check of the existing ones
+    (renewed=False) keeps the expiry of the login they came from.
+    """
+    if renewed:
+        profile_auth.mark_valid(profile)
+    else:
+        record_check(profile)
     tool_context.state["profile"] = profile
     tool_context.state["auth_valid"] = True
-    tool_context.state["auth_valid_at"] = time.time()
+    tool_context.state["auth_valid_at"] = profile_auth.valid_at(profile) or time.time()
+    tool_context.state["auth_expires_in_minutes"] = profile_auth.minutes_left(profile)
 
 
 def check_auth(tool_context: ToolContext, profile: str = "fresh_test") -> dict:
     """Check if the nlm CLI is authenticated for the given profile.
 
     Call this before using any other tool. On success it stores the profile
-    in session state so all subsequent tools use it automatically.
+    in session state so all subsequent tools use it automatically. A profile
+    another session verified recently is reported without checking again.
 
     Args:
         profile: The nlm auth profile to check (default: "default").
     """
+    if profile_auth.adopt(tool_context.state, profile):
+        return _verified_result(tool_context, profile)
     result = run_nlm(
         ["login", "--check"],
         profile=profile,
         json_output=False,
     )
+    return _check_auth_result(tool_context, profile, result)
+
+
+def _verified_result(tool_context: ToolContext, profile: str) -> dict:
+    minutes = round((time.time() - tool_context.state["auth_valid_at"]) / 60)
+    return {
+        "authenticated": True,
+        "profile": profile,
+        "message": f"Authenticated with profile '{profile}' (verified {minutes} min ago).",
+    }
 
+
+def _check_auth_result(tool_context: ToolContext, profile: str, result: dict) -> dict:
     if "error" in result:
+        profile_auth.invalidate(profile)
         return {
             "authenticated": False,
             "message": "Not authenticated. Call start_auth to begin the authentication flow.",
             "details": result["error"],
         }
 
-    _set_auth_valid(tool_context, profile)
+    _set_auth_valid(tool_context, profile, renewed=False)
     return {
         "authenticated": True,
         "profile": profile,
@@ -59,17 +94,19 @@ def start_auth(tool_context: ToolContext) -> dict:
     tool_context.state["auth_token"] = token
 
     # Register token so the extension can auto-fill it
-    auth_store.latest_token["token"] = token
-    auth_store.latest_token["created_at"] = time.time()
+    auth_store.store.set_latest_token(token)
+    return _start_auth_result(token)
+
 
+def _start_auth_result(token: str) -> dict:
     return {
         "token": token,
-        "message": "Auth token generated. Present the Chrome extension instructions. IMPORTANT: When the user says 'done', call check_auth_token (NOT check_auth).",
+        "message": "Auth token generated. Present the Chrome extension instructions, then call wait_for_auth right away (NOT check_auth) — it returns as soon as the extension delivers the cookies.",
         "extension_method": {
             "step1": "Open the install guide: http://localhost:8001/auth/install",
             "step2": "Follow the steps to download and install the extension (one-time setup)",
             "step3": f"Click the extension icon, enter token: {token}",
-            "step4": "Click 'Authenticate', then come back and say 'done'",
+            "step4": "Click 'Authenticate' — the agent continues automatically",
         },
     }
 
@@ -80,6 +117,39 @@ def check_auth_token(tool_context: ToolContext) -> dict:
     Call this after start_auth when the user says they've clicked Authenticate
     in the extension.
     """
+    pending = _consume_pending_cookies(tool_context)
+    if "cookie_str" not in pending:
+        return pending
+
+    result = run_nlm_with_tempfile(
+        args_before=["login", "--manual"],
+        file_content=pending["cookie_str"],
+        profile=pending["profile"],
+        json_output=False,
+        timeout=30,
+    )
+    return _token_import_result(tool_context, pending["profile"], result)
+
+
+def wait_for_auth(tool_context: ToolContext, timeout: int = 120) -> dict:
+    """Wait for the Chrome extension to deliver cookies, then authenticate with them.
+
+    Call this right after presenting the start_auth instructions. It returns
+    the moment the user clicks Authenticate in the extension, so they don't
+    need to come back and say anything.
+
+    Args:
+        timeout: Longest time to wait, in seconds.
+    """
+    return run_sync(wait_for_auth_async(tool_context, timeout))
+
+
+def _consume_pending_cookies(tool_context: ToolContext) -> dict:
+    """Pop the extension-delivered cookies for the session's auth token.
+
+    Returns {"cookie_str", "profile"} when cookies were waiting, otherwise the
+    response check_auth_token should give the model.
+    """
     token = tool_context.state.get("auth_token")
     if not token:
         logger.error("check_auth_token: no auth_token in state")
@@ -87,18 +157,20 @@ def check_auth_token(tool_context: ToolContext) -> dict:
 
     logger.info("check_auth_token: checking token %s...", token[:8])
 
-    # Access shared auth store directly (same process, avoids HTTP deadlock)
-    entry = auth_store.pending_auth.get(token)
+    # Access the auth store directly (avoids an HTTP call back into our own server);
+    # consume is atomic, so auth_guard's auto-import and this can't both get them
+    cookies = auth_store.store.consume(token)
 
-    if not entry or "cookies" not in entry:
+    if not cookies:
         logger.info("check_auth_token: cookies not found for token")
         return {
             "ready": False,
             "message": "Cookies not received yet. Ask the user to try again.",
         }
+    return _pending_cookies(tool_context, cookies)
+
 
-    # Consume the token (remove from pending)
-    cookies = auth_store.pending_auth.pop(token, {}).get("cookies", {})
+def _pending_cookies(tool_context: ToolContext, cookies: dict) -> dict:
     logger.info("check_auth_token: consumed, got %d cookies", len(cookies))
 
     # Build cookie string for nlm login --manual
@@ -106,14 +178,10 @@ def check_auth_token(tool_context: ToolContext) -> dict:
     profile = tool_context.state.get("profile", "default")
 
     logger.info("check_auth_token: importing cookies to profile '%s'", profile)
-    result = run_nlm_with_tempfile(
-        args_before=["login", "--manual"],
-        file_content=cookie_str,
-        profile=profile,
-        json_output=False,
-        timeout=30,
-    )
+    return {"cookie_str": cookie_str, "profile": profile}
+
 
+def _token_import_result(tool_context: ToolContext, profile: str, result: dict) -> dict:
     if "error" in result:
         logger.error("check_auth_token: nlm login --manual failed: %s", result["error"])
         return {
@@ -149,17 +217,24 @@ def import_cookies(
         json_output=False,
         timeout=30,
     )
-
     if "error" in result:
-        return {
-            "authenticated": False,
-            "message": "Cookie import failed.",
-            "details": result["error"],
-            "suggestion": "Make sure you copied the full cURL command or all 5 required cookies (SID, HSID, SSID, APISID, SAPISID).",
-        }
+        return _cookie_import_failed(result)
 
     # Verify cookies work
     verify = run_nlm(["login", "--check"], profile=profile, json_output=False)
+    return _cookie_verify_result(tool_context, profile, verify)
+
+
+def _cookie_import_failed(result: dict) -> dict:
+    return {
+        "authenticated": False,
+        "message": "Cookie import failed.",
+        "details": result["error"],
+        "suggestion": "Make sure you copied the full cURL command or all 5 required cookies (SID, HSID, SSID, APISID, SAPISID).",
+    }
+
+
+def _cookie_verify_result(tool_context: ToolContext, profile: str, verify: dict) -> dict:
     if "error" in verify:
         return {
             "authenticated": False,
@@ -169,3 +244,89 @@ def import_cookies(
 
     _set_auth_valid(tool_context, profile)
     return {"authenticated": True, "message": "Cookies imported and verified."}
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def check_auth_async(tool_context: ToolContext, profile: str = "fresh_test") -> dict:
+    """Async variant of check_auth."""
+    if profile_auth.adopt(tool_context.state, profile):
+        return _verified_result(tool_context, profile)
+    result = await run_nlm_async(
+        ["login", "--check"],
+        profile=profile,
+        json_output=False,
+    )
+    return _check_auth_result(tool_context, profile, result)
+
+
+async def start_auth_async(tool_context: ToolContext) -> dict:
+    """Async variant of start_auth."""
+    token = secrets.token_urlsafe(32)
+    tool_context.state["auth_token"] = token
+    await asyncio.to_thread(auth_store.store.set_latest_token, token)
+    return _start_auth_result(token)
+
+
+async def check_auth_token_async(tool_context: ToolContext) -> dict:
+    """Async variant of check_auth_token."""
+    pending = await asyncio.to_thread(_consume_pending_cookies, tool_context)
+    if "cookie_str" not in pending:
+        return pending
+
+    result = await run_nlm_with_tempfile_async(
+        args_before=["login", "--manual"],
+        file_content=pending["cookie_str"],
+        profile=pending["profile"],
+        json_output=False,
+        timeout=30,
+    )
+    return _token_import_result(tool_context, pending["profile"], result)
+
+
+async def wait_for_auth_async(tool_context: ToolContext, timeout: int = 120) -> dict:
+    """Async variant of wait_for_auth."""
+    token = tool_context.state.get("auth_token")
+    if not token:
+        return {"error": "No auth token found. Call start_auth first."}
+
+    timeout = max(0, min(timeout, AUTH_WAIT_MAX))
+    logger.info("wait_for_auth: waiting up to %ds for token %s...", timeout, token[:8])
+    cookies = await auth_store.store.wait_for_cookies(token, timeout, consume=True)
+    if not cookies:
+        return {
+            "ready": False,
+            "message": f"No cookies arrived within {timeout}s. Ask the user whether they clicked "
+            "Authenticate in the extension, then call wait_for_auth again.",
+        }
+
+    pending = _pending_cookies(tool_context, cookies)
+    result = await run_nlm_with_tempfile_async(
+        args_before=["login", "--manual"],
+        file_content=pending["cookie_str"],
+        profile=pending["profile"],
+        json_output=False,
+        timeout=30,
+    )
+    return _token_import_result(tool_context, pending["profile"], result)
+
+
+async def import_cookies_async(
+    tool_context: ToolContext,
+    cookie_string: str,
+    profile: str = "default",
+) -> dict:
+    """Async variant of import_cookies."""
+    result = await run_nlm_with_tempfile_async(
+        args_before=["login", "--manual"],
+        file_content=cookie_string,
+        profile=profile,
+        json_output=False,
+        timeout=30,
+    )
+    if "error" in result:
+        return _cookie_import_failed(result)
+
+    verify = await run_nlm_async(["login", "--check"], profile=profile, json_output=False)
+    return _cookie_verify_result(tool_context, profile, verify)
@@ -1,7 +1,8 @@
 """Download tool for studio artifacts."""
 
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import run_nlm, run_nlm_async
+from notebooklm_agent.jobs import start_job
 
 
 def _profile(ctx: ToolContext) -> str:
@@ -13,6 +14,7 @@ def download_artifact(
     notebook_id: str,
     artifact_type: str,
     output_path: str,
+    background: bool = False,
 ) -> dict:
     """Download a studio artifact to a local file.
 
@@ -22,10 +24,44 @@ def download_artifact(
             audio, video, slide-deck, infographic, report,
             mind-map, data-table, quiz, flashcards.
         output_path: Local file path to save the download.
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
     """
+    if background:
+        return _download_job(tool_context, notebook_id, artifact_type, output_path)
     return run_nlm(
         ["download", artifact_type, notebook_id, "--output", output_path, "--no-progress"],
         profile=_profile(tool_context),
         json_output=False,
         timeout=300,
     )
+
+
+def _download_job(tool_context, notebook_id, artifact_type, output_path) -> dict:
+    return start_job(
+        tool_context,
+        "download",
+        f"Downloading the {artifact_type} to {output_path}",
+        lambda: download_artifact_async(tool_context, notebook_id, artifact_type, output_path),
+    )
+
+
+# --- Async variant (same arguments and result, see helpers.run_nlm_async) ---
+
+
+async def download_artifact_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    artifact_type: str,
+    output_path: str,
+    background: bool = False,
+) -> dict:
+    """Async variant of download_artifact."""
+    if background:
+        return _download_job(tool_context, notebook_id, artifact_type, output_path)
+    return await run_nlm_async(
+        ["download", artifact_type, notebook_id, "--output", output_path, "--no-progress"],
+        profile=_profile(tool_context),
+        json_output=False,
+        timeout=300,
+    )
@@ -0,0 +1,58 @@
+"""Tools for background jobs started with background=True."""
+
+from google.adk.tools import ToolContext
+from notebooklm_agent.jobs import job_manager
+
+
+def _session_id(ctx: ToolContext) -> str | None:
+    return getattr(getattr(ctx, "session", None), "id", None)
+
+
+def job_status(tool_context: ToolContext, job_id: str) -> dict:
+    """Check a background job: queued, running, succeeded, failed or cancelled.
+
+    Once it has finished, the result of the original operation is included.
+
+    Args:
+        job_id: The job ID returned when the operation was started.
+    """
+    job = job_manager.get(job_id, _session_id(tool_context))
+    if job is None:
+        return {"error": f"No job '{job_id}' (finished jobs are kept for a limited time)."}
+    return job.to_dict()
+
+
+def list_jobs(tool_context: ToolContext) -> dict:
+    """List this conversation's background jobs, newest first."""
+    jobs = job_manager.list(owner=_session_id(tool_context))
+    return {"jobs": [j.to_dict(include_result=False) for j in jobs]}
+
+
+def cancel_job(tool_context: ToolContext, job_id: str) -> dict:
+    """Cancel a queued or running background job.
+
+    Args:
+        job_id: The job ID returned when the operation was started.
+    """
+    job = job_manager.cancel(job_id, _session_id(tool_context))
+    if job is None:
+        return {"error": f"No job '{job_id}'."}
+    return job.to_dict(include_result=False)
+
+
+# --- Async variants (same arguments and results; these never block) ---
+
+
+async def job_status_async(tool_context: ToolContext, job_id: str) -> dict:
+    """Async variant of job_status."""
+    return job_status(tool_context, job_id)
+
+
+async def list_jobs_async(tool_context: ToolContext) -> dict:
+    """Async variant of list_jobs."""
+    return list_jobs(tool_context)
+
+
+async def cancel_job_async(tool_context: ToolContext, job_id: str) -> dict:
+    """Async variant of cancel_job."""
+    return cancel_job(tool_context, job_id)
@@ -1,7 +1,14 @@
 """Notebook management tools."""
 
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.answers import answer_cache, source_ids
+from notebooklm_agent.helpers import find_id, run_nlm, run_nlm_async
+from notebooklm_agent.resolver import notebook_index, notebook_records, parse_index
+
+_CACHED_NOTE = (
+    "This is the stored answer to the same question about the same sources, not a new "
+    "query. Say so if it matters; call again with use_cache=False for a fresh answer."
+)
 
 
 def _profile(ctx: ToolContext) -> str:
@@ -10,7 +17,9 @@ def _profile(ctx: ToolContext) -> str:
 
 def list_notebooks(tool_context: ToolContext) -> dict:
     """List all notebooks in the user's NotebookLM account."""
-    return run_nlm(["notebook", "list"], profile=_profile(tool_context))
+    result = run_nlm(["notebook", "list"], profile=_profile(tool_context))
+    _remember_list(tool_context, result)
+    return result
 
 
 def create_notebook(tool_context: ToolContext, name: str) -> dict:
@@ -24,6 +33,7 @@ def create_notebook(tool_context: ToolContext, name: str) -> dict:
         profile=_profile(tool_context),
         json_output=False,
     )
+    _remember_created(tool_context, name, result)
     return result
 
 
@@ -47,11 +57,14 @@ def rename_notebook(
         notebook_id: The notebook's UUID.
         new_name: The new title for the notebook.
     """
-    return run_nlm(
+    result = run_nlm(
         ["notebook", "rename", notebook_id, new_name],
         profile=_profile(tool_context),
         json_output=False,
     )
+    if "error" not in result:
+        notebook_index.add(_profile(tool_context), notebook_id, new_name)
+    return result
 
 
 def delete_notebook(tool_context: ToolContext, notebook_id: str) -> dict:
@@ -60,11 +73,14 @@ def delete_notebook(tool_context: ToolContext, notebook_id: str) -> dict:
     Args:
         notebook_id: The notebook's UUID.
     """
-    return run_nlm(
+    result = run_nlm(
         ["notebook", "delete", notebook_id, "--confirm"],
         profile=_profile(tool_context),
         json_output=False,
     )
+    if "error" not in result:
+        notebook_index.remove(_profile(tool_context), notebook_id)
+    return result
 
 
 def query_notebook(
@@ -72,6 +88,7 @@ def query_notebook(
     notebook_id: str,
     question: str,
     conversation_id: str = "",
+    use_cache: bool = True,
 ) -> dict:
     """Ask a question against the notebook's sources (RAG query).
 
@@ -80,17 +97,238 @@ def query_notebook(
         question: The question to ask.
         conversation_id: Optional conversation ID for follow-up questions.
             If empty, starts a new conversation.
+        use_cache: Reuse the stored answer if this question was asked before
+            about the same sources. Set False when the user wants a fresh
+            answer; it then replaces the stored one.
+    """
+    profile = _profile(tool_context)
+    ids = None
+    if _answer_cacheable(conversation_id):
+        # The source fingerprint: a read-cache hit while fresh, else one `source list` upstream
+        ids = source_ids(run_nlm(["source", "list", notebook_id], profile=profile))
+        cached = use_cache and _cached_answer(tool_context, profile, notebook_id, ids, question)
+        if cached:
+            return cached
+    result = run_nlm(_query_args(notebook_id, question, conversation_id), profile=profile)
+    _remember_query(tool_context, notebook_id, result)
+    _store_answer(profile, notebook_id, ids, question, result)
+    return result
+
+
+def resolve_notebook(tool_context: ToolContext, name_or_index: str) -> dict:
+    """Find a notebook's ID from what the user called it.
+
+    Use this whenever the user refers to a notebook by name ("my Kubernetes
+    notebook", partial names and typos are fine) or by its number in the last
+    list you showed ("number 3", "the second one"). Returns only the matching
+    notebook's ID and title; if several match, ask the user which one.
+
+    Args:
+        name_or_index: The user's words for the notebook, or its list position.
     """
+    profile = _profile(tool_context)
+    # A title wins over a list position: "Notebook 2" or "2024" may be either
+    picked = _match_notebook(tool_context, name_or_index, exact=True)
+    picked = picked or _pick_from_last_list(tool_context, name_or_index)
+    if picked:
+        return picked
+
+    refreshed = False
+    if not notebook_index.loaded(profile):
+        notebook_index.update(profile, run_nlm(["notebook", "list"], profile=profile))
+        refreshed = True
+    result = _match_notebook(tool_context, name_or_index)
+    if result is None and not refreshed:
+        # Maybe created or renamed outside this process — look once more
+        notebook_index.update(profile, run_nlm(["notebook", "list"], profile=profile))
+        result = _match_notebook(tool_context, name_or_index)
+    return result or {"error": f"No notebook matches '{name_or_index}'."}
+
+
+def _remember_list(tool_context: ToolContext, result):
+    """Feed the resolver index and remember the order the user was shown."""
+    notebook_index.update(_profile(tool_context), result)
+    records = notebook_records(result)
+    if records:
+        tool_context.state["last_notebook_list"] = [r["id"] for r in records]
+
+
+def _remember_created(tool_context: ToolContext, name: str, result: dict):
+    notebook_id = find_id(result)
+    if notebook_id:
+        notebook_index.add(_profile(tool_context), notebook_id, name)
+        tool_context.state["active_notebook_id"] = notebook_id
+
+
+def _pick_from_last_list(tool_context: ToolContext, text: str) -> dict | None:
+    position = parse_index(text)
+    shown = tool_context.state.get("last_notebook_list") or []
+    if position is None or not shown:
+        return None
+    if position == -1:
+        position = len(shown)
+    if not 1 <= position <= len(shown):
+        return None
+    notebook_id = shown[position - 1]
+    tool_context.state["active_notebook_id"] = notebook_id
+    title = notebook_index.title(_profile(tool_context), notebook_id)
+    return {"notebook_id": notebook_id, "title": title or f"notebook #{position}"}
+
+
+def _match_notebook(tool_context: ToolContext, text: str, exact: bool = False) -> dict | None:
+    matches = notebook_index.search(_profile(tool_context), text, exact=exact)
+    if not matches:
+        return None
+    if len(matches) == 1:
+        notebook_id, title = matches[0]
+        tool_context.state["active_notebook_id"] = notebook_id
+        return {"notebook_id": notebook_id, "title": title}
+    return {
+        "ambiguous": True,
+        "matches": [{"notebook_id": i, "title": t} for i, t in matches[:5]],
+        "message": "Several notebooks match. Ask the user which one they mean.",
+    }
+
+
+def _query_args(notebook_id: str, question: str, conversation_id: str) -> list[str]:
     args = ["notebook", "query", notebook_id, question]
     if conversation_id:
         args += ["-c", conversation_id]
+    return args
 
-    result = run_nlm(args, profile=_profile(tool_context))
 
-    # Persist conversation_id for follow-ups
-    if isinstance(result, dict) and "conversation_id" in result:
-        tool_context.state["conversation_id"] = result["conversation_id"]
-    if isinstance(result, dict) and not result.get("error"):
-        tool_context.state["active_notebook_id"] = notebook_id
+def _answer_cacheable(conversation_id: str) -> bool:
+    # A follow-up's answer depends on the conversation so far
+    return answer_cache is not None and not conversation_id
+
 
+def _cached_answer(tool_context: ToolContext, profile, notebook_id, ids, question) -> dict | None:
+    if ids is None:
+        return None
+    cached = answer_cache.get(profile, notebook_id, ids, question)
+    if cached is None:
+        return None
+    # No upstream conversation holds this answer: a follow-up starts a new one
+    tool_context.state.pop("conversation_id", None)
+    tool_context.state["active_notebook_id"] = notebook_id
+    return {**_without_conversation(cached), "cached": True, "note": _CACHED_NOTE}
+
+
+def _store_answer(profile: str, notebook_id: str, ids, question: str, result):
+    value = result.get("value", result) if isinstance(result, dict) else None
+    if ids is not None and isinstance(value, dict) and value.get("answer") and "error" not in result:
+        answer_cache.put(profile, notebook_id, ids, question, _without_conversation(result))
+
+
+def _without_conversation(result: dict) -> dict:
+    """result minus its conversation_id, which belongs to whoever asked first."""
+    result = {k: v for k, v in result.items() if k != "conversation_id"}
+    if isinstance(result.get("value"), dict):
+        result["value"] = {k: v for k, v in result["value"].items() if k != "conversation_id"}
     return result
+
+
+def _remember_query(tool_context: ToolContext, notebook_id: str, result: dict):
+    if not isinstance(result, dict) or result.get("error"):
+        return
+    # `notebook query --json` wraps the answer in "value"; persist conversation_id for follow-ups
+    value = result.get("value", result)
+    if isinstance(value, dict) and value.get("conversation_id"):
+        tool_context.state["conversation_id"] = value["conversation_id"]
+    tool_context.state["active_notebook_id"] = notebook_id
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def list_notebooks_async(tool_context: ToolContext) -> dict:
+    """Async variant of list_notebooks."""
+    result = await run_nlm_async(["notebook", "list"], profile=_profile(tool_context))
+    _remember_list(tool_context, result)
+    return result
+
+
+async def create_notebook_async(tool_context: ToolContext, name: str) -> dict:
+    """Async variant of create_notebook."""
+    result = await run_nlm_async(
+        ["notebook", "create", name],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+    _remember_created(tool_context, name, result)
+    return result
+
+
+async def get_notebook_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of get_notebook."""
+    return await run_nlm_async(
+        ["notebook", "get", notebook_id], profile=_profile(tool_context)
+    )
+
+
+async def rename_notebook_async(
+    tool_context: ToolContext, notebook_id: str, new_name: str
+) -> dict:
+    """Async variant of rename_notebook."""
+    result = await run_nlm_async(
+        ["notebook", "rename", notebook_id, new_name],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+    if "error" not in result:
+        notebook_index.add(_profile(tool_context), notebook_id, new_name)
+    return result
+
+
+async def delete_notebook_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of delete_notebook."""
+    result = await run_nlm_async(
+        ["notebook", "delete", notebook_id, "--confirm"],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+    if "error" not in result:
+        notebook_index.remove(_profile(tool_context), notebook_id)
+    return result
+
+
+async def query_notebook_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    question: str,
+    conversation_id: str = "",
+    use_cache: bool = True,
+) -> dict:
+    """Async variant of query_notebook."""
+    profile = _profile(tool_context)
+    ids = None
+    if _answer_cacheable(conversation_id):
+        # The source fingerprint: a read-cache hit while fresh, else one `source list` upstream
+        ids = source_ids(await run_nlm_async(["source", "list", notebook_id], profile=profile))
+        cached = use_cache and _cached_answer(tool_context, profile, notebook_id, ids, question)
+        if cached:
+            return cached
+    result = await run_nlm_async(_query_args(notebook_id, question, conversation_id), profile=profile)
+    _remember_query(tool_context, notebook_id, result)
+    _store_answer(profile, notebook_id, ids, question, result)
+    return result
+
+
+async def resolve_notebook_async(tool_context: ToolContext, name_or_index: str) -> dict:
+    """Async variant of resolve_notebook."""
+    profile = _profile(tool_context)
+    # A title wins over a list position: "Notebook 2" or "2024" may be either
+    picked = _match_notebook(tool_context, name_or_index, exact=True)
+    picked = picked or _pick_from_last_list(tool_context, name_or_index)
+    if picked:
+        return picked
+
+    refreshed = False
+    if not notebook_index.loaded(profile):
+        notebook_index.update(profile, await run_nlm_async(["notebook", "list"], profile=profile))
+        refreshed = True
+    result = _match_notebook(tool_context, name_or_index)
+    if result is None and not refreshed:
+        notebook_index.update(profile, await run_nlm_async(["notebook", "list"], profile=profile))
+        result = _match_notebook(tool_context, name_or_index)
+    return result or {"error": f"No notebook matches '{name_or_index}'."}
@@ -1,13 +1,18 @@
 """Note management tools."""
 
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import run_nlm, run_nlm_async
+from notebooklm_agent.resolver import StaleListRef, list_ref
 
 
 def _profile(ctx: ToolContext) -> str:
     return ctx.state.get("profile", "default")
 
 
+def _note(ctx: ToolContext, notebook_id: str, note_id: str) -> str:
+    return list_ref(ctx.state, "last_note_list", note_id, notebook_id)
+
+
 def list_notes(tool_context: ToolContext, notebook_id: str) -> dict:
     """List all notes in a notebook.
 
@@ -50,10 +55,14 @@ def update_note(
 
     Args:
         notebook_id: The notebook's UUID.
-        note_id: The note's UUID.
+        note_id: The note's UUID, or its number in the last note list.
         title: New title (leave empty to keep current).
         content: New content (leave empty to keep current).
     """
+    try:
+        note_id = _note(tool_context, notebook_id, note_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
     args = ["note", "update", notebook_id, note_id]
     if title:
         args += ["--title", title]
@@ -71,10 +80,75 @@ def delete_note(
 
     Args:
         notebook_id: The notebook's UUID.
-        note_id: The note's UUID.
+        note_id: The note's UUID, or its number in the last note list.
     """
+    try:
+        note_id = _note(tool_context, notebook_id, note_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
     return run_nlm(
         ["note", "delete", notebook_id, note_id],
         profile=_profile(tool_context),
         json_output=False,
     )
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def list_notes_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of list_notes."""
+    return await run_nlm_async(
+        ["note", "list", notebook_id], profile=_profile(tool_context)
+    )
+
+
+async def create_note_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    title: str,
+    content: str,
+) -> dict:
+    """Async variant of create_note."""
+    return await run_nlm_async(
+        ["note", "create", notebook_id, "--title", title, "--content", content],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+
+
+async def update_note_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    note_id: str,
+    title: str = "",
+    content: str = "",
+) -> dict:
+    """Async variant of update_note."""
+    try:
+        note_id = _note(tool_context, notebook_id, note_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    args = ["note", "update", notebook_id, note_id]
+    if title:
+        args += ["--title", title]
+    if content:
+        args += ["--content", content]
+    return await run_nlm_async(
+        args, profile=_profile(tool_context), json_output=False
+    )
+
+
+async def delete_note_async(
+    tool_context: ToolContext, notebook_id: str, note_id: str
+) -> dict:
+    """Async variant of delete_note."""
+    try:
+        note_id = _note(tool_context, notebook_id, note_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return await run_nlm_async(
+        ["note", "delete", notebook_id, note_id],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
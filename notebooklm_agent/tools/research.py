@@ -1,7 +1,19 @@
 """Research tools for discovering new sources."""
 
+import os
+
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import (
+    await_research,
+    import_once,
+    research_state,
+    run_nlm,
+    run_nlm_async,
+    run_sync,
+)
+from notebooklm_agent.jobs import start_job
+
+RESEARCH_DEADLINE = int(os.environ.get("NLM_RESEARCH_DEADLINE", "240"))  # seconds
 
 
 def _profile(ctx: ToolContext) -> str:
@@ -38,15 +50,120 @@ def research_status(tool_context: ToolContext, notebook_id: str) -> dict:
     )
 
 
-def import_research(tool_context: ToolContext, notebook_id: str) -> dict:
+def import_research(
+    tool_context: ToolContext, notebook_id: str, background: bool = False
+) -> dict:
     """Import discovered sources from a completed research task into the notebook.
 
+    Each research task is imported only once; calling this again for the same
+    task returns already_imported instead of importing duplicates.
+
     Args:
         notebook_id: The notebook's UUID.
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
     """
-    return run_nlm(
-        ["research", "import", notebook_id],
+    return run_sync(import_research_async(tool_context, notebook_id, background))
+
+
+def wait_for_research(
+    tool_context: ToolContext,
+    notebook_id: str,
+    deadline: int = RESEARCH_DEADLINE,
+    auto_import: bool = True,
+    background: bool = False,
+) -> dict:
+    """Wait for the notebook's research task to finish, then import its sources.
+
+    Polls in the background with growing intervals and returns as soon as the
+    task completes — use this instead of calling research_status repeatedly.
+    The import happens at most once per research task, even if called again.
+
+    Args:
+        notebook_id: The notebook's UUID.
+        deadline: Longest time to wait, in seconds.
+        auto_import: Import the discovered sources when research completes.
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
+    """
+    return run_sync(
+        wait_for_research_async(tool_context, notebook_id, deadline, auto_import, background)
+    )
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def start_research_async(
+    tool_context: ToolContext, notebook_id: str, query: str
+) -> dict:
+    """Async variant of start_research."""
+    return await run_nlm_async(
+        ["research", "start", query, "--notebook-id", notebook_id],
+        profile=_profile(tool_context),
+        json_output=False,
+        timeout=180,
+    )
+
+
+async def research_status_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of research_status."""
+    return await run_nlm_async(
+        ["research", "status", notebook_id, "--max-wait", "0"],
         profile=_profile(tool_context),
         json_output=False,
-        timeout=300,
     )
+
+
+async def import_research_async(
+    tool_context: ToolContext, notebook_id: str, background: bool = False
+) -> dict:
+    """Async variant of import_research."""
+    if background:
+        return start_job(
+            tool_context,
+            "research import",
+            "Importing research sources",
+            lambda: import_research_async(tool_context, notebook_id),
+        )
+    profile = _profile(tool_context)
+    status = await run_nlm_async(
+        ["research", "status", notebook_id, "--max-wait", "0"],
+        profile=profile,
+        json_output=False,
+    )
+    if "error" in status:
+        return status
+    state = research_state(status)
+    if state["status"] != "completed":
+        # An import without a finished task can't be deduplicated: don't run one
+        return {
+            "error": f"Research not finished (status: {state['status'].replace('_', ' ')}).",
+            "action": "Call wait_for_research; it imports once the research completes.",
+            **state,
+        }
+    return await import_once(profile, notebook_id, state)
+
+
+async def wait_for_research_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    deadline: int = RESEARCH_DEADLINE,
+    auto_import: bool = True,
+    background: bool = False,
+) -> dict:
+    """Async variant of wait_for_research."""
+    if background:
+        return start_job(
+            tool_context,
+            "research wait",
+            "Waiting for research" + (" and importing its sources" if auto_import else ""),
+            lambda: wait_for_research_async(tool_context, notebook_id, deadline, auto_import),
+        )
+    profile = _profile(tool_context)
+    state = await await_research(profile, notebook_id, deadline)
+    if "error" in state or not auto_import:
+        return state
+    if not state["sources_found"]:
+        return {**state, "imported": False, "message": "Research found no sources to import."}
+    return await import_once(profile, notebook_id, state)
@@ -0,0 +1,26 @@
+"""Paging through tool results that were cut to the response budget."""
+
+from google.adk.tools import ToolContext
+from notebooklm_agent.projection import result_store
+
+
+def fetch_result(tool_context: ToolContext, handle: str) -> dict:
+    """Get the next part of a tool result that was cut short.
+
+    Only call this when a response had a "more" field and you need what
+    was left out; each call returns the next part, with "more" again until
+    nothing is left.
+
+    Args:
+        handle: The handle from the response's "more" field.
+    """
+    session = getattr(tool_context, "session", None)
+    return result_store.next_page(getattr(session, "id", None), handle)
+
+
+# --- Async variant (same arguments and result; this never blocks) ---
+
+
+async def fetch_result_async(tool_context: ToolContext, handle: str) -> dict:
+    """Async variant of fetch_result."""
+    return fetch_result(tool_context, handle)
@@ -1,7 +1,7 @@
 """Notebook sharing tools."""
 
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import run_nlm, run_nlm_async
 
 
 def _profile(ctx: ToolContext) -> str:
@@ -59,3 +59,42 @@ def share_invite(
         profile=_profile(tool_context),
         json_output=False,
     )
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def share_status_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of share_status."""
+    return await run_nlm_async(
+        ["share", "status", notebook_id], profile=_profile(tool_context)
+    )
+
+
+async def share_public_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of share_public."""
+    return await run_nlm_async(
+        ["share", "public", notebook_id],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+
+
+async def share_private_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of share_private."""
+    return await run_nlm_async(
+        ["share", "private", notebook_id],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+
+
+async def share_invite_async(
+    tool_context: ToolContext, notebook_id: str, email: str
+) -> dict:
+    """Async variant of share_invite."""
+    return await run_nlm_async(
+        ["share", "invite", notebook_id, email],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
@@ -1,13 +1,28 @@
 """Source management tools."""
 
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import run_nlm, run_nlm_async
+from notebooklm_agent.jobs import start_job
+from notebooklm_agent.resolver import StaleListRef, list_ref
+
+
+BATCH_CONCURRENCY = int(os.environ.get("NLM_BATCH_CONCURRENCY", "4"))
 
 
 def _profile(ctx: ToolContext) -> str:
     return ctx.state.get("profile", "default")
 
 
+def _source(ctx: ToolContext, source_id: str, notebook_id: str) -> str:
+    notebook_id = notebook_id or ctx.state.get("active_notebook_id")
+    return list_ref(ctx.state, "last_source_list", source_id, notebook_id)
+
+
 def list_sources(tool_context: ToolContext, notebook_id: str) -> dict:
     """List all sources in a notebook.
 
@@ -24,6 +39,7 @@ def add_source_url(
     notebook_id: str,
     url: str,
     wait: bool = True,
+    background: bool = False,
 ) -> dict:
     """Add a URL (website or YouTube) as a source to a notebook.
 
@@ -31,7 +47,16 @@ def add_source_url(
         notebook_id: The notebook's UUID.
         url: The URL to add.
         wait: Whether to wait for processing to complete (default True).
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
     """
+    if background:
+        return start_job(
+            tool_context,
+            "source add",
+            f"Adding {url}",
+            lambda: add_source_url_async(tool_context, notebook_id, url, wait),
+        )
     args = ["source", "add", notebook_id, "--url", url]
     if wait:
         args.append("--wait")
@@ -48,6 +73,7 @@ def add_source_file(
     notebook_id: str,
     file_path: str,
     wait: bool = True,
+    background: bool = False,
 ) -> dict:
     """Add a local file (PDF, text, etc.) as a source to a notebook.
 
@@ -55,7 +81,16 @@ def add_source_file(
         notebook_id: The notebook's UUID.
         file_path: Path to the local file to upload.
         wait: Whether to wait for processing to complete (default True).
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
     """
+    if background:
+        return start_job(
+            tool_context,
+            "source add",
+            f"Adding {file_path}",
+            lambda: add_source_file_async(tool_context, notebook_id, file_path, wait),
+        )
     args = ["source", "add", notebook_id, "--file", file_path]
     if wait:
         args.append("--wait")
@@ -88,36 +123,275 @@ def add_source_text(
     )
 
 
-def get_source(tool_context: ToolContext, source_id: str) -> dict:
+def get_source(tool_context: ToolContext, source_id: str, notebook_id: str = "") -> dict:
     """Get details for a specific source.
 
     Args:
-        source_id: The source's UUID.
+        source_id: The source's UUID, or its number in the last source list.
+        notebook_id: The notebook's UUID; needed when source_id is a list number
+            (defaults to the active notebook).
     """
-    return run_nlm(
-        ["source", "get", source_id], profile=_profile(tool_context)
-    )
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return run_nlm(["source", "get", source_id], profile=_profile(tool_context))
 
 
-def describe_source(tool_context: ToolContext, source_id: str) -> dict:
+def describe_source(tool_context: ToolContext, source_id: str, notebook_id: str = "") -> dict:
     """Get an AI-generated summary and keywords for a source.
 
     Args:
-        source_id: The source's UUID.
+        source_id: The source's UUID, or its number in the last source list.
+        notebook_id: The notebook's UUID; needed when source_id is a list number
+            (defaults to the active notebook).
     """
-    return run_nlm(
-        ["source", "describe", source_id], profile=_profile(tool_context)
-    )
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return run_nlm(["source", "describe", source_id], profile=_profile(tool_context))
 
 
-def delete_source(tool_context: ToolContext, source_id: str) -> dict:
+def delete_source(tool_context: ToolContext, source_id: str, notebook_id: str = "") -> dict:
     """Delete a source permanently. This cannot be undone.
 
     Args:
-        source_id: The source's UUID.
+        source_id: The source's UUID, or its number in the last source list.
+        notebook_id: The notebook's UUID; needed when source_id is a list number
+            (defaults to the active notebook).
     """
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
     return run_nlm(
         ["source", "delete", source_id, "--confirm"],
         profile=_profile(tool_context),
         json_output=False,
     )
+
+
+def add_sources_batch(
+    tool_context: ToolContext,
+    notebook_id: str,
+    urls: list[str] | None = None,
+    files: list[str] | None = None,
+    background: bool = False,
+) -> dict:
+    """Add several URLs and/or local files to a notebook in one call.
+
+    Sources are submitted in parallel (a few at a time) and processed
+    concurrently, so this is much faster than adding them one by one. Use it
+    whenever the user gives two or more URLs or files.
+
+    Args:
+        notebook_id: The notebook's UUID.
+        urls: URLs (websites or YouTube) to add.
+        files: Paths to local files to upload.
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
+    """
+    profile = _profile(tool_context)
+    jobs = _batch_jobs(notebook_id, urls, files)
+    if not jobs:
+        return {"error": "No URLs or files given."}
+    if background:
+        return _batch_job(tool_context, notebook_id, urls, files, len(jobs))
+    # Each worker runs in a copy of this context: the session (for progress)
+    # and the tool's trace span carry over to its nlm call
+    with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as pool:
+        futures = [
+            pool.submit(
+                contextvars.copy_context().run,
+                run_nlm, job[2], profile=profile, json_output=False, timeout=300,
+            )
+            for job in jobs
+        ]
+        results = [f.result() for f in futures]
+    listing = run_nlm(["source", "list", notebook_id], profile=profile)
+    return _batch_report(notebook_id, jobs, results, listing)
+
+
+def _batch_job(tool_context, notebook_id, urls, files, count: int) -> dict:
+    return start_job(
+        tool_context,
+        "source batch",
+        f"Adding {count} sources",
+        lambda: add_sources_batch_async(tool_context, notebook_id, urls, files),
+    )
+
+
+def _batch_jobs(
+    notebook_id: str, urls: list[str] | None, files: list[str] | None
+) -> list[tuple[str, str, list[str]]]:
+    """(kind, source, args) for each source, URLs first."""
+    jobs = []
+    for url in urls or []:
+        jobs.append(("url", url, ["source", "add", notebook_id, "--url", url, "--wait"]))
+    for path in files or []:
+        jobs.append(("file", path, ["source", "add", notebook_id, "--file", path, "--wait"]))
+    return jobs
+
+
+def _batch_report(notebook_id: str, jobs: list, results: list[dict], listing) -> dict:
+    table = []
+    for (kind, source, _), result in zip(jobs, results):
+        row = {"source": source, "kind": kind}
+        if "error" in result:
+            row["status"] = "failed"
+            row["detail"] = result["error"]
+        else:
+            row["status"] = "added"
+        table.append(row)
+    added = sum(1 for row in table if row["status"] == "added")
+    report = {
+        "notebook_id": notebook_id,
+        "added": added,
+        "failed": len(table) - added,
+        "results": table,
+    }
+    if isinstance(listing, list):
+        report["total_sources"] = len(listing)
+    if any(r.get("auth_expired") for r in results):
+        report["auth_expired"] = True
+    return report
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def list_sources_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of list_sources."""
+    return await run_nlm_async(
+        ["source", "list", notebook_id], profile=_profile(tool_context)
+    )
+
+
+async def add_source_url_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    url: str,
+    wait: bool = True,
+    background: bool = False,
+) -> dict:
+    """Async variant of add_source_url."""
+    if background:
+        return start_job(
+            tool_context,
+            "source add",
+            f"Adding {url}",
+            lambda: add_source_url_async(tool_context, notebook_id, url, wait),
+        )
+    args = ["source", "add", notebook_id, "--url", url]
+    if wait:
+        args.append("--wait")
+    return await run_nlm_async(
+        args,
+        profile=_profile(tool_context),
+        json_output=False,
+        timeout=300 if wait else 120,
+    )
+
+
+async def add_source_file_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    file_path: str,
+    wait: bool = True,
+    background: bool = False,
+) -> dict:
+    """Async variant of add_source_file."""
+    if background:
+        return start_job(
+            tool_context,
+            "source add",
+            f"Adding {file_path}",
+            lambda: add_source_file_async(tool_context, notebook_id, file_path, wait),
+        )
+    args = ["source", "add", notebook_id, "--file", file_path]
+    if wait:
+        args.append("--wait")
+    return await run_nlm_async(
+        args,
+        profile=_profile(tool_context),
+        json_output=False,
+        timeout=300 if wait else 120,
+    )
+
+
+async def add_source_text_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    text: str,
+    title: str = "",
+) -> dict:
+    """Async variant of add_source_text."""
+    args = ["source", "add", notebook_id, "--text", text]
+    if title:
+        args += ["--title", title]
+    return await run_nlm_async(
+        args, profile=_profile(tool_context), json_output=False
+    )
+
+
+async def get_source_async(
+    tool_context: ToolContext, source_id: str, notebook_id: str = ""
+) -> dict:
+    """Async variant of get_source."""
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return await run_nlm_async(["source", "get", source_id], profile=_profile(tool_context))
+
+
+async def describe_source_async(
+    tool_context: ToolContext, source_id: str, notebook_id: str = ""
+) -> dict:
+    """Async variant of describe_source."""
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return await run_nlm_async(["source", "describe", source_id], profile=_profile(tool_context))
+
+
+async def delete_source_async(
+    tool_context: ToolContext, source_id: str, notebook_id: str = ""
+) -> dict:
+    """Async variant of delete_source."""
+    try:
+        source_id = _source(tool_context, source_id, notebook_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return await run_nlm_async(
+        ["source", "delete", source_id, "--confirm"],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+
+
+async def add_sources_batch_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    urls: list[str] | None = None,
+    files: list[str] | None = None,
+    background: bool = False,
+) -> dict:
+    """Async variant of add_sources_batch."""
+    profile = _profile(tool_context)
+    jobs = _batch_jobs(notebook_id, urls, files)
+    if not jobs:
+        return {"error": "No URLs or files given."}
+    if background:
+        return _batch_job(tool_context, notebook_id, urls, files, len(jobs))
+    limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def add(args: list[str]) -> dict:
+        async with limit:
+            return await run_nlm_async(args, profile=profile, json_output=False, timeout=300)
+
+    results = await asyncio.gather(*(add(args) for _, _, args in jobs))
+    listing = await run_nlm_async(["source", "list", notebook_id], profile=profile)
+    return _batch_report(notebook_id, jobs, results, listing)
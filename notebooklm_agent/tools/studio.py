@@ -1,30 +1,154 @@
 """Studio artifact creation and management tools."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from google.adk.tools import ToolContext
-from notebooklm_agent.helpers import run_nlm
+from notebooklm_agent.helpers import find_id, run_nlm, run_nlm_async
+from notebooklm_agent.jobs import start_job
+from notebooklm_agent.resolver import StaleListRef, list_ref
+
+
+# Types create_artifacts accepts → display name (data-table needs a description)
+ARTIFACT_NAMES = {
+    "mindmap": "Mind map",
+    "infographic": "Infographic",
+    "slides": "Slides",
+    "audio": "Audio overview",
+    "video": "Video overview",
+    "report": "Report",
+    "quiz": "Quiz",
+    "flashcards": "Flashcards",
+}
+
+# create-command type → type name in `studio status` output
+_STATUS_TYPES = {"mindmap": "mind_map", "slides": "slide_deck", "data-table": "data_table"}
+
+_STATUS_LABELS = {"in_progress": "Generating", "completed": "Ready", "failed": "Failed"}
 
 
 def _profile(ctx: ToolContext) -> str:
     return ctx.state.get("profile", "default")
 
 
+def _artifact(ctx: ToolContext, notebook_id: str, artifact_id: str) -> str:
+    return list_ref(ctx.state, "last_artifact_list", artifact_id, notebook_id)
+
+
+def _artifact_ids(status) -> set[str] | None:
+    """IDs in a `studio status` result, or None if it isn't a listing."""
+    if not isinstance(status, list):
+        return None
+    return {a["id"] for a in status if isinstance(a, dict) and a.get("id")}
+
+
+def _status_rollup(created: dict[str, dict], status, before: set[str] | None) -> dict[str, str]:
+    """Summarise freshly requested artifacts as {type: "Ready"/"Generating"/...}.
+
+    created maps each create-command type to its create result, status is
+    the `studio status` read after them, and before holds the artifact IDs
+    listed just before them (None if that read failed). An artifact is the
+    one requested when its ID is in the create output or, failing that, when
+    it has the type and wasn't in before — older artifacts never count.
+    """
+    artifacts = [a for a in status if isinstance(a, dict)] if isinstance(status, list) else []
+    rollup = {}
+    for artifact_type, result in created.items():
+        if "error" in result:
+            rollup[artifact_type] = "Failed"
+            continue
+        listed = _STATUS_TYPES.get(artifact_type, artifact_type)
+        artifact_id = find_id(result)
+        mine = [a for a in artifacts if artifact_id and a.get("id") == artifact_id]
+        if not mine and before is not None:
+            mine = [a for a in artifacts if a.get("type") == listed and a.get("id") not in before]
+        states = {a.get("status") for a in mine}
+        for state in ("in_progress", "completed", "failed"):
+            if state in states:
+                rollup[artifact_type] = _STATUS_LABELS[state]
+                break
+        else:
+            # Mind maps are built synchronously and never listed as studio artifacts
+            rollup[artifact_type] = "Ready" if artifact_type == "mindmap" else "Requested"
+    return rollup
+
+
+def _artifacts_report(
+    notebook_id: str, types: list[str], results: list[dict], status, before
+) -> dict:
+    created = dict(zip(types, results))
+    rollup = _status_rollup(created, status, _artifact_ids(before))
+    report = {
+        "notebook_id": notebook_id,
+        "artifacts": rollup,
+        "summary": " | ".join(f"{ARTIFACT_NAMES[t]}: {state}" for t, state in rollup.items()),
+    }
+    errors = {t: r["error"] for t, r in created.items() if "error" in r}
+    if errors:
+        report["errors"] = errors
+    if any(r.get("auth_expired") for r in results):
+        report["auth_expired"] = True
+    return report
+
+
+def _artifacts_job(tool_context: ToolContext, notebook_id: str, types: list[str]) -> dict:
+    return start_job(
+        tool_context,
+        "studio create",
+        "Creating " + ", ".join(ARTIFACT_NAMES[t].lower() for t in types),
+        lambda: create_artifacts_async(tool_context, notebook_id, types),
+    )
+
+
+def _artifact_types(types: list[str] | None) -> tuple[list[str], dict | None]:
+    """Deduplicated types, or an error dict if any is unknown."""
+    types = list(dict.fromkeys(types or []))
+    unknown = [t for t in types if t not in ARTIFACT_NAMES]
+    if unknown or not types:
+        return types, {
+            "error": f"Unknown or missing artifact types: {', '.join(unknown) or 'none given'}. "
+            f"Use any of: {', '.join(ARTIFACT_NAMES)}."
+        }
+    return types, None
+
+
 def _create_artifact(
     tool_context: ToolContext,
     artifact_type: str,
     notebook_id: str,
     extra_args: list[str] | None = None,
 ) -> dict:
-    args = [artifact_type, "create", notebook_id, "--confirm"]
-    if extra_args:
-        args.extend(extra_args)
     return run_nlm(
-        args,
+        _create_args(artifact_type, notebook_id, extra_args),
+        profile=_profile(tool_context),
+        json_output=False,
+        timeout=180,
+    )
+
+
+async def _create_artifact_async(
+    tool_context: ToolContext,
+    artifact_type: str,
+    notebook_id: str,
+    extra_args: list[str] | None = None,
+) -> dict:
+    return await run_nlm_async(
+        _create_args(artifact_type, notebook_id, extra_args),
         profile=_profile(tool_context),
         json_output=False,
         timeout=180,
     )
 
 
+def _create_args(
+    artifact_type: str, notebook_id: str, extra_args: list[str] | None
+) -> list[str]:
+    args = [artifact_type, "create", notebook_id, "--confirm"]
+    if extra_args:
+        args.extend(extra_args)
+    return args
+
+
 def create_audio(tool_context: ToolContext, notebook_id: str) -> dict:
     """Create an audio overview (podcast) from notebook sources.
 
@@ -129,10 +253,139 @@ def delete_artifact(
 
     Args:
         notebook_id: The notebook's UUID.
-        artifact_id: The artifact's UUID.
+        artifact_id: The artifact's UUID, or its number in the last status list.
     """
+    try:
+        artifact_id = _artifact(tool_context, notebook_id, artifact_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
     return run_nlm(
         ["studio", "delete", notebook_id, artifact_id, "--confirm"],
         profile=_profile(tool_context),
         json_output=False,
     )
+
+
+def create_artifacts(
+    tool_context: ToolContext,
+    notebook_id: str,
+    types: list[str],
+    background: bool = False,
+) -> dict:
+    """Create several studio artifacts at once and report one status per type.
+
+    All generations start in parallel, so use this instead of calling the
+    create_* tools one after another whenever two or more types are wanted.
+    The result's summary reads like "Mind map: Ready | Slides: Generating".
+
+    Args:
+        notebook_id: The notebook's UUID.
+        types: Artifact types from mindmap, infographic, slides, audio, video,
+            report, quiz, flashcards.
+        background: Run in the background and return a job ID at once
+            instead of waiting; check progress with job_status.
+    """
+    types, error = _artifact_types(types)
+    if error:
+        return error
+    if background:
+        return _artifacts_job(tool_context, notebook_id, types)
+    before = run_nlm(["studio", "status", notebook_id], profile=_profile(tool_context))
+    with ThreadPoolExecutor(max_workers=len(types)) as pool:
+        results = list(pool.map(lambda t: _create_artifact(tool_context, t, notebook_id), types))
+    status = run_nlm(["studio", "status", notebook_id], profile=_profile(tool_context))
+    return _artifacts_report(notebook_id, types, results, status, before)
+
+
+# --- Async variants (same arguments and results, see helpers.run_nlm_async) ---
+
+
+async def create_audio_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_audio."""
+    return await _create_artifact_async(tool_context, "audio", notebook_id)
+
+
+async def create_video_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_video."""
+    return await _create_artifact_async(tool_context, "video", notebook_id)
+
+
+async def create_mindmap_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_mindmap."""
+    return await _create_artifact_async(tool_context, "mindmap", notebook_id)
+
+
+async def create_infographic_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_infographic."""
+    return await _create_artifact_async(tool_context, "infographic", notebook_id)
+
+
+async def create_slides_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_slides."""
+    return await _create_artifact_async(tool_context, "slides", notebook_id)
+
+
+async def create_data_table_async(
+    tool_context: ToolContext, notebook_id: str, description: str
+) -> dict:
+    """Async variant of create_data_table."""
+    return await _create_artifact_async(
+        tool_context, "data-table", notebook_id, extra_args=[description]
+    )
+
+
+async def create_report_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_report."""
+    return await _create_artifact_async(tool_context, "report", notebook_id)
+
+
+async def create_quiz_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_quiz."""
+    return await _create_artifact_async(tool_context, "quiz", notebook_id)
+
+
+async def create_flashcards_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of create_flashcards."""
+    return await _create_artifact_async(tool_context, "flashcards", notebook_id)
+
+
+async def studio_status_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of studio_status."""
+    return await run_nlm_async(
+        ["studio", "status", notebook_id], profile=_profile(tool_context)
+    )
+
+
+async def delete_artifact_async(
+    tool_context: ToolContext, notebook_id: str, artifact_id: str
+) -> dict:
+    """Async variant of delete_artifact."""
+    try:
+        artifact_id = _artifact(tool_context, notebook_id, artifact_id)
+    except StaleListRef as e:
+        return {"error": str(e)}
+    return await run_nlm_async(
+        ["studio", "delete", notebook_id, artifact_id, "--confirm"],
+        profile=_profile(tool_context),
+        json_output=False,
+    )
+
+
+async def create_artifacts_async(
+    tool_context: ToolContext,
+    notebook_id: str,
+    types: list[str],
+    background: bool = False,
+) -> dict:
+    """Async variant of create_artifacts."""
+    types, error = _artifact_types(types)
+    if error:
+        return error
+    if background:
+        return _artifacts_job(tool_context, notebook_id, types)
+    before = await run_nlm_async(["studio", "status", notebook_id], profile=_profile(tool_context))
+    results = await asyncio.gather(
+        *(_create_artifact_async(tool_context, t, notebook_id) for t in types)
+    )
+    status = await run_nlm_async(["studio", "status", notebook_id], profile=_profile(tool_context))
+    return _artifacts_report(notebook_id, types, list(results), status, before)
@@ -0,0 +1,283 @@
+"""Composite recipe tools — each runs a whole workflow recipe server-side.
+
+Steps are wired as a pipeline (see workflow.py): independent steps run
+concurrently and a failed step only skips what depends on it. The model makes
+one call and narrates the compact result.
+
+Recipe 6 (visualize) has no composite tool here: studio.create_artifacts
+already starts every artifact in one call.
+"""
+
+from google.adk.tools import ToolContext
+from notebooklm_agent.helpers import await_research, find_id, import_once, run_sync
+from notebooklm_agent.workflow import Step, run_pipeline
+
+from .notebooks import create_notebook_async, query_notebook_async
+from .notes import create_note_async
+from .research import RESEARCH_DEADLINE, start_research_async
+from .sources import add_source_file_async, add_sources_batch_async
+from .studio import create_artifacts_async, create_mindmap_async
+
+# kind → (notebook title, research query, summary question) for Recipes 1, 3, 5
+RESEARCH_RECIPES = {
+    "overview": (
+        "{topic}",
+        "{topic} comprehensive overview guide resources",
+        "Provide a comprehensive overview of the key themes, insights, and most "
+        "important takeaways from all sources",
+    ),
+    "resources": (
+        "{topic} Research",
+        "{topic} best resources guides tutorials",
+        "Summarize the key resources found and what each covers",
+    ),
+    "debug": (
+        "{topic} Debug KB",
+        "{topic} common errors troubleshooting solutions debugging guide",
+        "List the most common issues and their solutions, organized by category",
+    ),
+}
+
+STUDY_TYPES = ["quiz", "flashcards", "audio"]
+
+
+def _profile(ctx: ToolContext) -> str:
+    return ctx.state.get("profile", "default")
+
+
+def research_notebook(
+    tool_context: ToolContext, topic: str, kind: str = "overview"
+) -> dict:
+    """Run a full research recipe in one call: create a notebook, research the
+    web, wait for it, import the sources and summarise them.
+
+    Use this for Recipes 1, 3 and 5 instead of calling the steps yourself.
+
+    Args:
+        topic: The topic, framework or technology to research.
+        kind: "overview" (Recipe 1, topic notebook), "resources" (Recipe 3,
+            quick research) or "debug" (Recipe 5, debugging KB).
+    """
+    return run_sync(research_notebook_async(tool_context, topic, kind))
+
+
+def project_brain(tool_context: ToolContext, name: str, path: str) -> dict:
+    """Run Recipe 2 in one call: create a project notebook, upload the repomix
+    file, then analyse the architecture and build a mind map in parallel.
+
+    Args:
+        name: Project name.
+        path: Path to the repomix output file.
+    """
+    return run_sync(project_brain_async(tool_context, name, path))
+
+
+def docs_hub(
+    tool_context: ToolContext,
+    project: str,
+    urls: list[str] | None = None,
+    files: list[str] | None = None,
+) -> dict:
+    """Run Recipe 4 in one call: create a docs notebook, add every URL/file in
+    parallel and produce a structured overview.
+
+    Args:
+        project: Project name.
+        urls: Documentation URLs to add.
+        files: Paths to local documentation files.
+    """
+    return run_sync(docs_hub_async(tool_context, project, urls, files))
+
+
+def study_pack(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Run Recipe 7 in one call: start a quiz, flashcards and an audio overview
+    while writing a study summary, then report artifact status.
+
+    Args:
+        notebook_id: The notebook's UUID.
+    """
+    return run_sync(study_pack_async(tool_context, notebook_id))
+
+
+def _notebook_id(results: dict) -> str:
+    return find_id(results["create"])
+
+
+def _answer(result) -> tuple[str | None, str | None]:
+    """(answer, conversation_id) from a `notebook query` result."""
+    if not isinstance(result, dict) or "error" in result:
+        return None, None
+    value = result.get("value", result)
+    if not isinstance(value, dict):
+        return str(value), None
+    return value.get("answer") or value.get("output"), value.get("conversation_id")
+
+
+def _outcome(run: dict, **fields) -> dict:
+    """Compact tool result: the caller's fields plus the step report."""
+    outcome = {k: v for k, v in fields.items() if v is not None}
+    outcome["completed"] = run["ok"]
+    outcome["seconds"] = run["seconds"]
+    outcome["steps"] = run["steps"]
+    if any(r.get("auth_expired") for r in run["results"].values() if isinstance(r, dict)):
+        outcome["auth_expired"] = True
+    return outcome
+
+
+def _summary_fields(tool_context: ToolContext, result) -> dict:
+    answer, conversation_id = _answer(result)
+    if conversation_id:
+        tool_context.state["conversation_id"] = conversation_id
+    return {"summary": answer, "conversation_id": conversation_id}
+
+
+async def _created(tool_context: ToolContext, title: str) -> dict:
+    result = await create_notebook_async(tool_context, title)
+    if "error" not in result and not find_id(result):
+        return {"error": f"Notebook created but its ID was not in the output: {result.get('output')}"}
+    return result
+
+
+# --- Async implementations (the agent uses these; sync variants wrap them) ---
+
+
+async def research_notebook_async(
+    tool_context: ToolContext, topic: str, kind: str = "overview"
+) -> dict:
+    """Async variant of research_notebook."""
+    if kind not in RESEARCH_RECIPES:
+        return {"error": f"Unknown kind '{kind}'. Use one of: {', '.join(RESEARCH_RECIPES)}."}
+    title, query, question = (s.format(topic=topic) for s in RESEARCH_RECIPES[kind])
+    profile = _profile(tool_context)
+
+    steps = [
+        Step("create", lambda r: _created(tool_context, title)),
+        Step(
+            "research",
+            lambda r: start_research_async(tool_context, _notebook_id(r), query),
+            needs=("create",),
+        ),
+        Step(
+            "wait",
+            lambda r: await_research(profile, _notebook_id(r), RESEARCH_DEADLINE),
+            needs=("research",),
+        ),
+        Step("import", lambda r: import_once(profile, _notebook_id(r), r["wait"]), needs=("wait",)),
+        Step("query", lambda r: query_notebook_async(tool_context, _notebook_id(r), question), needs=("import",)),
+    ]
+    if kind == "debug":
+        steps.append(
+            Step(
+                "checklist",
+                lambda r: create_note_async(
+                    tool_context,
+                    _notebook_id(r),
+                    f"{topic} Debug Checklist",
+                    "Common debugging steps: 1. Check logs 2. Verify configuration "
+                    "3. Review recent changes",
+                ),
+                needs=("create",),
+            )
+        )
+
+    run = await run_pipeline(steps)
+    results = run["results"]
+    wait = results.get("wait") or {}
+    return _outcome(
+        run,
+        notebook_id=find_id(results["create"]),
+        title=title,
+        sources_found=wait.get("sources_found"),
+        **_summary_fields(tool_context, results.get("query")),
+    )
+
+
+async def project_brain_async(tool_context: ToolContext, name: str, path: str) -> dict:
+    """Async variant of project_brain."""
+    title = f"Project: {name}"
+    run = await run_pipeline([
+        Step("create", lambda r: _created(tool_context, title)),
+        Step("upload", lambda r: add_source_file_async(tool_context, _notebook_id(r), path), needs=("create",)),
+        Step(
+            "query",
+            lambda r: query_notebook_async(
+                tool_context,
+                _notebook_id(r),
+                "Describe the overall architecture, main components, key patterns, "
+                "and how the pieces connect",
+            ),
+            needs=("upload",),
+        ),
+        Step("mindmap", lambda r: create_mindmap_async(tool_context, _notebook_id(r)), needs=("upload",)),
+    ])
+    results = run["results"]
+    return _outcome(
+        run,
+        notebook_id=find_id(results["create"]),
+        title=title,
+        **_summary_fields(tool_context, results.get("query")),
+    )
+
+
+async def docs_hub_async(
+    tool_context: ToolContext,
+    project: str,
+    urls: list[str] | None = None,
+    files: list[str] | None = None,
+) -> dict:
+    """Async variant of docs_hub."""
+    if not urls and not files:
+        return {"error": "No URLs or files given. Ask the user for their documentation first."}
+    title = f"{project} Docs"
+    run = await run_pipeline([
+        Step("create", lambda r: _created(tool_context, title)),
+        Step(
+            "sources",
+            lambda r: add_sources_batch_async(tool_context, _notebook_id(r), urls, files),
+            needs=("create",),
+        ),
+        Step(
+            "query",
+            lambda r: query_notebook_async(
+                tool_context,
+                _notebook_id(r),
+                "Provide a structured overview of all documentation, organized by topic",
+            ),
+            needs=("sources",),
+        ),
+    ])
+    results = run["results"]
+    batch = results.get("sources") or {}
+    return _outcome(
+        run,
+        notebook_id=find_id(results["create"]),
+        title=title,
+        sources_added=batch.get("added"),
+        sources_failed=[row for row in batch.get("results", []) if row["status"] == "failed"] or None,
+        total_sources=batch.get("total_sources"),
+        **_summary_fields(tool_context, results.get("query")),
+    )
+
+
+async def study_pack_async(tool_context: ToolContext, notebook_id: str) -> dict:
+    """Async variant of study_pack."""
+    run = await run_pipeline([
+        Step("artifacts", lambda r: create_artifacts_async(tool_context, notebook_id, STUDY_TYPES)),
+        Step(
+            "query",
+            lambda r: query_notebook_async(
+                tool_context,
+                notebook_id,
+                "Create a concise study summary covering the most important concepts, "
+                "key terms, and relationships",
+            ),
+        ),
+    ])
+    artifacts = run["results"].get("artifacts") or {}
+    return _outcome(
+        run,
+        notebook_id=notebook_id,
+        artifacts=artifacts.get("summary"),
+        artifact_errors=artifacts.get("errors"),
+        **_summary_fields(tool_context, run["results"].get("query")),
+    )
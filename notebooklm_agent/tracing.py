@@ -0,0 +1,109 @@
+"""OpenTelemetry spans for tool calls and the nlm commands they run.
+
+ADK already traces each turn (invoke_agent, call_llm, execute_tool). Inside
+its execute_tool span this adds:
+
+    tool <name>        opened in auth_guard, closed in auth_error_handler
+      auth_guard       the guard's own checks
+        auto_auth      cookie import from the extension, when it happens
+      nlm <command>    one per executed nlm command: profile, timeout,
+                       outcome and result size
+
+Spans go to the process's tracer provider, which ADK's server sets up; the
+standard OTEL_EXPORTER_OTLP_ENDPOINT (e.g. http://localhost:4318) sends them
+to a local OTLP collector. NLM_TRACE_FILE additionally writes every finished
+span as one JSON line to a file, to inspect traces offline.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+
+from opentelemetry import context, trace
+from opentelemetry.trace import Status, StatusCode
+
+logger = logging.getLogger(__name__)
+
+TRACE_FILE = os.environ.get("NLM_TRACE_FILE", "")
+MAX_OPEN_SPANS = 256
+
+tracer = trace.get_tracer("notebooklm_agent")
+
+# function_call_id → (span, context token) between auth_guard and auth_error_handler
+_open: dict[str, tuple] = {}
+
+
+def _call_id(tool_context) -> str:
+    return getattr(tool_context, "function_call_id", None) or str(id(tool_context))
+
+
+def start_tool_span(tool_name: str, tool_context):
+    """Open the tool's span and make it current, so nlm spans nest under it."""
+    # Calls that never reached a closing callback; closed before the new span
+    # picks its parent, so it can't nest under (or be detached with) one of them
+    while len(_open) >= MAX_OPEN_SPANS:
+        _close(*_open.pop(next(iter(_open))))
+    session = getattr(getattr(tool_context, "session", None), "id", None)
+    span = tracer.start_span(f"tool {tool_name}", attributes={"tool.name": tool_name, "session.id": session or ""})
+    token = context.attach(trace.set_span_in_context(span))
+    _open[_call_id(tool_context)] = (span, token)
+    return span
+
+
+def end_tool_span(tool_context, response=None, error: BaseException | None = None):
+    """Close the span start_tool_span opened for this call, if any."""
+    entry = _open.pop(_call_id(tool_context), None)
+    if entry is None:
+        return
+    span, token = entry
+    if error is not None:
+        span.record_exception(error)
+        span.set_status(Status(StatusCode.ERROR, str(error)))
+    elif isinstance(response, dict) and "error" in response:
+        span.set_attribute("tool.auth_expired", bool(response.get("auth_expired")))
+        span.set_status(Status(StatusCode.ERROR, str(response["error"])[:200]))
+    _close(span, token)
+
+
+def _close(span, token):
+    """Detach the span's context, then end it."""
+    try:
+        context.detach(token)
+    except Exception:  # closed from another context; the span still ends
+        pass
+    span.end()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """A child span of whatever is current."""
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def record_result(current, result):
+    """Outcome and size attributes for an nlm span."""
+    if not current.is_recording():
+        return
+    if isinstance(result, dict) and "error" in result:
+        current.set_status(Status(StatusCode.ERROR, str(result["error"])[:200]))
+        current.set_attribute("nlm.auth_expired", bool(result.get("auth_expired")))
+    current.set_attribute("nlm.result_bytes", len(json.dumps(result, default=str)))
+
+
+def install_exporters():
+    """Add the NLM_TRACE_FILE exporter to the tracer provider (call once, after ADK set it up)."""
+    if not TRACE_FILE:
+        return
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    out = open(os.path.expanduser(TRACE_FILE), "a", buffering=1)
+    exporter = ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    logger.info("tracing: writing spans to %s", TRACE_FILE)
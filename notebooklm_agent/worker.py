@@ -0,0 +1,83 @@
+"""Long-lived nlm worker process.
+
+Started by notebooklm_agent.pool as a plain script (not via the package, so
+the agent and ADK are never imported here). The worker imports the nlm CLI
+once, then serves commands read as JSON lines from stdin:
+
+    {"op": "ping"}                      -> {"ok": true}
+    {"op": "run", "args": [...]}        -> {"returncode": int, "stdout": str, "stderr": str}
+
+Each command runs the CLI entry point in-process with stdout/stderr captured,
+so the reply carries exactly what a spawned `nlm` would have printed.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+from importlib.metadata import entry_points
+
+
+def load_cli():
+    """Resolve the `nlm` console script entry point of notebooklm-mcp-cli."""
+    (ep,) = entry_points(group="console_scripts", name="nlm")
+    return ep.load()
+
+
+def invoke_cli(cli, args: list[str]) -> tuple[int, str, str]:
+    """Run the CLI entry point with args, returning (returncode, stdout, stderr)."""
+    out, err = io.StringIO(), io.StringIO()
+    saved_argv, saved_stdin = sys.argv, sys.stdin
+    sys.argv = ["nlm"] + args
+    # Interactive prompts must hit EOF instead of reading the protocol pipe
+    sys.stdin = io.StringIO("")
+    returncode = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                cli()
+            except SystemExit as e:
+                code = e.code
+                if code is None:
+                    returncode = 0
+                elif isinstance(code, int):
+                    returncode = code
+                else:
+                    print(code, file=sys.stderr)
+                    returncode = 1
+            except Exception as e:  # typer.Exit raised outside the click app
+                returncode = getattr(e, "exit_code", None)
+                if returncode is None:
+                    print(f"{type(e).__name__}: {e}", file=sys.stderr)
+                    returncode = 1
+    finally:
+        sys.argv, sys.stdin = saved_argv, saved_stdin
+    return returncode, out.getvalue(), err.getvalue()
+
+
+def main() -> None:
+    # Keep the protocol channel private: anything the CLI prints must go to
+    # the captured buffers, never to the pipe the pool is reading.
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", buffering=1)
+    sys.stdout = sys.stderr
+
+    cli = load_cli()
+
+    for line in sys.stdin:
+        try:
+            msg = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if msg.get("op") == "ping":
+            reply = {"ok": True}
+        elif msg.get("op") == "run":
+            rc, out, err = invoke_cli(cli, list(msg.get("args", [])))
+            reply = {"returncode": rc, "stdout": out, "stderr": err}
+        else:
+            reply = {"error": f"unknown op: {msg.get('op')}"}
+        channel.write(json.dumps(reply) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Deterministic pipelines for the multi-step recipes.
+
+A pipeline is a list of Steps, each naming the steps whose results it needs.
+Every step starts as soon as its needs have finished, so independent steps
+run concurrently; a failed step skips everything downstream of it while the
+rest of the pipeline carries on. A whole recipe then costs one tool call,
+and the model is only needed to narrate the outcome.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Step:
+    """One pipeline step.
+
+    run receives the results of the finished steps by name and returns a
+    tool-style result; a dict with an "error" key marks the step failed.
+    """
+
+    __slots__ = ("name", "run", "needs")
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[dict], Awaitable],
+        needs: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.run = run
+        self.needs = needs
+
+
+def failed(result) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+async def run_pipeline(steps: list[Step]) -> dict:
+    """Run steps as their needs complete.
+
+    Returns {"ok", "seconds", "steps": [...], "results": {name: result}}, where
+    each steps entry is {"step", "status" (ok/failed/skipped), "seconds"} plus
+    "error" for failures. Results only hold steps that ran.
+    """
+    names = {s.name for s in steps}
+    for step in steps:
+        unknown = set(step.needs) - names
+        if unknown:
+            raise ValueError(f"step '{step.name}' needs unknown steps {sorted(unknown)}")
+
+    loop = asyncio.get_running_loop()
+    succeeded = {s.name: loop.create_future() for s in steps}
+    results: dict = {}
+    report: dict[str, dict] = {}
+    started = time.monotonic()
+
+    async def run_step(step: Step):
+        ok = [await succeeded[n] for n in step.needs]
+        if not all(ok):
+            report[step.name] = {"step": step.name, "status": "skipped", "seconds": 0}
+            succeeded[step.name].set_result(False)
+            return
+        t0 = time.monotonic()
+        try:
+            result = await step.run(results)
+        except Exception as e:
+            logger.exception("pipeline step '%s' raised", step.name)
+            result = {"error": f"Unexpected Error: {e}"}
+        entry = {"step": step.name, "status": "ok", "seconds": round(time.monotonic() - t0, 1)}
+        if failed(result):
+            entry["status"] = "failed"
+            entry["error"] = result["error"]
+        results[step.name] = result
+        report[step.name] = entry
+        succeeded[step.name].set_result(entry["status"] == "ok")
+
+    await asyncio.gather(*(run_step(s) for s in steps))
+    ordered = [report[s.name] for s in steps]
+    return {
+        "ok": all(e["status"] == "ok" for e in ordered),
+        "seconds": round(time.monotonic() - started, 1),
+        "steps": ordered,
+        "results": results,
+    }
@@ -1,18 +1,42 @@
 """Custom ADK server with auth endpoints for NotebookLM agent."""
 
+import asyncio
 import io
+import json
 import secrets
-import time
 import zipfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from google.adk.cli.fast_api import get_fast_api_app
 
 import auth_store
+from notebooklm_agent.auth_cache import recheck_forever, warm_up
+from notebooklm_agent.jobs import job_manager
+from notebooklm_agent.metrics import registry
+from notebooklm_agent.progress import progress_hub
+from notebooklm_agent.tracing import install_exporters
+
+LONG_POLL_MAX = 60  # seconds an /auth/status request may wait for cookies
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up profile auth, and run the token sweeper and auth rechecks for the server's lifetime."""
+    tasks = [
+        asyncio.create_task(warm_up()),  # in the background: startup doesn't wait on nlm
+        asyncio.create_task(auth_store.sweep_forever()),
+        asyncio.create_task(recheck_forever()),
+    ]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 def create_app() -> FastAPI:
@@ -22,17 +46,9 @@ def create_app() -> FastAPI:
         host="0.0.0.0",
         port=8000,
         reload_agents=True,
+        lifespan=lifespan,
     )
-
-    # --- Cleanup middleware (must be registered before routes) ---
-
-    @app.middleware("http")
-    async def cleanup_tokens(request: Request, call_next):
-        cutoff = time.time() - 600  # 10 min expiry
-        expired = [k for k, v in auth_store.pending_auth.items() if v["received_at"] < cutoff]
-        for k in expired:
-            auth_store.pending_auth.pop(k, None)
-        return await call_next(request)
+    install_exporters()  # after get_fast_api_app, which sets up the tracer provider
 
     # --- Auth endpoints ---
 
@@ -44,24 +60,31 @@ def create_app() -> FastAPI:
         cookies = data.get("cookies")
         if not token or not cookies:
             return JSONResponse({"error": "token and cookies required"}, 400)
-        auth_store.pending_auth[token] = {"cookies": cookies, "received_at": time.time()}
+        if not await asyncio.to_thread(auth_store.store.put_cookies, token, cookies):
+            return JSONResponse({"error": "too many pending auth tokens, try again later"}, 429)
         return {"status": "ok"}
 
     @app.get("/auth/status/{token}")
-    async def auth_status(token: str):
-        """Check if cookies have been received for this token."""
-        entry = auth_store.pending_auth.get(token)
-        if not entry:
+    async def auth_status(token: str, wait: float = 0):
+        """Check if cookies have been received for this token.
+
+        With ?wait=N, long-poll: answer as soon as they arrive, or after N seconds.
+        """
+        if wait > 0:
+            cookies = await auth_store.store.wait_for_cookies(token, min(wait, LONG_POLL_MAX))
+        else:
+            cookies = await asyncio.to_thread(auth_store.store.peek, token)
+        if cookies is None:
             return {"ready": False}
-        return {"ready": True, "cookies": entry["cookies"]}
+        return {"ready": True, "cookies": cookies}
 
     @app.post("/auth/consume/{token}")
     async def consume_auth(token: str):
         """Consume (delete) a pending auth token after storing cookies."""
-        entry = auth_store.pending_auth.pop(token, None)
-        if not entry:
+        cookies = await asyncio.to_thread(auth_store.store.consume, token)
+        if cookies is None:
             return JSONResponse({"error": "token not found or already consumed"}, 404)
-        return {"status": "consumed", "cookies": entry["cookies"]}
+        return {"status": "consumed", "cookies": cookies}
 
     @app.get("/auth/token")
     async def generate_token():
@@ -76,20 +99,72 @@ def create_app() -> FastAPI:
         token = data.get("token")
         if not token:
             return JSONResponse({"error": "token required"}, 400)
-        auth_store.latest_token["token"] = token
-        auth_store.latest_token["created_at"] = time.time()
+        await asyncio.to_thread(auth_store.store.set_latest_token, token)
         return {"status": "ok"}
 
     @app.get("/auth/latest-token")
     async def latest_token():
         """Return the latest auth token for extension auto-fill."""
-        if not auth_store.latest_token["token"]:
-            return {"token": None}
-        # Expire after 10 minutes
-        if time.time() - auth_store.latest_token["created_at"] > 600:
-            auth_store.latest_token["token"] = None
-            return {"token": None}
-        return {"token": auth_store.latest_token["token"]}
+        return {"token": await asyncio.to_thread(auth_store.store.latest_token)}
+
+    # --- Background job endpoints ---
+
+    @app.get("/jobs")
+    async def list_jobs(session: str):
+        """List the retained background jobs of one ADK session."""
+        return {"jobs": [j.to_dict(include_result=False) for j in job_manager.list(owner=session)]}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str, session: str):
+        """Status of one of a session's background jobs, with its result once finished."""
+        job = job_manager.get(job_id, owner=session)
+        if not job:
+            return JSONResponse({"error": "job not found or expired"}, 404)
+        return job.to_dict()
+
+    @app.post("/jobs/{job_id}/cancel")
+    async def cancel_job(job_id: str, session: str):
+        """Cancel one of a session's queued or running background jobs."""
+        job = job_manager.cancel(job_id, owner=session)
+        if not job:
+            return JSONResponse({"error": "job not found or expired"}, 404)
+        return job.to_dict(include_result=False)
+
+    # --- Metrics ---
+
+    @app.get("/metrics")
+    async def metrics():
+        """Prometheus text exposition of this process's nlm and tool metrics."""
+        return Response(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    # --- Progress stream ---
+
+    @app.get("/progress/{session}")
+    async def progress(session: str, request: Request):
+        """Server-sent events: live progress for one ADK session's tool calls and jobs."""
+
+        async def events():
+            stream = progress_hub.stream(session)
+            next_event = None
+            try:
+                while not await request.is_disconnected():
+                    next_event = next_event or asyncio.ensure_future(anext(stream))
+                    done, _ = await asyncio.wait({next_event}, timeout=15)
+                    if not done:
+                        yield ": keepalive\n\n"
+                        continue
+                    event, next_event = next_event.result(), None
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            finally:
+                if next_event:
+                    next_event.cancel()
+                await stream.aclose()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     # Serve extension as downloadable zip
     ext_dir = Path(__file__).parent / "_extension"
@@ -0,0 +1,34 @@
+"""Shared fixtures. Tests never reach NotebookLM: nlm is a shell script in tmp_path."""
+
+import os
+import stat
+
+# Before the package is imported: no warm workers, no answers.db in $HOME
+os.environ.setdefault("NLM_WORKER_POOL", "0")
+os.environ.setdefault("NLM_ANSWER_CACHE", "0")
+os.environ.setdefault("NLM_AUTH_STORE", "memory://")
+
+import pytest  # noqa: E402
+
+from notebooklm_agent import executors  # noqa: E402
+
+
+@pytest.fixture
+def fake_nlm(tmp_path, monkeypatch):
+    """Install a fake `nlm`: a bash `case "$1 $2"` body; every call is logged.
+
+    Returns calls(), the argument lines it was invoked with so far.
+    """
+    log = tmp_path / "nlm.log"
+
+    def install(cases: str):
+        script = tmp_path / "nlm"
+        script.write_text(f'#!/bin/bash\necho "$@" >> {log}\ncase "$1 $2" in\n{cases}\nesac\n')
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setattr(executors, "NLM_PATH", str(script))
+        return calls
+
+    def calls() -> list[str]:
+        return log.read_text().splitlines() if log.exists() else []
+
+    return install
@@ -0,0 +1,148 @@
+"""A local stand-in for a Redis server: just the RESP commands RedisStore uses.
+
+Keys live in one dict behind one lock, so every command is atomic the way it
+is on a real server. EVAL runs the Python equivalent of a script RedisStore
+sends (SCRIPTS), under the same lock, so a script is atomic too. Tests can
+count commands, close every open connection (like a server timing out idle
+clients), or drop the connection right after running a command, before its
+reply is sent.
+"""
+
+import socketserver
+import threading
+import time
+from collections import Counter
+
+from auth_store import RedisStore
+
+
+class RespStandIn:
+    def __init__(self):
+        self.data: dict[bytes, tuple[object, float | None]] = {}  # key → (value, expires_at)
+        self.counts: Counter = Counter()
+        self.drop_after: set[str] = set()  # commands whose reply is lost (once each)
+        self._lock = threading.Lock()
+        self._conns: set = set()
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                standin._conns.add(self.request)
+                try:
+                    while True:
+                        args = standin._read_command(self.rfile)
+                        if args is None:
+                            return
+                        name = args[0].decode().upper()
+                        reply = standin._run(name, args[1:])
+                        if name in standin.drop_after:
+                            standin.drop_after.discard(name)
+                            return
+                        self.wfile.write(reply)
+                except (OSError, ValueError):
+                    return
+                finally:
+                    standin._conns.discard(self.request)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = "redis://127.0.0.1:%d/0" % self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.close_connections()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def close_connections(self):
+        for conn in list(self._conns):
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _read_command(rfile) -> list[bytes] | None:
+        line = rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(rfile.readline()[1:-2])
+            args.append(rfile.read(length + 2)[:-2])
+        return args
+
+    def _get(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _run(self, name: str, args: list[bytes]) -> bytes:
+        with self._lock:
+            self.counts[name] += 1
+            if name == "EVAL":
+                script = SCRIPTS.get(args[0].decode())
+                if script is None:
+                    return b"-ERR stand-in has no equivalent for this script\r\n"
+                count = int(args[1])
+                return b":%d\r\n" % script(self, args[2:2 + count], args[2 + count:])
+            return self._exec(name, args)
+
+    def _exec(self, name: str, args: list[bytes]) -> bytes:
+        """Run one command; the lock is held."""
+        if name in ("PING", "AUTH", "SELECT"):
+            return b"+OK\r\n" if name != "PING" else b"+PONG\r\n"
+        if name == "SET":
+            expires = time.time() + int(args[3]) if len(args) > 3 else None
+            self.data[args[0]] = (args[1], expires)
+            return b"+OK\r\n"
+        if name in ("GET", "GETDEL"):
+            value = self._get(args[0])
+            if name == "GETDEL":
+                self.data.pop(args[0], None)
+            return _bulk(value)
+        zset = self._get(args[0]) or {}
+        if name == "ZADD":
+            zset[args[2]] = float(args[1])
+            self.data[args[0]] = (zset, None)
+            return b":1\r\n"
+        if name == "ZREM":
+            return b":%d\r\n" % (zset.pop(args[1], None) is not None)
+        if name == "ZSCORE":
+            score = zset.get(args[1])
+            return _bulk(None if score is None else repr(score).encode())
+        if name == "ZCARD":
+            return b":%d\r\n" % len(zset)
+        if name == "ZREMRANGEBYSCORE":
+            low, high = float(args[1]), float(args[2])
+            gone = [m for m, s in zset.items() if low <= s <= high]
+            for member in gone:
+                del zset[member]
+            return b":%d\r\n" % len(gone)
+        return b"-ERR unknown command '%s'\r\n" % name.encode()
+
+
+def _put_cookies(standin: RespStandIn, keys: list[bytes], argv: list[bytes]) -> int:
+    """RedisStore.PUT_SCRIPT."""
+    index, cookie_key = keys
+    now, token, max_pending, ttl, cookies = argv
+    standin._exec("ZREMRANGEBYSCORE", [index, b"-inf", now])
+    zset = standin._get(index) or {}
+    if token not in zset and len(zset) >= int(max_pending):
+        return 0
+    standin._exec("ZADD", [index, repr(float(now) + int(ttl)).encode(), token])
+    standin._exec("SET", [cookie_key, cookies, b"EX", ttl])
+    return 1
+
+
+# Script source → its Python equivalent(standin, keys, argv) returning an integer reply
+SCRIPTS = {RedisStore.PUT_SCRIPT: _put_cookies}
+
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+
+from notebooklm_agent.admission import Scheduler, TokenBucket, lane
+
+READ = ["notebook", "list"]
+BULK = ["source", "add", "nb"]
+
+
+def test_lanes():
+    assert lane(READ) == lane(["notebook", "query", "nb", "q"]) == "interactive"
+    assert lane(BULK) == lane(["audio", "create", "nb"]) == "bulk"
+
+
+def test_concurrency_is_capped():
+    scheduler = Scheduler("p", concurrency=2, rate=0)
+    running, peak = 0, 0
+
+    async def command():
+        nonlocal running, peak
+        async with scheduler.slot_async(BULK, "s"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+    async def scenario():
+        await asyncio.gather(*(command() for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2 and scheduler.running == 0
+
+
+async def admitted_order(scheduler, queued):
+    """Hold the only slot, queue (name, args, session) in order, release; the order they ran in."""
+    order, gate = [], asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot_async(BULK, "holder"):
+            await gate.wait()
+
+    async def command(name, args, session):
+        async with scheduler.slot_async(args, session):
+            order.append(name)
+
+    first = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    tasks = []
+    for name, args, session in queued:
+        tasks.append(asyncio.create_task(command(name, args, session)))
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, *tasks)
+    return order
+
+
+def test_interactive_commands_go_first():
+    scheduler = Scheduler("p", concurrency=1, rate=0)
+    order = asyncio.run(admitted_order(scheduler, [
+        ("bulk-1", BULK, "a"), ("bulk-2", BULK, "a"), ("read", READ, "b"),
+    ]))
+    assert order == ["read", "bulk-1", "bulk-2"]
+
+
+def test_sessions_take_turns_within_a_lane():
+    scheduler = Scheduler("p", concurrency=1, rate=0)
+    order = asyncio.run(admitted_order(scheduler, [
+        ("a1", BULK, "a"), ("a2", BULK, "a"), ("a3", BULK, "a"), ("b1", BULK, "b"),
+    ]))
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    scheduler = Scheduler("p", concurrency=1, rate=0)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot_async(BULK, "a"):
+                await gate.wait()
+
+        async def waiter():
+            async with scheduler.slot_async(BULK, "b"):
+                pass
+
+        held = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        assert scheduler.depth("bulk") == 1
+        queued.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.depth("bulk") == 0
+        gate.set()
+        await held
+
+    asyncio.run(scenario())
+    assert scheduler.running == 0
+
+
+def test_token_bucket_paces_after_the_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+
+
+def test_slot_released_by_a_thread_wakes_an_async_waiter():
+    scheduler = Scheduler("p", concurrency=1, rate=0)
+    taken, release = threading.Event(), threading.Event()
+
+    def sync_holder():
+        with scheduler.slot(BULK, "a"):
+            taken.set()
+            release.wait()
+
+    thread = threading.Thread(target=sync_holder)
+    thread.start()
+    taken.wait()
+
+    async def scenario():
+        threading.Timer(0.05, release.set).start()
+        started = time.monotonic()
+        async with scheduler.slot_async(READ, "b"):
+            return time.monotonic() - started
+
+    waited = asyncio.run(asyncio.wait_for(scenario(), 5))
+    thread.join()
+    assert waited >= 0.04 and scheduler.running == 0
@@ -0,0 +1,41 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent import agent
+from notebooklm_agent.auth_cache import profile_auth
+
+
+def ctx(**state):
+    return SimpleNamespace(state=dict(state), session=SimpleNamespace(id="s1"), function_call_id="call-1")
+
+
+@pytest.fixture(autouse=True)
+def no_verified_profiles():
+    for profile in profile_auth.profiles():
+        profile_auth.invalidate(profile)
+
+
+def test_auth_revoked_for_the_profile_blocks_every_session():
+    profile_auth.mark_valid("work")
+    session = ctx(profile="work")
+    assert asyncio.run(agent._auth_block(session)) is None
+    assert session.state["auth_valid"] is True
+
+    profile_auth.invalidate("work")  # e.g. another session hit auth_expired
+    blocked = asyncio.run(agent._auth_block(session))
+    assert blocked["error"] == "Not authenticated."
+    assert session.state["auth_valid"] is False
+
+
+def test_stale_session_flag_alone_does_not_authenticate():
+    session = ctx(profile="work", auth_valid=True, auth_valid_at=time.time())
+    assert asyncio.run(agent._auth_block(session))["error"] == "Not authenticated."
+
+
+def test_app_caches_the_static_prefix():
+    assert agent.app.root_agent is agent.root_agent
+    assert agent.app.context_cache_config.ttl_seconds == agent.PROMPT_CACHE_TTL
+    assert agent.root_agent.static_instruction
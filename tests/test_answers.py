@@ -0,0 +1,58 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent.answers import AnswerCache
+from notebooklm_agent.projection import project_response
+from notebooklm_agent.tools import notebooks
+
+SOURCES = json.dumps({"sources": [{"id": "s1"}, {"id": "s2"}]})
+ANSWER = json.dumps({"value": {"answer": "Forty-two.", "conversation_id": "conv-first-asker"}})
+
+
+@pytest.fixture
+def answers(tmp_path, monkeypatch):
+    cache = AnswerCache(str(tmp_path / "answers.db"))
+    monkeypatch.setattr(notebooks, "answer_cache", cache)
+    return cache
+
+
+def ctx(session_id):
+    return SimpleNamespace(state={}, session=SimpleNamespace(id=session_id))
+
+
+def test_replayed_answers_are_marked_and_carry_no_conversation(fake_nlm, answers):
+    calls = fake_nlm(f"""
+"source list") echo '{SOURCES}' ;;
+"notebook query") echo '{ANSWER}' ;;
+""")
+    first = ctx("alice")
+    notebooks.query_notebook(first, "nb-answers", "What is the answer?")
+    assert first.state["conversation_id"] == "conv-first-asker"
+
+    second = ctx("bob")
+    second.state["conversation_id"] = "bobs-earlier-conversation"
+    result = notebooks.query_notebook(second, "nb-answers", "what is the answer")
+    assert result["cached"] is True and result["note"]
+    assert "conversation_id" not in json.dumps(result)
+    assert "conversation_id" not in second.state
+    assert second.state["active_notebook_id"] == "nb-answers"
+
+    shown = project_response(SimpleNamespace(name="query_notebook"), {}, second, result)
+    assert shown["answer"] == "Forty-two." and shown["cached"] is True and shown["note"]
+    assert "conversation_id" not in shown
+
+    # One upstream query; the second fingerprint came from the read cache
+    assert [c.split()[:2] for c in calls()] == [["source", "list"], ["notebook", "query"]]
+
+
+def test_follow_ups_and_fresh_requests_go_upstream(fake_nlm, answers):
+    calls = fake_nlm(f"""
+"source list") echo '{SOURCES}' ;;
+"notebook query") echo '{ANSWER}' ;;
+""")
+    notebooks.query_notebook(ctx("alice"), "nb-fresh", "Why?")
+    assert "cached" not in notebooks.query_notebook(ctx("bob"), "nb-fresh", "Why?", use_cache=False)
+    assert "cached" not in notebooks.query_notebook(ctx("bob"), "nb-fresh", "Why?", conversation_id="c")
+    assert sum(c.startswith("notebook query") for c in calls()) == 3
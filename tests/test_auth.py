@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import auth_store
+from notebooklm_agent.auth_cache import profile_auth
+from notebooklm_agent.tools import auth
+
+COOKIES = {"SID": "abc", "HSID": "def"}
+LOGIN = '"login --manual") echo "Imported cookies" ;;'
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    monkeypatch.setattr(auth_store, "store", auth_store.MemoryStore())
+    yield
+    for profile in profile_auth.profiles():
+        profile_auth.invalidate(profile)
+
+
+def ctx(**state):
+    return SimpleNamespace(state={"auth_token": "tok", **state}, session=SimpleNamespace(id="s1"))
+
+
+def deliver_after(seconds, token="tok"):
+    timer = threading.Timer(seconds, auth_store.store.put_cookies, (token, COOKIES))
+    timer.start()
+    return timer
+
+
+def test_wait_for_auth_imports_as_soon_as_cookies_arrive(fake_nlm):
+    calls = fake_nlm(LOGIN)
+    context = ctx()
+    deliver_after(0.1)
+    started = time.monotonic()
+    result = asyncio.run(auth.wait_for_auth_async(context, timeout=10))
+    assert time.monotonic() - started < 5
+    assert result["authenticated"] is True
+    assert context.state["auth_valid"] is True
+    assert context.state["auth_token"] is None
+    assert calls()[0].startswith("login --manual --file ")
+    assert auth_store.store.peek("tok") is None  # consumed: auth_guard can't import them again
+
+
+def test_wait_for_auth_times_out_without_cookies(fake_nlm):
+    calls = fake_nlm(LOGIN)
+    result = asyncio.run(auth.wait_for_auth_async(ctx(), timeout=0))
+    assert result["ready"] is False
+    assert "wait_for_auth again" in result["message"]
+    assert calls() == []
+
+
+def test_wait_for_auth_needs_a_token():
+    assert "error" in asyncio.run(auth.wait_for_auth_async(ctx(auth_token=None), timeout=1))
+
+
+def test_sync_wait_for_auth_picks_up_waiting_cookies(fake_nlm):
+    fake_nlm(LOGIN)
+    auth_store.store.put_cookies("tok", COOKIES)
+    assert auth.wait_for_auth(ctx(), timeout=1)["authenticated"] is True
+
+
+@pytest.fixture(scope="module")
+def client():
+    import server
+
+    return TestClient(server.create_app())  # no lifespan: no warm-up, sweeper or rechecks
+
+
+def test_auth_status_answers_at_once_without_wait(client):
+    assert client.get("/auth/status/tok").json() == {"ready": False}
+    auth_store.store.put_cookies("tok", COOKIES)
+    assert client.get("/auth/status/tok").json() == {"ready": True, "cookies": COOKIES}
+
+
+def test_auth_status_long_polls_until_delivery(client):
+    deliver_after(0.2)
+    started = time.monotonic()
+    assert client.get("/auth/status/tok", params={"wait": 10}).json() == {"ready": True, "cookies": COOKIES}
+    assert time.monotonic() - started < 5
+    assert auth_store.store.peek("tok") == COOKIES  # status never consumes
+
+
+def test_auth_status_long_poll_gives_up_after_wait(client):
+    started = time.monotonic()
+    assert client.get("/auth/status/tok", params={"wait": 0.3}).json() == {"ready": False}
+    assert 0.25 <= time.monotonic() - started < 5
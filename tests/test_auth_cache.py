@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from notebooklm_agent import auth_cache
+from notebooklm_agent.auth_cache import profile_auth, recheck_forever, warm_up
+
+# `nlm login --check --profile <p>`: only profile "good" is logged in
+CHECK = '''"login --check") if [ "$4" != "good" ]; then echo "Error: Authentication expired" >&2; exit 1; fi
+               echo "Authenticated" ;;'''
+
+
+@pytest.fixture(autouse=True)
+def no_verified_profiles():
+    yield
+    for profile in profile_auth.profiles():
+        profile_auth.invalidate(profile)
+
+
+def test_warm_up_checks_every_profile(fake_nlm):
+    calls = fake_nlm(CHECK)
+    asyncio.run(warm_up(["good", "stale"]))
+    assert profile_auth.valid_at("good") is not None
+    assert profile_auth.valid_at("stale") is None
+    assert sorted(calls()) == ["login --check --profile good", "login --check --profile stale"]
+
+
+def test_server_warms_up_configured_profiles_at_startup(fake_nlm, monkeypatch):
+    import server
+
+    fake_nlm(CHECK)
+    monkeypatch.setattr(auth_cache, "AUTH_PROFILES", ["good", "stale"])
+    with TestClient(server.create_app()):
+        deadline = time.monotonic() + 5
+        while profile_auth.valid_at("good") is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+    assert profile_auth.valid_at("good") is not None
+    assert profile_auth.valid_at("stale") is None
+
+
+def test_recheck_drops_a_lapsed_profile_near_expiry(fake_nlm):
+    calls = fake_nlm(CHECK)
+    now = time.time()
+    profile_auth.mark_valid("stale", now - profile_auth.max_age + 60)  # a minute left
+    profile_auth.mark_valid("good", now - profile_auth.max_age + 60)
+    profile_auth.mark_valid("fresh", now)  # far from expiry: not checked
+
+    async def one_pass():
+        task = asyncio.create_task(recheck_forever(interval=0.01))
+        await asyncio.sleep(0.5)
+        task.cancel()
+
+    asyncio.run(one_pass())
+    assert profile_auth.valid_at("stale") is None
+    assert profile_auth.valid_at("good") is not None  # still logged in: kept
+    assert "login --check --profile good" in calls()
+    assert profile_auth.valid_at("fresh") is not None
+    assert "login --check --profile fresh" not in calls()
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+
+import pytest
+
+from auth_store import MemoryStore, RedisStore, SQLiteStore
+from resp_standin import RespStandIn
+
+COOKIES = {"SID": "abc", "HSID": "def"}
+
+
+@pytest.fixture
+def redis():
+    standin = RespStandIn()
+    yield standin
+    standin.close()
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def two_stores(request, tmp_path):
+    """Two store instances on one shared backend, like two server workers."""
+    if request.param == "sqlite":
+        path = str(tmp_path / "auth.db")
+        return SQLiteStore(path), SQLiteStore(path)
+    standin = RespStandIn()
+    request.addfinalizer(standin.close)
+    return RedisStore(standin.url), RedisStore(standin.url)
+
+
+def test_consume_is_atomic_across_stores(two_stores):
+    for round_ in range(5):
+        token = f"token-{round_}"
+        assert two_stores[0].put_cookies(token, COOKIES)
+        got, start = [], threading.Barrier(8)
+
+        def take(store):
+            start.wait()
+            got.append(store.consume(token))
+
+        threads = [threading.Thread(target=take, args=(two_stores[i % 2],)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert [c for c in got if c] == [COOKIES]
+
+
+def test_delivery_is_seen_by_the_other_store(two_stores):
+    first, second = two_stores
+    assert first.peek("t") is None
+    first.put_cookies("t", COOKIES)
+    assert second.peek("t") == COOKIES
+    first.set_latest_token("t")
+    assert second.latest_token() == "t"
+
+
+def test_pending_tokens_are_capped(two_stores):
+    first, second = two_stores
+    first.max_pending = second.max_pending = 2
+    assert first.put_cookies("a", COOKIES)
+    assert second.put_cookies("b", COOKIES)
+    assert not first.put_cookies("c", COOKIES)
+    assert second.put_cookies("a", {"SID": "replaced"})  # a token already waiting may be replaced
+    second.consume("a")
+    assert first.put_cookies("c", COOKIES)
+
+
+def test_expired_cookies_are_never_handed_out(tmp_path):
+    for store in (MemoryStore(ttl=-1), SQLiteStore(str(tmp_path / "auth.db"), ttl=-1)):
+        store.put_cookies("t", COOKIES)
+        assert store.peek("t") is None
+        assert store.consume("t") is None
+
+
+def test_waiter_wakes_for_a_delivery_to_another_store(two_stores):
+    first, second = two_stores
+    first.poll_interval = 0.05
+
+    async def scenario():
+        waiter = asyncio.create_task(first.wait_for_cookies("t", 5, consume=True))
+        await asyncio.sleep(0.1)
+        await asyncio.to_thread(second.put_cookies, "t", COOKIES)
+        return await waiter
+
+    assert asyncio.run(scenario()) == COOKIES
+    assert second.peek("t") is None
+
+
+def test_redis_reconnects_after_idle_disconnect(redis):
+    store = RedisStore(redis.url)
+    store.put_cookies("t", COOKIES)
+    redis.close_connections()  # e.g. the server's idle timeout
+    assert store.peek("t") == COOKIES
+    redis.close_connections()
+    assert store.consume("t") == COOKIES
+    assert redis.counts["GETDEL"] == 1
+
+
+def test_redis_never_resends_getdel(redis):
+    store = RedisStore(redis.url)
+    store.put_cookies("t", COOKIES)
+    redis.drop_after.add("GETDEL")  # it runs, but the reply is lost
+    with pytest.raises((OSError, EOFError)):
+        store.consume("t")
+    assert redis.counts["GETDEL"] == 1
+    assert store.peek("t") is None  # and the store still works afterwards
+
+
+def test_the_cap_holds_under_concurrent_deliveries(two_stores):
+    first, second = two_stores
+    first.max_pending = second.max_pending = 3
+    stored, start = [], threading.Barrier(10)
+
+    def deliver(i):
+        start.wait()
+        stored.append((first, second)[i % 2].put_cookies(f"t{i}", COOKIES))
+
+    threads = [threading.Thread(target=deliver, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert stored.count(True) == 3
+
+
+def test_redis_put_is_one_round_trip(redis):
+    store = RedisStore(redis.url)
+    assert store.put_cookies("t", COOKIES)
+    assert redis.counts["EVAL"] == 1
+    assert not {"ZCARD", "ZADD", "SET"} & set(redis.counts)
+    assert store.peek("t") == COOKIES
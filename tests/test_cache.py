@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from notebooklm_agent import cache as cache_module
+from notebooklm_agent.cache import ReadCache
+from notebooklm_agent.helpers import run_sync
+
+LIST = ["notebook", "list"]
+
+
+@pytest.fixture
+def short_ttls(monkeypatch):
+    """TTL 0.05s for every cached command, 0.2s stale window."""
+    monkeypatch.setattr(cache_module, "READ_TTLS", {k: 0.05 for k in cache_module.READ_TTLS})
+    monkeypatch.setattr(cache_module, "STALE_SECONDS", 0.2)
+
+
+def counter(value):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"n": len(calls), **value}
+
+    return fetch, calls
+
+
+def test_hit_returns_a_copy():
+    cache = ReadCache()
+    fetch, calls = counter({"items": [1]})
+    first = cache.read_through(LIST, "p", fetch)
+    first["items"].append("mutated")
+    second = cache.read_through(LIST, "p", fetch)
+    second["items"].append("again")
+    assert cache.read_through(LIST, "p", fetch) == {"n": 1, "items": [1]}
+    assert len(calls) == 1
+
+
+def test_errors_are_not_cached():
+    cache = ReadCache()
+    cache.read_through(LIST, "p", lambda: {"error": "boom"})
+    assert cache.read_through(LIST, "p", lambda: {"ok": True}) == {"ok": True}
+
+
+def test_profiles_are_separate():
+    cache = ReadCache()
+    cache.read_through(LIST, "a", lambda: {"who": "a"})
+    assert cache.read_through(LIST, "b", lambda: {"who": "b"}) == {"who": "b"}
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(short_ttls):
+    cache = ReadCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return {"n": len(calls)}
+
+    cache.read_through(LIST, "p", fetch)
+    time.sleep(0.08)  # expired, still inside the stale window
+    assert cache.read_through(LIST, "p", fetch) == {"n": 1}
+    assert cache.read_through(LIST, "p", fetch) == {"n": 1}
+    release.set()
+    time.sleep(0.05)
+    assert len(calls) == 2  # one background refresh, not two
+    assert cache.read_through(LIST, "p", fetch) == {"n": 2}
+
+
+def test_stale_refresh_outlives_a_run_sync_loop(short_ttls):
+    cache = ReadCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)  # still running when run_sync's loop closes
+        return {"n": len(calls)}
+
+    assert run_sync(cache.read_through_async(LIST, "p", fetch)) == {"n": 1}
+    time.sleep(0.08)
+    assert run_sync(cache.read_through_async(LIST, "p", fetch)) == {"n": 1}
+    time.sleep(0.05)
+    assert run_sync(cache.read_through_async(LIST, "p", fetch)) == {"n": 2}
+    assert len(calls) == 2
+
+
+def test_studio_status_is_never_served_stale(short_ttls):
+    cache = ReadCache()
+    fetch, calls = counter({})
+    status = ["studio", "status", "nb"]
+    cache.read_through(status, "p", fetch)
+    time.sleep(0.08)
+    assert cache.read_through(status, "p", fetch) == {"n": 2}
+
+
+def test_mutation_invalidates_affected_reads_only():
+    cache = ReadCache()
+    cache.read_through(["source", "list", "nb1"], "p", lambda: {"v": 1})
+    cache.read_through(["source", "list", "nb2"], "p", lambda: {"v": 1})
+    cache.invalidate_after(["source", "add", "nb1", "--url", "u"], "p")
+    assert cache.read_through(["source", "list", "nb1"], "p", lambda: {"v": 2}) == {"v": 2}
+    assert cache.read_through(["source", "list", "nb2"], "p", lambda: {"v": 2}) == {"v": 1}
+
+
+def test_read_started_before_a_mutation_is_not_stored():
+    cache = ReadCache()
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow_fetch():
+            started.set()
+            await asyncio.sleep(0.05)
+            return {"v": "before"}
+
+        read = asyncio.create_task(cache.read_through_async(LIST, "p", slow_fetch))
+        await started.wait()
+        cache.invalidate_after(["notebook", "create", "T"], "p")
+        await read
+
+        async def fresh():
+            return {"v": "after"}
+
+        return await cache.read_through_async(LIST, "p", fresh)
+
+    assert asyncio.run(main()) == {"v": "after"}
+
+
+def test_only_read_only_commands_with_a_ttl_are_cacheable():
+    assert ReadCache.cacheable(LIST, True)
+    assert not ReadCache.cacheable(LIST, False)
+    assert not ReadCache.cacheable(["research", "status", "nb"], True)  # read-only, no TTL
+    assert not ReadCache.cacheable(["notebook", "create", "x"], True)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent import executors
+from notebooklm_agent.executors import SubprocessExecutor
+from notebooklm_agent.progress import progress_hub, session_var
+
+ADD = ["source", "add", "nb", "--url", "https://example.com"]
+
+
+class FakePool:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, args, profile, timeout):
+        self.calls.append(args)
+        return subprocess.CompletedProcess(args, 0, "Added source from pool", "")
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(executors, "pool", pool)
+    return pool
+
+
+async def run_in_session(session, args, watch=False):
+    """execute_async inside session; with watch, while a subscriber is listening."""
+    events, stream, listener = [], progress_hub.stream(session), None
+    if watch:
+        async def listen():
+            async for event in stream:
+                events.append(event)
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0)  # subscribed once the generator starts
+    session_var.set(session)
+    try:
+        return await SubprocessExecutor().execute_async(args, "p", False, 10), events
+    finally:
+        if listener:
+            await asyncio.sleep(0.05)
+            listener.cancel()
+
+
+def test_unwatched_sessions_keep_the_pool(fake_nlm, fake_pool):
+    calls = fake_nlm('"source add") echo spawned ;;')
+    result, _ = asyncio.run(run_in_session("nobody-watching", ADD))
+    assert result == {"output": "Added source from pool"}
+    assert len(fake_pool.calls) == 1
+    assert calls() == []
+
+
+def test_watched_sessions_stream_progress(fake_nlm, fake_pool):
+    fake_nlm('"source add") echo "Uploading... 40%"; echo "Added source: Example" ;;')
+    result, events = asyncio.run(run_in_session("watched", ADD, watch=True))
+    assert result["output"].endswith("Added source: Example")
+    assert fake_pool.calls == []
+    outputs = [e for e in events if e["type"] == "output"]
+    assert [e.get("percent") for e in outputs] == [40, None]
+    assert outputs[-1]["stage"] == "done"
+
+
+def test_streaming_survives_lines_over_64k(fake_nlm, fake_pool):
+    fake_nlm('"source add") head -c 300000 /dev/zero | tr "\\0" x; echo; echo "Added source: Big" ;;')
+    result, events = asyncio.run(run_in_session("watched-big", ADD, watch=True))
+    assert "error" not in result
+    assert result["output"].startswith("x" * 300000)
+    assert [e["message"] for e in events if e["type"] == "output"][-1] == "Added source: Big"
+
+
+class FakeClient:
+    """Stands in for NotebookLMClient under both the CLI and InProcessExecutor."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def close(self):
+        pass
+
+    def list_notebooks(self):
+        return [
+            SimpleNamespace(id="nb1", title="Kubernetes", source_count=3, modified_at="2026-01-02T00:00:00"),
+            SimpleNamespace(id="nb2", title="-Drafts", source_count=0, modified_at=None),
+        ]
+
+    def get_notebook_sources_with_types(self, notebook_id):
+        return [{"id": "s1", "title": "Intro", "source_type_name": "web_page", "url": "https://a.example"}]
+
+    def poll_studio_status(self, notebook_id):
+        return [{"artifact_id": "a1", "type": "audio", "status": "completed", "title": "Overview"}]
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    from notebooklm_tools.cli.commands import note, notebook, share, source, studio
+    from notebooklm_tools.services import chat, notebooks, notes, sharing
+
+    client = FakeClient()
+    for module in (note, notebook, share, source, studio):
+        monkeypatch.setattr(module, "get_client", lambda profile=None: client)
+    monkeypatch.setattr(notebooks, "get_notebook", lambda c, nb: {"notebook_id": nb, "title": "Kubernetes"})
+    monkeypatch.setattr(
+        chat,
+        "query",
+        lambda c, nb, q, source_ids=None, conversation_id=None: {
+            "answer": f"re: {q}", "sources_used": source_ids or [], "conversation_id": conversation_id or "conv1",
+        },
+    )
+    monkeypatch.setattr(notes, "list_notes", lambda c, nb: {"notes": [{"id": "n1", "title": "Todo"}], "count": 1})
+    monkeypatch.setattr(
+        sharing,
+        "get_share_status",
+        lambda c, nb: {"access_level": "restricted", "is_public": False, "public_link": None, "collaborators": []},
+    )
+    inprocess = executors.InProcessExecutor(fallback=SubprocessExecutor())
+    monkeypatch.setattr(inprocess, "_client", lambda profile: client)
+    return inprocess
+
+
+def cli_json(args):
+    from notebooklm_tools.cli.main import app
+    from typer.testing import CliRunner
+
+    result = CliRunner().invoke(app, args + ["--json"])
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["notebook", "list"],
+        ["notebook", "get", "nb1"],
+        ["notebook", "query", "nb1", "what changed?"],
+        ["notebook", "query", "nb1", "and then?", "-c", "conv7", "--source-ids", "s1,s2"],
+        ["source", "list", "nb1"],
+        ["note", "list", "nb1"],
+        ["share", "status", "nb1"],
+        ["studio", "status", "nb1"],
+    ],
+)
+def test_inprocess_output_matches_the_cli(fake_client, args):
+    assert fake_client.execute(args, "default", True, 60) == cli_json(args)
+
+
+def test_inprocess_keeps_positionals_that_look_like_options(fake_client):
+    result = fake_client.execute(["notebook", "query", "nb1", "-5 degrees: why?", "-c", "-x1"], "default", True, 60)
+    assert result["value"]["answer"] == "re: -5 degrees: why?"
+    assert result["value"]["conversation_id"] == "-x1"
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent.instructions import (
+    AGENT_INSTRUCTION,
+    CORE,
+    SECTIONS,
+    STATIC_INSTRUCTION,
+    TRIGGERS,
+    assemble,
+    build_instruction,
+    select_sections,
+)
+
+
+def ctx(*messages, auth_valid=False):
+    """A ReadonlyContext with the given user messages, oldest first."""
+    events = [
+        SimpleNamespace(
+            author="user",
+            content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+            invocation_id="inv",
+            actions=None,
+        )
+        for text in messages
+    ]
+    return SimpleNamespace(
+        state={"auth_valid": auth_valid},
+        session=SimpleNamespace(events=events),
+        user_content=None,
+        invocation_id="inv",
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("research kubernetes security", {"recipe_1", "research"}),
+        ("index my codebase at /src", {"recipe_2"}),
+        ("find resources about WebAssembly", {"recipe_3"}),
+        ("make me a quiz on this", {"recipe_7", "recipe_1"}),  # recipe 7 builds on recipe 1
+        ("add https://a.example and https://b.example", {"recipe_8"}),
+        ("who has access to this notebook?", {"recipe_9"}),
+        ("thanks!", set()),
+    ],
+)
+def test_triggers_pick_the_recipe_sections(text, expected):
+    assert set(select_sections(text)) - set(CORE) == expected
+
+
+def test_auth_section_only_while_authenticating():
+    assert "auth" in select_sections("hi", authenticating=True)
+    assert "auth" not in select_sections("hi")
+
+
+def test_every_section_is_reachable():
+    assert set(SECTIONS) == set(CORE) | set(TRIGGERS) | {"auth"}
+
+
+def test_static_and_dynamic_parts_reassemble_the_playbook():
+    everything = " ".join([
+        "research a quiz about kubernetes codebase resources docs debug mindmap",
+        "https://a.example https://b.example share",
+    ])
+    dynamic = build_instruction(ctx(everything))
+    assert set(select_sections(everything, authenticating=True)) == set(SECTIONS)
+    extra = [name for name in SECTIONS if name not in CORE]
+    assert dynamic.endswith(assemble(extra))
+    for name in SECTIONS:
+        assert (SECTIONS[name] in STATIC_INSTRUCTION) != (SECTIONS[name] in dynamic)
+    assert assemble(list(CORE)) == STATIC_INSTRUCTION
+    assert assemble(select_sections(everything, authenticating=True)) == AGENT_INSTRUCTION
+
+
+def test_only_the_recent_messages_count():
+    instruction = build_instruction(ctx("research kubernetes", "ok", "thanks", auth_valid=True))
+    assert instruction == "No recipe-specific instructions apply to this request."
@@ -0,0 +1,65 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent.jobs import JobManager
+from notebooklm_agent.tools import jobs as job_tools
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = JobManager(workers=1)
+    monkeypatch.setattr(job_tools, "job_manager", manager)
+    yield manager
+    manager.close()
+
+
+def ctx(session_id):
+    return SimpleNamespace(state={}, session=SimpleNamespace(id=session_id))
+
+
+def wait_for(job, *statuses):
+    deadline = time.monotonic() + 5
+    while job.status not in statuses:
+        assert time.monotonic() < deadline, job.status
+        time.sleep(0.01)
+
+
+async def result(value, delay=0.0):
+    await asyncio.sleep(delay)
+    return value
+
+
+def test_job_ids_are_unguessable(manager):
+    job = manager.submit("test", "Testing", lambda: result({"ok": True}), owner="alice")
+    assert len(job.id) >= 22
+
+
+def test_jobs_are_visible_to_their_session_only(manager):
+    job = manager.submit("test", "Testing", lambda: result({"ok": True}), owner="alice")
+    wait_for(job, "succeeded")
+
+    assert job_tools.job_status(ctx("alice"), job.id)["result"] == {"ok": True}
+    assert "error" in job_tools.job_status(ctx("mallory"), job.id)
+    assert [j["job_id"] for j in job_tools.list_jobs(ctx("alice"))["jobs"]] == [job.id]
+    assert job_tools.list_jobs(ctx("mallory"))["jobs"] == []
+
+
+def test_only_the_owner_can_cancel(manager):
+    job = manager.submit("test", "Testing", lambda: result({}, delay=10), owner="alice")
+    wait_for(job, "running")
+
+    assert "error" in job_tools.cancel_job(ctx("mallory"), job.id)
+    assert job.status == "running"
+    job_tools.cancel_job(ctx("alice"), job.id)
+    wait_for(job, "cancelled")
+
+
+def test_queued_jobs_wait_for_a_slot(manager):
+    first = manager.submit("test", "First", lambda: result({}, delay=0.2), owner="alice")
+    second = manager.submit("test", "Second", lambda: result({"n": 2}), owner="alice")
+    wait_for(first, "running")
+    assert second.status == "queued"
+    wait_for(second, "succeeded")
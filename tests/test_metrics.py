@@ -0,0 +1,57 @@
+import pytest
+
+from notebooklm_agent.metrics import Counter, Gauge, Histogram, Registry, command_label
+
+
+def test_render_is_prometheus_text():
+    registry = Registry()
+    calls = registry.register(Counter("calls_total", "Calls.", ("command", "outcome")))
+    depth = registry.register(Gauge("queue_depth", "Queued.", ("lane",)))
+    seconds = registry.register(Histogram("call_seconds", "Call time.", ("command",), buckets=(1, 0.5)))
+    calls.inc(command="notebook list", outcome="ok")
+    calls.inc(2, command="notebook list", outcome="ok")
+    depth.inc(lane="bulk")
+    depth.dec(lane="bulk")
+    for value in (0.2, 0.7, 3):
+        seconds.observe(value, command="query")
+
+    assert registry.render() == "\n".join([
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{command="notebook list",outcome="ok"} 3',
+        "# HELP queue_depth Queued.",
+        "# TYPE queue_depth gauge",
+        'queue_depth{lane="bulk"} 0',
+        "# HELP call_seconds Call time.",
+        "# TYPE call_seconds histogram",
+        'call_seconds_bucket{command="query",le="0.5"} 1',  # buckets sorted, counts cumulative
+        'call_seconds_bucket{command="query",le="1"} 2',
+        'call_seconds_bucket{command="query",le="+Inf"} 3',
+        'call_seconds_sum{command="query"} 3.9',
+        'call_seconds_count{command="query"} 3',
+    ]) + "\n"
+
+
+def test_label_values_are_escaped():
+    counter = Counter("errors_total", "Errors.", ("message",))
+    counter.inc(message='say "hi"\\now\nbye')
+    assert counter.render()[-1] == r'errors_total{message="say \"hi\"\\now\nbye"} 1'
+
+
+def test_unlabelled_metric_has_no_braces():
+    gauge = Gauge("up", "Up.")
+    gauge.set(1)
+    assert gauge.render()[-1] == "up 1"
+
+
+@pytest.mark.parametrize("args, label", [
+    (["notebook", "list", "--json"], "notebook list"),
+    (["login", "--check"], "login --check"),
+    (["query", "1b2c3d4e-aaaa-bbbb-cccc-000000000000", "what?"], "query"),
+    (["source", "add", "https://example.com"], "source add"),
+    (["source", "/tmp/file.pdf"], "source"),
+    (["1b2c3d4e-aaaa-bbbb-cccc-000000000000"], "nlm"),
+    ([], "nlm"),
+])
+def test_command_label_drops_ids_paths_and_urls(args, label):
+    assert command_label(args) == label
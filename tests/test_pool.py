@@ -0,0 +1,80 @@
+import subprocess
+import textwrap
+import time
+
+import pytest
+
+from notebooklm_agent import executors, pool as pool_module
+from notebooklm_agent.pool import Worker, WorkerError, WorkerPool
+
+# Stands in for worker.py: the command's first argument picks its behaviour
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys, time
+    for line in sys.stdin:
+        msg = json.loads(line)
+        if msg["op"] == "ping":
+            reply = {"ok": True}
+        elif "crash" in msg["args"]:
+            os._exit(1)
+        elif "garbled" in msg["args"]:
+            sys.stdout.write("not json\\n"); sys.stdout.flush(); continue
+        elif "partial" in msg["args"]:
+            sys.stdout.write('{"returncode"'); sys.stdout.flush(); time.sleep(60)
+        else:
+            reply = {"returncode": 0, "stdout": f"pid {os.getpid()}", "stderr": ""}
+        sys.stdout.write(json.dumps(reply) + "\\n"); sys.stdout.flush()
+''')
+
+
+@pytest.fixture
+def worker_pool(tmp_path, monkeypatch):
+    script = tmp_path / "worker.py"
+    script.write_text(FAKE_WORKER)
+    monkeypatch.setattr(pool_module, "WORKER_SCRIPT", script)
+    workers = WorkerPool(size=2)
+    yield workers
+    workers.close()
+
+
+def test_reuses_a_warm_worker(worker_pool):
+    first = worker_pool.run(["notebook", "list"], "default", 5)
+    second = worker_pool.run(["notebook", "list"], "default", 5)
+    assert first.returncode == 0 and first.stdout == second.stdout
+
+
+def test_crash_mid_mutation_is_an_error_not_a_rerun(worker_pool):
+    result = worker_pool.run(["source", "add", "crash"], "default", 5)
+    assert result is not None and result.returncode == 1
+    assert "may or may not have taken effect" in result.stderr
+
+
+def test_crash_mid_read_falls_back_to_spawning(worker_pool):
+    assert worker_pool.run(["notebook", "list", "crash"], "default", 5) is None
+
+
+def test_garbled_reply_to_a_mutation_is_an_error(worker_pool):
+    result = worker_pool.run(["notebook", "create", "garbled"], "default", 5)
+    assert result.returncode == 1
+
+
+def test_partial_reply_line_times_out_at_the_deadline(worker_pool):
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        worker_pool.run(["notebook", "list", "partial"], "default", 1)
+    assert time.monotonic() - started < 3
+
+
+def test_dead_worker_fails_before_dispatch(worker_pool):
+    worker = Worker("default")
+    worker.proc.kill()
+    worker.proc.wait()
+    with pytest.raises(WorkerError) as info:
+        worker.run(["source", "add", "x"], 5)
+    assert info.value.dispatched is False
+
+
+def test_executor_does_not_spawn_a_mutation_the_worker_crashed_on(worker_pool, fake_nlm, monkeypatch):
+    calls = fake_nlm('*) echo spawned;;')
+    monkeypatch.setattr(executors, "pool", worker_pool)
+    result = executors.SubprocessExecutor().execute(["source", "add", "crash"], "default", False, 5)
+    assert "error" in result and calls() == []
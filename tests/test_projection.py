@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+
+from notebooklm_agent.projection import ResultStore, _size, fit_budget, project_response, result_store
+from notebooklm_agent.tools.results import fetch_result
+
+
+def ctx(session="s1"):
+    return SimpleNamespace(state={}, session=SimpleNamespace(id=session))
+
+
+def page_through(owner, response, field, budget):
+    """Everything shown for field, following "more" handles to the end."""
+    shown = list(response[field]) if isinstance(response[field], list) else response[field]
+    more = response.get("more")
+    while more:
+        page = result_store.next_page(owner, more["handle"], budget)
+        assert page["field"] == field
+        assert _size(page) <= budget
+        shown += page["part"]
+        more = page.get("more")
+    return shown
+
+
+def test_a_response_under_budget_is_untouched():
+    response = {"items": [1, 2, 3]}
+    assert fit_budget(response, "s1", budget=1000) is response
+
+
+def test_a_long_list_is_cut_to_the_budget_and_paged():
+    items = [{"title": f"Source {i}", "detail": "x" * 40} for i in range(100)]
+    response = fit_budget({"count": 100, "items": items}, "s1", budget=1000)
+    assert _size(response) <= 1000
+    assert response["count"] == 100
+    assert response["more"]["shown"] == len(response["items"]) < 100
+    assert response["more"]["total"] == 100
+    assert page_through("s1", response, "items", budget=1000) == items
+
+
+def test_a_long_string_is_cut_and_paged():
+    answer = "word " * 1000
+    response = fit_budget({"answer": answer}, "s1", budget=800)
+    assert _size(response) <= 800
+    assert page_through("s1", response, "answer", budget=800) == answer
+
+
+def test_fetch_result_pages_for_the_owning_session_only():
+    items = [f"item-{i}" * 20 for i in range(200)]
+    response = fit_budget({"items": items}, "s1")
+    handle = response["more"]["handle"]
+    assert "error" in fetch_result(ctx("s2"), handle)
+    page = fetch_result(ctx("s1"), handle)
+    assert page["part"][0] == items[response["more"]["shown"]]
+
+
+def test_an_oversized_item_still_goes_out_whole():
+    store = ResultStore()
+    huge = "y" * 5000
+    handle = store.put("s1", "items", ["a", huge, "b"], 1)
+    page = store.next_page("s1", handle, budget=1000)
+    assert page["part"] == [huge]
+    assert page["more"]["shown"] == 2
+    assert store.next_page("s1", handle, budget=1000) == {"field": "items", "part": ["b"]}
+    assert "error" in store.next_page("s1", handle, budget=1000)  # used up
+
+
+def test_remainders_expire():
+    store = ResultStore(ttl=-1)
+    handle = store.put("s1", "items", [1, 2], 1)
+    assert "error" in store.next_page("s1", handle)
+
+
+def test_projection_numbers_lists_and_keeps_ids_in_state():
+    context = ctx()
+    result = [{"id": f"nb{i}", "title": f"Notebook {i}", "source_count": i} for i in range(1, 4)]
+    projected = project_response(SimpleNamespace(name="list_notebooks"), {}, context, result)
+    assert projected == {
+        "notebooks": [{"n": i, "title": f"Notebook {i}", "sources": i} for i in range(1, 4)],
+        "count": 3,
+    }
+    assert context.state["last_notebook_list"] == ["nb1", "nb2", "nb3"]
+    assert "nb1" not in json.dumps(projected)
+
+
+def test_fetch_result_is_not_budgeted_again():
+    page = {"field": "items", "part": ["z" * 10000]}
+    assert project_response(SimpleNamespace(name="fetch_result"), {}, ctx(), page) is None
@@ -0,0 +1,89 @@
+import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent import helpers
+from notebooklm_agent.tools import research
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(helpers, "_imported", OrderedDict())
+
+
+def import_once(state):
+    return asyncio.run(helpers.import_once("p", "nb", state))
+
+
+def test_a_task_is_imported_once(fake_nlm):
+    calls = fake_nlm('"research import") echo imported ;;')
+    state = {"status": "completed", "task_id": "t1", "sources_found": 3}
+    assert import_once(state)["imported"] is True
+    assert import_once(state)["already_imported"] is True
+    assert import_once({**state, "task_id": "t2"})["imported"] is True
+    assert calls() == ["research import nb t1 --profile p", "research import nb t2 --profile p"]
+
+
+def test_without_a_task_id_every_import_runs(fake_nlm):
+    calls = fake_nlm('"research import") echo imported ;;')
+    state = {"status": "completed", "task_id": None, "sources_found": 3}
+    assert import_once(state)["imported"] is True
+    assert import_once(state)["imported"] is True
+    assert len(calls()) == 2
+
+
+def test_rejected_import_can_be_retried(fake_nlm):
+    fake_nlm('"research import") echo "Error: No such option: --bogus" >&2; exit 2 ;;')
+    state = {"status": "completed", "task_id": "t1", "sources_found": 3}
+    assert import_once(state)["imported"] is False
+    assert "already_imported" not in import_once(state)
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [
+        {"error": "Command timed out after 300s: nlm research import nb t1", "timed_out": True},
+        {"error": "Error: upstream said no", "exit_code": 1},
+    ],
+)
+def test_an_import_that_may_have_landed_keeps_its_claim(monkeypatch, failure):
+    async def run_nlm_async(args, **kwargs):
+        return dict(failure)
+
+    monkeypatch.setattr(helpers, "run_nlm_async", run_nlm_async)
+    state = {"status": "completed", "task_id": "t1", "sources_found": 3}
+    result = import_once(state)
+    assert result["imported"] is False
+    assert result["may_have_imported"] is True
+    assert import_once(state)["already_imported"] is True
+
+
+@pytest.mark.parametrize(
+    "status_case, message",
+    [
+        ('echo "Status: in_progress"; echo "Task ID: t1"', "not finished"),
+        ('echo "Error: upstream said no" >&2; exit 1', "upstream said no"),
+    ],
+)
+def test_import_research_never_imports_an_unfinished_task(fake_nlm, status_case, message):
+    calls = fake_nlm(f'"research status") {status_case} ;;\n"research import") echo imported ;;')
+    ctx = SimpleNamespace(state={}, session=SimpleNamespace(id="s1"))
+    result = asyncio.run(research.import_research_async(ctx, "nb"))
+    assert message in result["error"]
+    assert not [c for c in calls() if c.startswith("research import")]
+
+
+def test_registry_is_bounded(monkeypatch):
+    monkeypatch.setattr(helpers, "MAX_IMPORTED", 3)
+    for i in range(5):
+        assert helpers._claim_import(("p", "nb", f"t{i}"))
+    assert list(helpers._imported) == [("p", "nb", "t2"), ("p", "nb", "t3"), ("p", "nb", "t4")]
+
+
+def test_registry_forgets_after_ttl(monkeypatch):
+    monkeypatch.setattr(helpers, "IMPORTED_TTL", -1)
+    assert helpers._claim_import(("p", "nb", "t1"))
+    assert helpers._claim_import(("p", "nb", "t1"))
+    assert len(helpers._imported) == 1
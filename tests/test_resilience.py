@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from notebooklm_agent import helpers
+from notebooklm_agent.resilience import CircuitBreaker, backoff, classify, should_retry
+
+READ = ["source", "get", "src"]
+WRITE = ["source", "add", "nb", "--url", "https://example.com"]
+
+
+@pytest.mark.parametrize(
+    "result, kind",
+    [
+        ({"output": "fine"}, None),
+        ({"error": "HTTP 503 Service Unavailable"}, "transient"),
+        ({"error": "Connection reset by peer"}, "transient"),
+        ({"error": "429 Too Many Requests"}, "rate_limited"),
+        ({"error": "Notebook not found"}, "not_found"),
+        ({"error": "Session expired", "auth_expired": True}, "auth"),
+        ({"error": "Invalid value for --url"}, "permanent"),
+        ({"error": "Error: No such option: --timeout", "exit_code": 2}, "permanent"),
+        ({"error": "Invalid value for --timeout"}, "permanent"),  # words, not substrings
+        ({"error": "Error: source unavailable for this notebook", "exit_code": 1}, "permanent"),
+        ({"error": "Command timed out after 30s: nlm source get", "timed_out": True}, "transient"),
+    ],
+)
+def test_classify(result, kind):
+    assert classify(result) == kind
+    if kind:
+        assert result["error_kind"] == kind
+
+
+def test_only_transient_read_failures_are_retried():
+    assert should_retry(READ, {"error": "502 Bad Gateway"}, 0)
+    assert should_retry(READ, {"error": "rate limit exceeded"}, 1)
+    assert not should_retry(READ, {"error": "502 Bad Gateway"}, 2)  # RETRIES used up
+    assert not should_retry(WRITE, {"error": "502 Bad Gateway"}, 0)  # mutations never
+    assert not should_retry(READ, {"error": "Notebook not found"}, 0)
+    assert not should_retry(READ, {"error": "Command timed out after 30s: nlm source get", "timed_out": True}, 0)
+    assert not should_retry(WRITE, {"error": "Request timed out", "timed_out": True}, 0)
+
+
+def test_backoff_is_jittered_and_capped():
+    for attempt in range(10):
+        assert 0 <= backoff(attempt, "transient") <= 8.0
+    assert max(backoff(0, "transient") for _ in range(200)) <= 0.5
+    assert max(backoff(0, "rate_limited") for _ in range(200)) > 0.5
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    breaker = CircuitBreaker(threshold=3, cooldown=60)
+    for _ in range(3):
+        assert breaker.check("p", READ) is None
+        breaker.record("p", "transient")
+    rejected = breaker.check("p", READ)
+    assert rejected["circuit_open"] and rejected["error_kind"] == "transient"
+    assert breaker.check("p", ["login", "--check"]) is None  # login always goes through
+    assert breaker.check("other", READ) is None  # per profile
+
+    breaker._open_until["p"] = time.monotonic()  # cooldown over
+    assert breaker.check("p", READ) is None  # the probe
+    assert breaker.check("p", READ)["circuit_open"]  # one probe at a time
+    breaker.record("p", None)
+    assert breaker.check("p", READ) is None
+
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    breaker.record("p", "rate_limited")
+    breaker._open_until["p"] = time.monotonic()
+    assert breaker.check("p", READ) is None
+    breaker.record("p", "transient")
+    assert breaker.check("p", READ)["circuit_open"]
+
+
+def test_a_timed_out_mutation_does_not_count_toward_the_breaker():
+    breaker = CircuitBreaker(threshold=1, cooldown=60)
+    timed_out = {"error": "Command timed out after 120s: nlm studio create", "timed_out": True}
+    breaker.settle("p", WRITE, dict(timed_out))
+    assert breaker.check("p", READ) is None
+    breaker.settle("p", READ, dict(timed_out))  # a read that times out does
+    assert breaker.check("p", READ)["circuit_open"]
+
+
+@pytest.fixture
+def no_waiting(monkeypatch):
+    monkeypatch.setattr(helpers, "backoff", lambda attempt, kind: 0)
+    monkeypatch.setattr(helpers, "breaker", CircuitBreaker(threshold=5, cooldown=60))
+
+
+def flaky(fake_nlm, tmp_path, verb):
+    """A fake nlm whose `source <verb>` fails with a 503 once, then succeeds."""
+    marker = tmp_path / "failed-once"
+    return fake_nlm(f'''
+"source {verb}")
+  if [ -e {marker} ]; then echo '{{"id": "src"}}'; else touch {marker}; echo "HTTP 503 Service Unavailable" >&2; exit 1; fi ;;
+''')
+
+
+def test_transient_read_failure_is_retried(fake_nlm, tmp_path, no_waiting):
+    calls = flaky(fake_nlm, tmp_path, "get")
+    assert helpers.run_nlm(READ, profile="retry-read") == {"id": "src"}
+    assert len(calls()) == 2
+
+
+def test_mutation_is_not_retried(fake_nlm, tmp_path, no_waiting):
+    calls = flaky(fake_nlm, tmp_path, "add")
+    result = helpers.run_nlm(WRITE, profile="retry-write", json_output=False)
+    assert result["error_kind"] == "transient"
+    assert len(calls()) == 1
+
+
+def test_a_timed_out_mutation_runs_once(fake_nlm, no_waiting):
+    calls = fake_nlm('"source add") sleep 5 ;;')
+    result = helpers.run_nlm(WRITE, profile="slow-write", json_output=False, timeout=1)
+    assert result["timed_out"] and result["error_kind"] == "transient"
+    assert len(calls()) == 1
+    assert helpers.breaker.check("slow-write", READ) is None
+    assert helpers.breaker._failures.get("slow-write") is None
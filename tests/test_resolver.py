@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from notebooklm_agent.projection import project_response
+from notebooklm_agent.resolver import NotebookIndex, StaleListRef, list_ref, notebook_index, parse_index
+from notebooklm_agent.tools import sources
+
+
+@pytest.mark.parametrize(
+    "text, position",
+    [("3", 3), ("#3", 3), ("number 3", 3), ("3rd", 3), ("the third one", 3), ("last", -1), ("Kubernetes", None), ("3 and 4", None)],
+)
+def test_parse_index(text, position):
+    assert parse_index(text) == position
+
+
+def test_search_tiers():
+    index = NotebookIndex()
+    index.update("p", [
+        {"id": "a", "title": "Kubernetes Deep Dive"},
+        {"id": "b", "title": "Kubernetes"},
+        {"id": "c", "title": "Cooking with Rust"},
+    ])
+    assert index.search("p", "kubernetes") == [("b", "Kubernetes")]  # exact beats prefix
+    assert index.search("p", "my kubernetes deep notebook") == [("a", "Kubernetes Deep Dive")]
+    assert index.search("p", "rust cooking") == [("c", "Cooking with Rust")]
+    assert index.search("p", "kubernets deep dive") == [("a", "Kubernetes Deep Dive")]  # fuzzy
+    assert index.search("p", "astronomy") == []
+
+
+def shown(notebook_id):
+    """Session state after list_sources(notebook_id) went through the projection."""
+    ctx = SimpleNamespace(state={}, session=SimpleNamespace(id="s1"))
+    result = {"sources": [{"id": f"{notebook_id}-src{i}", "title": f"Source {i}"} for i in (1, 2, 3)]}
+    projected = project_response(SimpleNamespace(name="list_sources"), {"notebook_id": notebook_id}, ctx, result)
+    assert [s["n"] for s in projected["sources"]] == [1, 2, 3]
+    return ctx
+
+
+def test_list_ref_resolves_positions_for_the_listed_notebook():
+    state = shown("nb-a").state
+    assert list_ref(state, "last_source_list", "2", "nb-a") == "nb-a-src2"
+    assert list_ref(state, "last_source_list", "last", "nb-a") == "nb-a-src3"
+    assert list_ref(state, "last_source_list", "9", "nb-a") == "9"  # out of range: left alone
+    assert list_ref(state, "last_source_list", "some-uuid", "nb-b") == "some-uuid"
+
+
+def test_list_ref_refuses_positions_for_another_notebook():
+    state = shown("nb-a").state
+    with pytest.raises(StaleListRef):
+        list_ref(state, "last_source_list", "2", "nb-b")
+    with pytest.raises(StaleListRef):
+        list_ref(state, "last_source_list", "2", None)
+
+
+def test_delete_by_number_never_hits_another_notebook(fake_nlm):
+    calls = fake_nlm('"source delete") echo deleted ;;')
+    ctx = shown("nb-a")
+
+    result = sources.delete_source(ctx, "2", notebook_id="nb-b")
+    assert "error" in result
+    assert calls() == []
+
+    ctx.state["active_notebook_id"] = "nb-a"
+    assert "error" not in sources.delete_source(ctx, "2")
+    assert calls() == ["source delete nb-a-src2 --confirm --profile default"]
+
+
+@pytest.mark.parametrize("said, expected", [("Notebook 2", "c"), ("notebook 2", "c"), ("3", "d")])
+def test_a_title_wins_over_a_list_position(said, expected):
+    from notebooklm_agent.tools import notebooks
+
+    ctx = SimpleNamespace(state={"profile": "titles"}, session=SimpleNamespace(id="s1"))
+    notebook_index.update("titles", [
+        {"id": "a", "title": "Kubernetes"},
+        {"id": "b", "title": "Rust"},
+        {"id": "c", "title": "Notebook 2"},
+        {"id": "d", "title": "3"},
+    ])
+    ctx.state["last_notebook_list"] = ["a", "b", "c", "d"]
+    assert notebooks.resolve_notebook(ctx, said)["notebook_id"] == expected
+    assert notebooks.resolve_notebook(ctx, "the second one")["notebook_id"] == "b"
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+from notebooklm_agent import helpers
+from notebooklm_agent.commands import read_only
+from notebooklm_agent.singleflight import Singleflight
+
+KEY = ("default", ("notebook", "list"), True)
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = Singleflight()
+    release = asyncio.Event()
+    runs = []
+
+    async def call():
+        runs.append(1)
+        await release.wait()
+        return [{"id": "a"}]
+
+    async def main():
+        tasks = [asyncio.create_task(flight.do_async(KEY, call)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+    assert len(runs) == 1
+    assert all(r == [{"id": "a"}] for r in results)
+    # Followers get copies: one caller mutating its result can't affect another
+    assert len({id(r) for r in results}) == 5
+
+
+def test_the_leader_does_not_share_its_own_result():
+    flight = Singleflight()
+    shared = []
+
+    async def call():
+        shared.append(flight._calls[KEY])
+        return {"sources": [{"id": "a"}]}
+
+    for result in (asyncio.run(flight.do_async(KEY, call)), flight.do(KEY, lambda: asyncio.run(call()))):
+        result["sources"].append({"id": "leader's edit"})
+        assert shared.pop().result() == {"sources": [{"id": "a"}]}  # what followers copy from
+
+
+def test_followers_rerun_when_leader_is_cancelled():
+    flight = Singleflight()
+    runs = []
+
+    async def call():
+        runs.append(1)
+        await asyncio.sleep(0.05 if len(runs) == 1 else 0)
+        return {"n": len(runs)}
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async(KEY, call))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do_async(KEY, call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == {"n": 2}
+
+
+def test_cancelled_follower_does_not_cancel_the_shared_call():
+    flight = Singleflight()
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async(KEY, call))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.do_async(KEY, call))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert flight._calls == {}
+
+
+def test_sync_caller_in_a_thread_joins_an_async_leader():
+    flight = Singleflight()
+    started, release = threading.Event(), threading.Event()
+    runs, box = [], []
+
+    async def call():
+        runs.append(1)
+        started.set()
+        await asyncio.to_thread(release.wait)
+        return {"ok": True}
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async(KEY, call))
+        await asyncio.to_thread(started.wait)
+        thread = threading.Thread(target=lambda: box.append(flight.do(KEY, lambda: {"ok": "own"})))
+        thread.start()
+        await asyncio.sleep(0.05)
+        release.set()
+        await leader
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert runs == [1] and box == [{"ok": True}]
+
+
+def test_only_read_only_commands_are_merged(fake_nlm, monkeypatch):
+    monkeypatch.setattr(helpers, "read_cache", None)
+    calls = fake_nlm('"note list") sleep 0.3; echo "[]";;\n"note create") sleep 0.3; echo created;;')
+
+    async def main():
+        await asyncio.gather(*(helpers.run_nlm_async(["note", "list", "nb"]) for _ in range(3)))
+        await asyncio.gather(
+            *(helpers.run_nlm_async(["note", "create", "nb", "--content", "x"], json_output=False) for _ in range(2))
+        )
+
+    asyncio.run(main())
+    assert read_only(["note", "list"]) and not read_only(["note", "create"])
+    assert sum(c.startswith("note list") for c in calls()) == 1
+    assert sum(c.startswith("note create") for c in calls()) == 2
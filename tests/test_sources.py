@@ -0,0 +1,53 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+from notebooklm_agent.progress import session_var
+from notebooklm_agent.tools import sources
+
+ADD_CASES = '''
+"source add") if [ "$5" = "https://bad.example" ]; then echo "Error: could not fetch" >&2; exit 1; fi
+              echo "Added source: $5" ;;
+"source list") echo '[{"id": "s1"}, {"id": "s2"}]' ;;
+'''
+URLS = ["https://a.example", "https://bad.example", "https://b.example"]
+
+
+def ctx():
+    return SimpleNamespace(state={}, session=SimpleNamespace(id="s1"))
+
+
+def check_report(report):
+    assert report["added"] == 2
+    assert report["failed"] == 1
+    assert [r["status"] for r in report["results"]] == ["added", "failed", "added"]
+    failed = report["results"][1]
+    assert failed["source"] == "https://bad.example"
+    assert "could not fetch" in failed["detail"]
+    assert report["total_sources"] == 2
+
+
+def test_batch_reports_partial_failure(fake_nlm):
+    fake_nlm(ADD_CASES)
+    check_report(sources.add_sources_batch(ctx(), "nb", urls=URLS))
+
+
+def test_batch_async_reports_partial_failure(fake_nlm):
+    fake_nlm(ADD_CASES)
+    check_report(asyncio.run(sources.add_sources_batch_async(ctx(), "nb", urls=URLS)))
+
+
+def test_batch_workers_keep_the_callers_context(monkeypatch):
+    seen = []
+
+    def run_nlm(args, **kwargs):
+        seen.append(session_var.get(None))
+        return {"output": "ok"} if args[1] == "add" else []
+
+    def in_session():
+        session_var.set("session-7")
+        sources.add_sources_batch(ctx(), "nb", urls=URLS)
+
+    monkeypatch.setattr(sources, "run_nlm", run_nlm)
+    contextvars.copy_context().run(in_session)
+    assert seen == ["session-7"] * 4
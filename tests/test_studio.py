@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+
+from notebooklm_agent.tools import studio
+
+OLD_AUDIO = {"id": "old-audio", "type": "audio", "status": "completed"}
+NEW_AUDIO_ID = "0c4e2f4a-1111-4222-8333-944455556666"
+
+
+def test_rollup_ignores_artifacts_that_existed_before():
+    created = {"audio": {"output": "Audio generation started"}}
+    status = [OLD_AUDIO, {"id": "new-audio", "type": "audio", "status": "in_progress"}]
+    assert studio._status_rollup(created, status, {"old-audio"}) == {"audio": "Generating"}
+    assert studio._status_rollup(created, [OLD_AUDIO], {"old-audio"}) == {"audio": "Requested"}
+
+
+def test_rollup_prefers_the_id_from_the_create_output():
+    created = {"audio": {"output": f"Artifact ID: {NEW_AUDIO_ID}"}}
+    status = [{"id": "old-audio", "type": "audio", "status": "in_progress"},
+              {"id": NEW_AUDIO_ID, "type": "audio", "status": "completed"}]
+    assert studio._status_rollup(created, status, None) == {"audio": "Ready"}
+
+
+def test_rollup_without_a_before_listing_trusts_only_ids():
+    created = {"audio": {"output": "started"}, "mindmap": {"output": "done"}, "quiz": {"error": "nope"}}
+    assert studio._status_rollup(created, [OLD_AUDIO], None) == {
+        "audio": "Requested", "mindmap": "Ready", "quiz": "Failed",
+    }
+
+
+def test_create_artifacts_reports_only_the_new_artifact(fake_nlm, tmp_path):
+    made = tmp_path / "made"
+    calls = fake_nlm(f'''
+"audio create") touch {made}; echo "Audio generation started" ;;
+"studio status")
+  if [ -e {made} ]; then
+    echo '[{{"id": "old-audio", "type": "audio", "status": "completed"}}, {{"id": "new-audio", "type": "audio", "status": "in_progress"}}]'
+  else
+    echo '[{{"id": "old-audio", "type": "audio", "status": "completed"}}]'
+  fi ;;
+''')
+    ctx = SimpleNamespace(state={}, session=SimpleNamespace(id="s1"))
+    report = asyncio.run(studio.create_artifacts_async(ctx, "nb", ["audio"]))
+    assert report["artifacts"] == {"audio": "Generating"}
+    assert [c.split()[:2] for c in calls()] == [["studio", "status"], ["audio", "create"], ["studio", "status"]]
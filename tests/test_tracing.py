@@ -0,0 +1,72 @@
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from notebooklm_agent import agent, tracing
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    monkeypatch.setattr(tracing, "_open", {})
+    return exporter
+
+
+def ctx(call_id):
+    return SimpleNamespace(state={}, session=SimpleNamespace(id="s1"), function_call_id=call_id)
+
+
+def test_span_is_closed_when_the_guard_raises(spans, monkeypatch):
+    async def broken(tool_context):
+        raise RuntimeError("store unreachable")
+
+    monkeypatch.setattr(agent, "_auth_block", broken)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await agent.auth_guard(SimpleNamespace(name="list_notebooks"), {}, ctx("call-1"))
+        return trace.get_current_span()
+
+    current = asyncio.run(scenario())
+    assert not current.get_span_context().is_valid  # detached again
+    assert tracing._open == {}
+    [tool_span] = [s for s in spans.get_finished_spans() if s.name == "tool list_notebooks"]
+    assert tool_span.status.status_code == StatusCode.ERROR
+
+
+def test_evicted_spans_are_ended(spans, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_OPEN_SPANS", 2)
+    for i in range(2):  # calls in other tasks that never got a closing callback
+        contextvars.copy_context().run(tracing.start_tool_span, f"t{i}", ctx(f"leaked-{i}"))
+    newest = tracing.start_tool_span("t2", ctx("fresh"))
+
+    assert [s.name for s in spans.get_finished_spans()] == ["tool t0"]
+    assert trace.get_current_span() is newest
+    tracing.end_tool_span(ctx("fresh"))
+    assert not trace.get_current_span().get_span_context().is_valid
+
+
+def test_evicted_span_is_detached_before_the_next_one_opens(spans, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_OPEN_SPANS", 1)
+
+    def scenario():
+        tracing.start_tool_span("leaked", ctx("leaked"))  # same context, never closed
+        tracing.start_tool_span("next", ctx("next"))
+        tracing.end_tool_span(ctx("next"))
+        return trace.get_current_span()
+
+    current = contextvars.copy_context().run(scenario)
+    assert not current.get_span_context().is_valid
+    finished = {s.name: s for s in spans.get_finished_spans()}
+    assert set(finished) == {"tool leaked", "tool next"}
+    assert finished["tool next"].parent is None  # not nested under the leaked call
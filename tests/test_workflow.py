@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from notebooklm_agent.workflow import Step, run_pipeline
+
+
+def step(name, result, needs=(), delay=0.0, log=None):
+    async def run(results):
+        if log is not None:
+            log.append((name, sorted(results)))
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return Step(name, run, needs=needs)
+
+
+def statuses(run):
+    return {e["step"]: e["status"] for e in run["steps"]}
+
+
+def test_independent_steps_run_concurrently():
+    steps = [step(n, {"ok": n}, delay=0.2) for n in ("a", "b", "c")]
+    t0 = time.monotonic()
+    run = asyncio.run(run_pipeline(steps))
+    assert time.monotonic() - t0 < 0.5
+    assert run["ok"] and run["results"] == {n: {"ok": n} for n in ("a", "b", "c")}
+
+
+def test_step_sees_the_results_it_needs():
+    log = []
+    run = asyncio.run(run_pipeline([
+        step("create", {"id": "nb"}, log=log),
+        step("query", {"answer": "x"}, needs=("create",), log=log),
+    ]))
+    assert run["ok"]
+    assert ("query", ["create"]) in log
+
+
+def test_failure_skips_only_what_depends_on_it():
+    run = asyncio.run(run_pipeline([
+        step("create", {"error": "boom"}),
+        step("import", {}, needs=("create",)),
+        step("summary", {}, needs=("import",)),
+        step("unrelated", {"fine": True}),
+    ]))
+    assert not run["ok"]
+    assert statuses(run) == {"create": "failed", "import": "skipped", "summary": "skipped", "unrelated": "ok"}
+    assert run["steps"][0]["error"] == "boom"
+    assert set(run["results"]) == {"create", "unrelated"}
+
+
+def test_raising_step_counts_as_failed():
+    run = asyncio.run(run_pipeline([step("a", RuntimeError("bad")), step("b", {}, needs=("a",))]))
+    assert statuses(run) == {"a": "failed", "b": "skipped"}
+    assert "bad" in run["results"]["a"]["error"]
+
+
+def test_unknown_needs_are_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(run_pipeline([step("a", {}, needs=("missing",))]))
+